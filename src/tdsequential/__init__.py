@@ -5,5 +5,29 @@ __version__ = "0.1.0"
 
 from .core import calculate_td_sequential, get_last_signal
 from .plot import plot_td_sequential
+from .stream import TDSequentialState
+from .aio import SignalStream, ComputeExecutor, calculate_td_sequential_async
+from .bars import BarBuilder
+from .timeframes import MultiTimeframeEngine
+from .checkpoint import CheckpointedSeries
+from .live import LiveTDSequential
+from .store import StateStore
+from .screener import Screener
+from . import accessor  # noqa: F401  (registra el accessor df.td)
 
-__all__ = ["calculate_td_sequential", "get_last_signal", "plot_td_sequential", "__version__"]
+__all__ = [
+    "calculate_td_sequential",
+    "get_last_signal",
+    "plot_td_sequential",
+    "TDSequentialState",
+    "SignalStream",
+    "ComputeExecutor",
+    "calculate_td_sequential_async",
+    "BarBuilder",
+    "MultiTimeframeEngine",
+    "CheckpointedSeries",
+    "LiveTDSequential",
+    "StateStore",
+    "Screener",
+    "__version__",
+]
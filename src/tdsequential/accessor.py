@@ -0,0 +1,230 @@
+"""
+Accessor de pandas `df.td` con resultados memorizados.
+
+Al importar `tdsequential` se registra el accessor `td` en los DataFrame:
+
+    df.td.sequential()      # conteos de setup/countdown
+    df.td.tdst()            # niveles TDST
+    df.td.last_signal()     # última señal completada
+    df.td.plot()            # gráfico de señales
+    df.td.frame()           # df + todas las columnas (equivale a calculate_* encadenados)
+
+Los kernels se ejecutan una sola vez por combinación de parámetros, con el motor de
+`engine` (por defecto "auto", como `calculate_td_sequential`). Como pandas no garantiza
+reutilizar la instancia del accessor, la caché vive en un registro por DataFrame (referencia
+débil: se libera con el frame) y se asocia a una huella barata de los datos: el objeto índice
+y, por columna de entrada, la dirección del array y un CRC32 de sus bytes (unos 2 ms por
+millón de filas, frente a hashear los valores con pandas). Si el frame se modifica in situ,
+la siguiente llamada lo detecta y recalcula.
+
+Paneles: pandas no permite registrar accessors sobre objetos GroupBy, así que la variante
+agrupada es `df.td.sequential(by="symbol")`. Los kernels recorren cada grupo sobre vistas de
+los arrays NumPy ya ordenados por grupo, sin crear un DataFrame por grupo.
+"""
+
+import weakref
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .core import _get_kernel as _get_td_kernel, get_last_signal
+from .levels import _get_kernel as _get_tdst_kernel
+
+
+COUNT_COLUMNS = ["buy_setup_count", "sell_setup_count", "buy_countdown_count", "sell_countdown_count"]
+TDST_COLUMNS = ["tdst_buy", "tdst_sell"]
+
+# id(DataFrame) -> (referencia débil, estado de caché {"fingerprint", "results"})
+_CACHES = {}
+
+
+def _cache_for(df: pd.DataFrame) -> dict:
+    key = id(df)
+    entry = _CACHES.get(key)
+    if entry is None or entry[0]() is not df:
+        state = {"fingerprint": None, "index": None, "results": {}}
+        entry = (weakref.ref(df, lambda _, key=key: _CACHES.pop(key, None)), state)
+        _CACHES[key] = entry
+    return entry[1]
+
+
+@pd.api.extensions.register_dataframe_accessor("td")
+class TDAccessor:
+    """
+    Accessor `df.td` (se registra al importar `tdsequential`).
+
+    Los nombres de columnas OHLC se indican en cada llamada (por defecto Open/High/Low/Close),
+    igual que en `calculate_td_sequential`.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._state = _cache_for(df)
+
+    # ----------------------------
+    # Caché
+    # ----------------------------
+    def _data_fingerprint(self, columns) -> tuple:
+        # El índice es inmutable: basta con su identidad (reasignar df.index cambia el objeto),
+        # que `_cached` comprueba aparte
+        parts = [self._df.shape]
+        for col in columns:
+            values = self._df[col].to_numpy()
+            if values.dtype == object:  # p.ej. la columna de símbolo de `by`
+                parts.append(pd.util.hash_pandas_object(self._df[col], index=False).to_numpy().sum())
+                continue
+            data = np.ascontiguousarray(values)
+            parts += [col, values.__array_interface__["data"][0], str(values.dtype),
+                      zlib.crc32(memoryview(data).cast("B"))]
+        return tuple(parts)
+
+    def _cached(self, key, columns, compute):
+        for col in columns:
+            if col not in self._df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        state = self._state
+        fingerprint = self._data_fingerprint(columns)
+        if fingerprint != state["fingerprint"] or state["index"] is not self._df.index:
+            state["results"].clear()
+            state["fingerprint"] = fingerprint
+            state["index"] = self._df.index
+        results = state["results"]
+        if key not in results:
+            results[key] = compute()
+        return results[key]
+
+    def clear_cache(self) -> None:
+        """Descarta los resultados memorizados."""
+        self._state["results"].clear()
+        self._state["fingerprint"] = None
+        self._state["index"] = None
+
+    # ----------------------------
+    # Kernels
+    # ----------------------------
+    def _groups(self, by):
+        """Orden estable por grupo y límites de cada grupo (None = un único grupo)."""
+        n = len(self._df)
+        if by is None:
+            return None, [(0, n)]
+        if by not in self._df.columns:
+            raise ValueError(f"Columna '{by}' no encontrada en DataFrame")
+        codes, _ = pd.factorize(self._df[by].to_numpy())
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        starts = np.r_[0, bounds]
+        stops = np.r_[bounds, n]
+        return order, list(zip(starts, stops))
+
+    def _arrays(self, high_col, low_col, close_col, by):
+        for col in [close_col, high_col, low_col]:
+            if col not in self._df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        order, bounds = self._groups(by)
+        arrays = [self._df[c].to_numpy(dtype=float) for c in (high_col, low_col, close_col)]
+        if order is not None:
+            arrays = [a[order] for a in arrays]
+        return order, bounds, arrays
+
+    def _compute_counts(self, high_col, low_col, close_col, by, length_setup, length_countdown,
+                        return_flags, apply_perfection, engine):
+        order, bounds, (high, low, close) = self._arrays(high_col, low_col, close_col, by)
+        parts = [_get_td_kernel(engine, b - a)[1](close[a:b], high[a:b], low[a:b], length_setup,
+                                                   length_countdown, apply_perfection=apply_perfection,
+                                                   flags=return_flags)
+                 for a, b in bounds]
+        out = {}
+        for name in parts[0] if parts else COUNT_COLUMNS:
+            values = np.concatenate([p[name] for p in parts]) if parts else np.zeros(0, dtype=int)
+            if order is not None:
+                restored = np.empty_like(values)
+                restored[order] = values
+                values = restored
+            out[name] = values
+        return pd.DataFrame(out, index=self._df.index)
+
+    def sequential(self, high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+                   length_setup: int = 9, length_countdown: int = 13, by: str = None,
+                   return_flags: bool = False, apply_perfection: bool = True,
+                   engine: str = "auto") -> pd.DataFrame:
+        """
+        Conteos TD Sequential (memorizados).
+
+        Parámetros:
+        - by: columna de símbolo para calcular cada grupo por separado (panel)
+        - resto: igual que `calculate_td_sequential` (todos los motores dan el mismo resultado,
+          así que `engine` no forma parte de la clave de caché)
+
+        Retorna:
+        - DataFrame con las columnas de conteo (y calificadores si `return_flags`), mismo índice
+          que `df`. No se debe modificar: es el objeto memorizado.
+        """
+        columns = [high_col, low_col, close_col] + ([by] if by is not None else [])
+        key = ("sequential", high_col, low_col, close_col, length_setup, length_countdown, by,
+               return_flags, apply_perfection)
+        return self._cached(key, columns, lambda: self._compute_counts(
+            high_col, low_col, close_col, by, length_setup, length_countdown, return_flags, apply_perfection,
+            engine))
+
+    def tdst(self, high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+             length_setup: int = 9, length_countdown: int = 13, by: str = None,
+             engine: str = "auto") -> pd.DataFrame:
+        """Niveles TDST (`tdst_buy`, `tdst_sell`) a partir de los conteos memorizados."""
+        columns = [high_col, low_col, close_col] + ([by] if by is not None else [])
+        key = ("tdst", high_col, low_col, close_col, length_setup, length_countdown, by)
+
+        def compute():
+            counts = self.sequential(high_col, low_col, close_col, length_setup, length_countdown, by,
+                                     engine=engine)
+            order, bounds, (high, low, _) = self._arrays(high_col, low_col, close_col, by)
+            buy = counts["buy_setup_count"].to_numpy()
+            sell = counts["sell_setup_count"].to_numpy()
+            if order is not None:
+                buy, sell = buy[order], sell[order]
+            levels = [_get_tdst_kernel(engine, b - a)[1](high[a:b], low[a:b], buy[a:b], sell[a:b])
+                      for a, b in bounds]
+            out = {}
+            for k, name in enumerate(TDST_COLUMNS):
+                values = np.concatenate([lv[k] for lv in levels]) if levels else np.zeros(0)
+                if order is not None:
+                    restored = np.empty_like(values)
+                    restored[order] = values
+                    values = restored
+                out[name] = values
+            return pd.DataFrame(out, index=self._df.index)
+
+        return self._cached(key, columns, compute)
+
+    def frame(self, high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+              length_setup: int = 9, length_countdown: int = 13, by: str = None,
+              engine: str = "auto") -> pd.DataFrame:
+        """Copia de `df` con conteos y niveles TDST (como `calculate_tdst_levels(calculate_td_sequential(df))`)."""
+        counts = self.sequential(high_col, low_col, close_col, length_setup, length_countdown, by,
+                                 engine=engine)
+        levels = self.tdst(high_col, low_col, close_col, length_setup, length_countdown, by, engine=engine)
+        out = self._df.copy()
+        for name in COUNT_COLUMNS:
+            out[name] = counts[name].to_numpy()
+        for name in TDST_COLUMNS:
+            out[name] = levels[name].to_numpy()
+        return out
+
+    def last_signal(self, high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+                    length_setup: int = 9, length_countdown: int = 13):
+        """Última señal completada (ver `get_last_signal`), sobre los conteos memorizados."""
+        counts = self.sequential(high_col, low_col, close_col, length_setup, length_countdown)
+        return get_last_signal(counts, length_setup=length_setup, length_countdown=length_countdown)
+
+    def plot(self, open_col: str = "Open", high_col: str = "High", low_col: str = "Low",
+             close_col: str = "Close", ax=None):
+        """Gráfico de señales (ver `plot_td_sequential`) sin recalcular los conteos."""
+        from .plot import plot_td_sequential
+
+        counts = self.sequential(high_col, low_col, close_col)
+        data = pd.DataFrame({c: self._df[c].to_numpy() for c in (high_col, low_col, close_col)},
+                            index=self._df.index)
+        for name in COUNT_COLUMNS:
+            data[name] = counts[name].to_numpy()
+        return plot_td_sequential(data, open_col=open_col, high_col=high_col, low_col=low_col,
+                                  close_col=close_col, ax=ax)
@@ -0,0 +1,337 @@
+"""
+Adaptador asyncio para procesar feeds en vivo de muchos símbolos con TD Sequential.
+
+`SignalStream` enruta cada barra al `TDSequentialState` de su símbolo y produce solo los
+eventos nuevos (Setup 9, Countdown 13 y ruptura de TDST), sin bloquear el event loop:
+
+- Backpressure: las barras entran por una cola acotada (`put` espera si está llena).
+- Catch-up: reconstruir el estado desde un histórico (`warm_up`) se ejecuta en un executor;
+  las barras que llegan mientras tanto para ese símbolo se guardan y se aplican después (como
+  mucho `maxsize`: a partir de ahí `put` de ese símbolo espera a que termine su warm-up).
+- El consumidor cede el control al loop cada `yield_every` barras.
+- Con `metrics=MetricsRegistry()` publica la latencia de `update` por barra, las barras y
+  señales procesadas, los warm-ups (recálculos de catch-up), la profundidad de la cola y las
+  barras retenidas por símbolo durante un warm-up (ver metrics.py).
+
+Para servicios asyncio que calculan históricos completos dentro de los handlers,
+`calculate_td_sequential_async` y `calculate_tdst_levels_async` ejecutan el cálculo batch en
+un `ComputeExecutor` (pool de hilos o de procesos) con concurrencia acotada, de modo que un
+histórico largo no bloquea el resto de peticiones.
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from .core import calculate_td_sequential
+from .levels import calculate_tdst_levels
+from .stream import Bar, TDSequentialState
+
+
+_END = object()
+_WARM = object()
+
+
+class SignalStream:
+    """
+    Consumidor asyncio de barras multi-símbolo.
+
+    Uso:
+        stream = SignalStream(maxsize=10_000)
+        async for event in stream.run(feed):   # feed: async iterable de Bar/tuplas
+            ...
+
+    O con productor externo:
+        await stream.put(bar)        # espera si la cola está llena
+        await stream.close()
+        async for event in stream.events(): ...
+
+    `on_bar(bar, result, events)`, si se indica, se llama tras aplicar cada barra a su estado
+    (también las retenidas durante un warm-up, al aplicarlas), con su `BarResult` y sus eventos
+    nuevos; sirve para observar el resultado barra a barra sin salir del camino en vivo.
+    """
+
+    def __init__(
+        self,
+        length_setup: int = 9,
+        length_countdown: int = 13,
+        maxsize: int = 10000,
+        executor=None,
+        yield_every: int = 256,
+        metrics=None,
+        on_bar=None,
+    ):
+        self.length_setup = length_setup
+        self.length_countdown = length_countdown
+        self.executor = executor
+        self.yield_every = yield_every
+        self.states = {}
+        self._queue = None
+        self._maxsize = maxsize
+        self._warming = {}  # símbolo -> barras pendientes durante el warm-up
+        self._warm_done = {}  # símbolo -> asyncio.Event que se activa al terminar su warm-up
+        self.metrics = metrics
+        self.on_bar = on_bar
+        if metrics is not None:
+            self._init_metrics(metrics)
+
+    def _init_metrics(self, metrics) -> None:
+        # Si varios streams comparten registro, los gauges reflejan el último creado
+        self._m_latency = metrics.histogram("tdsequential_update_latency_seconds",
+                                            "Latencia de TDSequentialState.update por barra")
+        self._m_record = self._m_latency.recorder()
+        self._m_bars = metrics.counter("tdsequential_bars_total", "Barras procesadas")
+        self._m_signals = metrics.counter("tdsequential_signals_total", "Señales emitidas", labelnames=("kind",))
+        self._m_catchup = metrics.counter("tdsequential_catchup_recomputes_total",
+                                          "Estados reconstruidos desde un histórico (warm_up)")
+        self._m_catchup_latency = metrics.histogram("tdsequential_catchup_seconds", "Duración de warm_up")
+        metrics.gauge("tdsequential_queue_depth", "Barras pendientes en la cola",
+                      fn=lambda: self._queue.qsize() if self._queue is not None else 0)
+        metrics.gauge("tdsequential_symbol_backlog", "Barras retenidas por símbolo durante su warm_up",
+                      labelnames=("symbol",), fn=lambda: {s: len(p) for s, p in list(self._warming.items())})
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        # Se crea perezosamente para quedar ligada al loop en ejecución
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._maxsize)
+        return self._queue
+
+    def state(self, symbol) -> TDSequentialState:
+        """Devuelve (creando si no existe) el estado incremental de un símbolo."""
+        st = self.states.get(symbol)
+        if st is None:
+            st = TDSequentialState(self.length_setup, self.length_countdown)
+            self.states[symbol] = st
+        return st
+
+    async def put(self, bar) -> None:
+        """
+        Encola una barra; espera si la cola está llena (backpressure) o si su símbolo ya tiene
+        `maxsize` barras retenidas esperando a su warm-up.
+        """
+        bar = Bar(*bar)
+        pending = self._warming.get(bar.symbol)
+        if pending is not None and len(pending) >= self._maxsize:
+            await self._warm_done[bar.symbol].wait()
+        await self.queue.put(bar)
+
+    async def close(self) -> None:
+        """Marca el fin del feed; `events()` termina tras procesar lo encolado."""
+        await self.queue.put(_END)
+
+    async def warm_up(self, symbol, df, high_col="High", low_col="Low", close_col="Close") -> None:
+        """
+        Reconstruye el estado de `symbol` a partir de su histórico en un executor.
+
+        Las barras del símbolo recibidas antes de que termine se aplican después, en orden.
+        """
+        if symbol not in self._warming:
+            self._warming[symbol] = []
+            self._warm_done[symbol] = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        build = partial(
+            TDSequentialState.from_frame, df,
+            high_col=high_col, low_col=low_col, close_col=close_col,
+            length_setup=self.length_setup, length_countdown=self.length_countdown,
+        )
+        t0 = time.perf_counter_ns()
+        try:
+            state = await loop.run_in_executor(self.executor, build)
+        except BaseException:
+            self._finish_warm_up(symbol)
+            raise
+        if self.metrics is not None:
+            self._m_catchup.inc()
+            self._m_catchup_latency.record_ns(time.perf_counter_ns() - t0)
+        await self.queue.put((_WARM, symbol, state))
+
+    def _finish_warm_up(self, symbol) -> list:
+        """Saca a `symbol` del warm-up, despierta a los `put` en espera y devuelve sus barras retenidas."""
+        done = self._warm_done.pop(symbol, None)
+        if done is not None:
+            done.set()
+        return self._warming.pop(symbol, [])
+
+    def _apply(self, bar: Bar) -> list:
+        res, events = self._step(bar)
+        if self.on_bar is not None:
+            self.on_bar(bar, res, events)
+        return events
+
+    def _step(self, bar: Bar) -> tuple:
+        """Aplica una barra a su estado: (BarResult, eventos nuevos)."""
+        st = self.state(bar.symbol)
+        if self.metrics is None:
+            res = st.update(bar.high, bar.low, bar.close)
+            return res, st.signals(res, bar.symbol, bar.timestamp)
+        t0 = time.perf_counter_ns()
+        res = st.update(bar.high, bar.low, bar.close)
+        self._m_record(time.perf_counter_ns() - t0)
+        self._m_bars.value += 1
+        events = st.signals(res, bar.symbol, bar.timestamp)
+        for event in events:
+            self._m_signals.labels(event.kind).inc()
+        return res, events
+
+    async def events(self):
+        """Generador asíncrono de `SignalEvent` nuevos hasta que se llame a `close()`."""
+        queue = self.queue
+        processed = 0
+        while True:
+            item = await queue.get()
+            if item is _END:
+                return
+
+            if isinstance(item, tuple) and item and item[0] is _WARM:
+                _, symbol, state = item
+                self.states[symbol] = state
+                for bar in self._finish_warm_up(symbol):
+                    for event in self._apply(bar):
+                        yield event
+                continue
+
+            pending = self._warming.get(item.symbol)
+            if pending is not None:
+                pending.append(item)
+                continue
+
+            for event in self._apply(item):
+                yield event
+
+            processed += 1
+            if processed % self.yield_every == 0:
+                if self.metrics is not None:
+                    self._m_latency.fold()
+                await asyncio.sleep(0)
+
+    async def run(self, source):
+        """Consume un iterable asíncrono de barras y produce los eventos nuevos."""
+        async def produce():
+            try:
+                async for bar in source:
+                    await self.put(bar)
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                await self.close()
+                raise
+            await self.close()
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            async for event in self.events():
+                yield event
+        finally:
+            if not producer.done():
+                producer.cancel()
+        await producer
+
+
+class ComputeExecutor:
+    """
+    Executor gestionado para ejecutar cálculos batch fuera del event loop.
+
+    Parámetros:
+    - kind: "thread" (sin copias del DataFrame) o "process" (paralelismo real entre núcleos;
+      los argumentos se serializan)
+    - max_workers: tamaño del pool (None = núcleos disponibles)
+    - max_concurrency: cálculos en curso o en cola del pool a la vez (None = max_workers); el
+      resto espera en el loop sin ocupar memoria del pool
+
+    Cancelación: si la corutina que espera se cancela antes de que el cálculo empiece, el cálculo
+    no se ejecuta. Un cálculo ya iniciado no puede interrumpirse: termina en segundo plano, su
+    resultado se descarta y su plaza de concurrencia se libera al acabar, así que la CPU nunca
+    queda sobresuscrita.
+
+    Uso:
+        async with ComputeExecutor(kind="process", max_workers=4) as ex:
+            df = await calculate_td_sequential_async(df, executor=ex)
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = None, max_concurrency: int = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de executor desconocido: '{kind}' (use 'thread' o 'process')")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        if self.max_concurrency <= 0:
+            raise ValueError("max_concurrency debe ser positivo")
+        self._pool = None
+        # Un semáforo por event loop (los semáforos asyncio no se comparten entre loops)
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _get_pool(self):
+        if self._pool is None:
+            cls = ThreadPoolExecutor if self.kind == "thread" else ProcessPoolExecutor
+            self._pool = cls(max_workers=self.max_workers)
+        return self._pool
+
+    async def run(self, fn, *args, **kwargs):
+        """Ejecuta `fn(*args, **kwargs)` en el pool respetando el límite de concurrencia."""
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        await sem.acquire()
+        try:
+            cf = self._get_pool().submit(fn, *args, **kwargs)
+        except BaseException:
+            sem.release()
+            raise
+
+        def release(_):
+            # La plaza se libera cuando el cálculo termina de verdad, aunque se haya cancelado la espera
+            try:
+                loop.call_soon_threadsafe(sem.release)
+            except RuntimeError:  # loop ya cerrado
+                pass
+
+        cf.add_done_callback(release)
+        # wrap_future propaga la cancelación: si aún no ha empezado, el cálculo no se ejecuta
+        return await asyncio.wrap_future(cf)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cierra el pool (se vuelve a crear si se usa de nuevo)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    async def __aenter__(self) -> "ComputeExecutor":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+
+_default_executor = None
+
+
+def _executor(executor: ComputeExecutor) -> ComputeExecutor:
+    global _default_executor
+    if executor is not None:
+        return executor
+    if _default_executor is None:
+        _default_executor = ComputeExecutor()
+    return _default_executor
+
+
+async def calculate_td_sequential_async(df, *args, executor: ComputeExecutor = None, **kwargs):
+    """
+    Versión asíncrona de `calculate_td_sequential` (mismos argumentos) que se ejecuta en `executor`.
+
+    executor: `ComputeExecutor` a usar (None = pool de hilos compartido con un hilo por núcleo)
+    """
+    return await _executor(executor).run(calculate_td_sequential, df, *args, **kwargs)
+
+
+async def calculate_tdst_levels_async(df, *args, executor: ComputeExecutor = None, **kwargs):
+    """
+    Versión asíncrona de `calculate_tdst_levels` (mismos argumentos) que se ejecuta en `executor`.
+
+    executor: `ComputeExecutor` a usar (None = pool de hilos compartido con un hilo por núcleo)
+    """
+    return await _executor(executor).run(calculate_tdst_levels, df, *args, **kwargs)
@@ -0,0 +1,202 @@
+"""
+Backtester vectorizado de estrategias basadas en señales TD Sequential.
+
+Regla soportada (configurable):
+- Entrada al cierre de la barra de una señal (p.ej. Buy Countdown 13).
+- Stop en un nivel tomado en la barra de entrada (p.ej. `tdst_buy`): la posición se cierra en
+  la primera barra posterior cuyo Low (largo) / High (corto) cruza el nivel, al precio del
+  nivel o a la apertura si abre más allá (gap).
+- Salida al cierre de la primera señal de salida posterior (p.ej. Sell Setup 9).
+- Opcionalmente, salida por tiempo tras `max_bars` barras.
+- Una sola posición por símbolo: las entradas mientras hay posición abierta se ignoran.
+
+La resolución de salidas no recorre barra a barra: la siguiente señal de salida se busca
+con `searchsorted` y el primer cruce del stop con ventanas gather de tamaño creciente,
+vectorizadas sobre todas las entradas a la vez. Solo el filtro de posiciones solapadas
+recorre la lista de entradas (no las barras).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+SIGNALS = {
+    "buy_setup": ("buy_setup_count", "setup", 1),
+    "sell_setup": ("sell_setup_count", "setup", -1),
+    "buy_countdown": ("buy_countdown_count", "countdown", 1),
+    "sell_countdown": ("sell_countdown_count", "countdown", -1),
+}
+
+EXIT_SIGNAL = "signal"
+EXIT_STOP = "stop"
+EXIT_TIME = "time"
+EXIT_END = "end"
+
+
+def _signal_positions(df, kind, length_setup, length_countdown):
+    if kind not in SIGNALS:
+        raise ValueError(f"Señal desconocida: '{kind}'. Opciones: {sorted(SIGNALS)}")
+    col, phase, side = SIGNALS[kind]
+    if col not in df.columns:
+        raise ValueError("El DataFrame no contiene columnas TD Sequential. Ejecute calculate_td_sequential primero.")
+    length = length_setup if phase == "setup" else length_countdown
+    return np.flatnonzero(df[col].to_numpy() == length), side
+
+
+def _first_stop_hit(breach, entries, limits, block: int = 64, max_block: int = 4096):
+    """
+    Primera posición j en (entry, limit] con breach(j, k) cierto para cada entrada k,
+    o -1 si no hay. `breach(idx, rows)` evalúa la condición sobre una matriz de índices.
+    """
+    hit = np.full(len(entries), -1, dtype=np.int64)
+    pending = np.arange(len(entries))
+    offset = 1
+    while len(pending):
+        idx = entries[pending, None] + offset + np.arange(block)[None, :]
+        inside = idx <= limits[pending, None]
+        cond = breach(np.minimum(idx, limits[pending, None]), pending) & inside
+        found = cond.any(axis=1)
+        first = cond.argmax(axis=1)
+        hit[pending[found]] = idx[found, first[found]]
+        # Seguir solo con las entradas sin cruce cuya ventana aún no llegó al límite
+        alive = ~found & (idx[:, -1] < limits[pending])
+        pending = pending[alive]
+        offset += block
+        block = min(block * 2, max_block)
+    return hit
+
+
+def backtest_signals(df: pd.DataFrame, entry: str = "buy_countdown", exit: str = "sell_setup",
+                     stop: str = "tdst_buy", max_bars: int = None, symbol_col: str = None,
+                     open_col: str = "Open", high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+                     length_setup: int = 9, length_countdown: int = 13):
+    """
+    Ejecuta el backtest de una regla de señales TD Sequential.
+
+    Parámetros:
+    - df: resultado de `calculate_td_sequential` (+ `calculate_tdst_levels` si se usa stop TDST);
+      para un panel, filas contiguas por símbolo y la columna `symbol_col`
+    - entry: señal de entrada (buy_setup, sell_setup, buy_countdown, sell_countdown);
+      las de compra abren largos y las de venta cortos
+    - exit: señal de salida (None = sin salida por señal)
+    - stop: columna con el nivel de stop tomado en la barra de entrada (None = sin stop)
+    - max_bars: salida por tiempo tras N barras (None = sin límite)
+
+    Retorna:
+    - trades: DataFrame con una fila por operación (entrada/salida, precios, motivo, retorno)
+    - equity: Serie alineada con `df` con la curva de capital por símbolo (empieza en 1.0)
+    """
+    for col in [close_col, high_col, low_col]:
+        if col not in df.columns:
+            raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+    n = len(df)
+    close = df[close_col].to_numpy(dtype=float)
+    high = df[high_col].to_numpy(dtype=float)
+    low = df[low_col].to_numpy(dtype=float)
+    opens = df[open_col].to_numpy(dtype=float) if open_col in df.columns else close
+
+    if symbol_col is not None:
+        codes, _ = pd.factorize(df[symbol_col].to_numpy())
+        if (np.diff(codes) < 0).any():
+            raise ValueError("Las filas de cada símbolo deben ser contiguas (ordene por símbolo y fecha)")
+    else:
+        codes = np.zeros(n, dtype=np.int64)
+    change = np.r_[codes[1:] != codes[:-1], True] if n else np.zeros(0, dtype=bool)
+    ends = np.flatnonzero(change)
+    group_end = np.repeat(ends, np.diff(np.r_[-1, ends]))
+
+    entries, side = _signal_positions(df, entry, length_setup, length_countdown)
+    entries = entries[entries < group_end[entries]]  # hace falta al menos una barra posterior
+    limits = group_end[entries].astype(np.int64)
+    if max_bars is not None:
+        limits = np.minimum(limits, entries + max_bars)
+
+    # Salida por señal: siguiente señal de salida posterior dentro del límite
+    exit_at = np.full(len(entries), -1, dtype=np.int64)
+    if exit is not None:
+        exits, _ = _signal_positions(df, exit, length_setup, length_countdown)
+        k = np.searchsorted(exits, entries, side="right")
+        cand = np.where(k < len(exits), exits[np.minimum(k, len(exits) - 1)], -1) if len(exits) else exit_at
+        exit_at = np.where((cand > entries) & (cand <= limits), cand, -1)
+
+    # Stop: primer cruce del nivel tomado en la barra de entrada
+    stop_at = np.full(len(entries), -1, dtype=np.int64)
+    levels = np.full(len(entries), np.nan)
+    if stop is not None:
+        if stop not in df.columns:
+            raise ValueError(f"Columna '{stop}' no encontrada en DataFrame")
+        levels = df[stop].to_numpy(dtype=float)[entries]
+        has = ~np.isnan(levels)
+        search_limit = np.where(exit_at >= 0, exit_at, limits)
+        if side > 0:
+            def breach(idx, rows):
+                return low[idx] < levels[rows, None]
+        else:
+            def breach(idx, rows):
+                return high[idx] > levels[rows, None]
+        sub = np.flatnonzero(has)
+        if len(sub):
+            hits = _first_stop_hit(lambda idx, rows: breach(idx, sub[rows]), entries[sub], search_limit[sub])
+            stop_at[sub] = hits
+
+    # Resolver salida más temprana y motivo
+    big = np.iinfo(np.int64).max
+    t_exit = np.where(exit_at >= 0, exit_at, big)
+    t_stop = np.where(stop_at >= 0, stop_at, big)
+    exit_bar = np.minimum(np.minimum(t_exit, t_stop), limits)
+    reason = np.where(exit_bar == t_stop, EXIT_STOP, np.where(exit_bar == t_exit, EXIT_SIGNAL,
+                      np.where(exit_bar < group_end[entries], EXIT_TIME, EXIT_END))).astype(object)
+
+    exit_price = close[exit_bar]
+    stopped = reason == EXIT_STOP
+    if stopped.any():
+        lv = levels[stopped]
+        op = opens[exit_bar[stopped]]
+        exit_price[stopped] = np.minimum(lv, op) if side > 0 else np.maximum(lv, op)
+
+    # Una posición por símbolo: descartar entradas mientras hay una abierta
+    keep = np.zeros(len(entries), dtype=bool)
+    busy_until = -1
+    current = None
+    for k in range(len(entries)):
+        g = codes[entries[k]]
+        if g != current:
+            current, busy_until = g, -1
+        if entries[k] > busy_until:
+            keep[k] = True
+            busy_until = exit_bar[k]
+
+    e, x, px, why = entries[keep], exit_bar[keep], exit_price[keep], reason[keep]
+    entry_price = close[e]
+    ret = side * (px / entry_price - 1.0)
+    index = df.index.to_numpy()
+    trades = pd.DataFrame({
+        "symbol": df[symbol_col].to_numpy()[e] if symbol_col is not None else None,
+        "side": side,
+        "entry_bar": e,
+        "entry_time": index[e],
+        "entry_price": entry_price,
+        "exit_bar": x,
+        "exit_time": index[x],
+        "exit_price": px,
+        "reason": why,
+        "bars_held": x - e,
+        "return": ret,
+    })
+
+    # Curva de capital: retornos cierre a cierre mientras hay posición, salida al precio real
+    bar_ret = np.zeros(n)
+    if n > 1:
+        bar_ret[1:] = close[1:] / close[:-1] - 1.0
+    pos = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(pos, e + 1, 1)
+    np.add.at(pos, x + 1, -1)
+    in_pos = np.cumsum(pos)[:n] > 0
+    strat = np.where(in_pos, side * bar_ret, 0.0)
+    strat[x] = side * (px / close[x - 1] - 1.0)
+    growth = np.log1p(strat)
+    csum = np.cumsum(growth)
+    starts = np.r_[0, ends[:-1] + 1] if n else np.zeros(0, dtype=np.int64)
+    base = np.repeat(csum[starts] - growth[starts], np.diff(np.r_[starts, n]))
+    equity = pd.Series(np.exp(csum - base), index=df.index, name="equity")
+    return trades, equity
@@ -0,0 +1,243 @@
+"""
+Construcción de barras OHLC a partir de ticks (trades) en streaming.
+
+`BarBuilder` agrupa ticks en barras de tiempo, de volumen o de número de ticks y
+alimenta cada barra completada directamente a un `TDSequentialState`, sin construir
+un DataFrame intermedio. Las barras completadas se guardan (opcionalmente) en arrays
+NumPy compactos que crecen por bloques.
+
+Reglas de agrupación:
+- Tiempo (`freq`): la barra es el intervalo [k*freq, (k+1)*freq); se cierra con el primer
+  tick del intervalo siguiente o con `flush()`.
+- Ticks (`ticks=N`): se cierra al recibir el N-ésimo tick.
+- Volumen (`volume=V`): el tick pertenece a la barra floor(volumen_acumulado_previo / V)
+  y la barra se cierra cuando el volumen acumulado alcanza (k+1)*V.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .stream import Bar
+
+
+class BarArrays:
+    """Arrays columnares (timestamp ns + OHLCV) con capacidad preasignada que crece por bloques."""
+
+    FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, capacity: int = 1024):
+        self._n = 0
+        self._data = {f: np.empty(capacity, dtype=np.int64 if f == "timestamp" else float) for f in self.FIELDS}
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _reserve(self, extra: int) -> None:
+        need = self._n + extra
+        cap = len(self._data["timestamp"])
+        if need <= cap:
+            return
+        while cap < need:
+            cap *= 2
+        for f, arr in self._data.items():
+            grown = np.empty(cap, dtype=arr.dtype)
+            grown[:self._n] = arr[:self._n]
+            self._data[f] = grown
+
+    def append(self, ts, o, h, l, c, v) -> None:
+        self._reserve(1)
+        i = self._n
+        d = self._data
+        d["timestamp"][i] = ts
+        d["open"][i] = o
+        d["high"][i] = h
+        d["low"][i] = l
+        d["close"][i] = c
+        d["volume"][i] = v
+        self._n += 1
+
+    def as_arrays(self) -> dict:
+        """Vistas (sin copia) de las barras completadas."""
+        return {f: arr[:self._n] for f, arr in self._data.items()}
+
+    def clear(self) -> None:
+        self._n = 0
+
+
+class BarBuilder:
+    """
+    Agregador de ticks a barras OHLC que alimenta TD Sequential en línea.
+
+    Parámetros:
+    - freq: tamaño de barra temporal (p.ej. "1min", "5min", pd.Timedelta)
+    - volume: volumen por barra (barras de volumen)
+    - ticks: número de ticks por barra (barras de ticks)
+    - symbol: símbolo asociado a las barras/eventos
+    - state: `TDSequentialState` al que se envía cada barra completada (opcional)
+    - on_signal: callback llamado con cada `SignalEvent` nuevo (requiere `state`)
+    - keep_bars: guardar las barras completadas en `self.bars`
+
+    Debe indicarse exactamente uno de freq, volume o ticks.
+    """
+
+    def __init__(self, freq=None, volume=None, ticks=None, symbol=None, state=None,
+                 on_signal=None, keep_bars: bool = True):
+        modes = [m for m, v in (("time", freq), ("volume", volume), ("ticks", ticks)) if v is not None]
+        if len(modes) != 1:
+            raise ValueError("Debe indicarse exactamente uno de 'freq', 'volume' o 'ticks'")
+        self.mode = modes[0]
+        if self.mode == "time":
+            self._size = int(pd.Timedelta(freq).value)
+        elif self.mode == "volume":
+            self._size = float(volume)
+        else:
+            self._size = int(ticks)
+        if self._size <= 0:
+            raise ValueError("El tamaño de barra debe ser positivo")
+
+        self.symbol = symbol
+        self.state = state
+        self.on_signal = on_signal
+        self.bars = BarArrays() if keep_bars else None
+        self.last_result = None
+
+        self._n_ticks = 0      # ticks recibidos (modo ticks)
+        self._cum_volume = 0.0  # volumen acumulado (modo volumen)
+        self._key = None       # clave de la barra en curso
+        self._ts = self._open = self._high = self._low = self._close = None
+        self._volume = 0.0
+
+    # ----------------------------
+    # Barra en curso
+    # ----------------------------
+    def _bar_timestamp(self, key, first_ts):
+        return key * self._size if self.mode == "time" else first_ts
+
+    def _is_full(self) -> bool:
+        if self.mode == "ticks":
+            return self._n_ticks % self._size == 0
+        if self.mode == "volume":
+            return self._cum_volume >= (self._key + 1) * self._size
+        return False
+
+    def _complete(self) -> Bar:
+        bar = Bar(self.symbol, pd.Timestamp(self._ts), self._open, self._high, self._low, self._close, self._volume)
+        if self.bars is not None:
+            self.bars.append(self._ts, self._open, self._high, self._low, self._close, self._volume)
+        if self.state is not None:
+            res = self.state.update(self._high, self._low, self._close)
+            self.last_result = res
+            if self.on_signal is not None:
+                for event in self.state.signals(res, self.symbol, bar.timestamp):
+                    self.on_signal(event)
+        self._key = None
+        return bar
+
+    def _key_for(self, ts_ns):
+        if self.mode == "time":
+            return ts_ns // self._size
+        if self.mode == "ticks":
+            return self._n_ticks // self._size
+        return int(self._cum_volume // self._size)
+
+    def add_tick(self, timestamp, price: float, size: float = 0.0):
+        """
+        Procesa un tick. Devuelve la `Bar` completada por este tick o None.
+
+        En barras de tiempo, la barra anterior se completa al llegar el primer tick de la siguiente.
+        """
+        ts = pd.Timestamp(timestamp).value
+        key = self._key_for(ts)
+        completed = None
+        if self._key is not None and key != self._key:
+            completed = self._complete()
+
+        if self._key is None:
+            self._key = key
+            self._ts = self._bar_timestamp(key, ts)
+            self._open = self._high = self._low = price
+            self._volume = 0.0
+        else:
+            if price > self._high:
+                self._high = price
+            if price < self._low:
+                self._low = price
+        self._close = price
+        self._volume += size
+        self._n_ticks += 1
+        self._cum_volume += size
+
+        if self._is_full():
+            completed = self._complete()
+        return completed
+
+    def add_ticks(self, timestamps, prices, sizes=None) -> list:
+        """
+        Procesa un bloque de ticks de forma vectorizada. Devuelve la lista de `Bar` completadas.
+
+        Equivale a llamar a `add_tick` por cada tick, pero agrega OHLCV con `reduceat`.
+        """
+        ts = np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64)
+        prices = np.asarray(prices, dtype=float)
+        sizes = np.zeros(len(prices)) if sizes is None else np.asarray(sizes, dtype=float)
+        m = len(prices)
+        if m == 0:
+            return []
+
+        if self.mode == "time":
+            keys = ts // self._size
+        elif self.mode == "ticks":
+            keys = (self._n_ticks + np.arange(m)) // self._size
+        else:
+            cum_after = np.cumsum(np.r_[self._cum_volume, sizes])[1:]
+            cum_before = np.r_[self._cum_volume, cum_after[:-1]]
+            keys = np.floor(cum_before / self._size).astype(np.int64)
+
+        # Inicio de cada grupo de ticks con la misma clave
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        if self.mode != "time":
+            # En ticks/volumen la barra se cierra en el propio tick que la llena
+            if self.mode == "ticks":
+                full = (self._n_ticks + np.arange(1, m + 1)) % self._size == 0
+            else:
+                full = cum_after >= (keys + 1) * self._size
+            starts = np.union1d(starts, np.flatnonzero(full[:-1]) + 1)
+
+        g_open = prices[starts]
+        g_close = prices[np.r_[starts[1:] - 1, m - 1]]
+        g_high = np.maximum.reduceat(prices, starts)
+        g_low = np.minimum.reduceat(prices, starts)
+        g_vol = np.add.reduceat(sizes, starts)
+        g_keys = keys[starts]
+        g_ts = g_keys * self._size if self.mode == "time" else ts[starts]
+
+        completed = []
+        for j in range(len(starts)):
+            if self._key is not None and g_keys[j] != self._key:
+                completed.append(self._complete())
+            if self._key is None:
+                self._key = int(g_keys[j])
+                self._ts = int(g_ts[j])
+                self._open = float(g_open[j])
+                self._high = float(g_high[j])
+                self._low = float(g_low[j])
+                self._volume = 0.0
+            else:
+                self._high = max(self._high, float(g_high[j]))
+                self._low = min(self._low, float(g_low[j]))
+            self._close = float(g_close[j])
+            self._volume += float(g_vol[j])
+
+            end = starts[j + 1] if j + 1 < len(starts) else m
+            self._n_ticks += int(end - starts[j])
+            if self.mode == "volume":
+                self._cum_volume = float(cum_after[end - 1])
+            if self._is_full():
+                completed.append(self._complete())
+        return completed
+
+    def flush(self):
+        """Completa la barra en curso (p.ej. al cierre de sesión). Devuelve la `Bar` o None."""
+        if self._key is None:
+            return None
+        return self._complete()
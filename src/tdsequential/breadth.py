@@ -0,0 +1,235 @@
+"""
+Amplitud de mercado (breadth): agregados diarios transversales de TD Sequential sobre un universo.
+
+Para cada día, cuántos símbolos completan un Setup 9 o un Countdown 13 de cada lado y qué parte
+de los que tienen un nivel TDST en vigor cierran por encima o por debajo de él. Se calcula sin
+construir el panel barra a barra de todo el universo:
+
+- `compute_breadth(frames)` procesa los símbolos de uno en uno (cualquier iterable, p.ej. un
+  generador que lee ficheros) y solo acumula contadores por día: la memoria es la de un símbolo
+  más O(días).
+- `BreadthAggregator.add_day` acumula en vivo la barra diaria de todo el universo desde un
+  `StateStore` (una actualización vectorizada por día).
+
+Nivel en vigor: el `tdst_buy`/`tdst_sell` de la barra o, si la barra lo rompe, el nivel roto
+(con la regla de invalidación de levels.py un nivel activo al cierre nunca tiene el precio por
+debajo/encima, así que sin esto `below_tdst_buy` y `above_tdst_sell` serían siempre 0).
+
+Con barras intradía un símbolo cuenta una vez por día: una señal si la completa en cualquier
+barra del día y su posición respecto al TDST según la última barra del día.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .core import _get_kernel as _get_td_kernel
+from .levels import _get_kernel as _get_tdst_kernel
+
+
+# Contadores por día (número de símbolos)
+BREADTH_COLUMNS = [
+    "symbols",
+    "buy_setup",
+    "sell_setup",
+    "buy_countdown",
+    "sell_countdown",
+    "tdst_buy_active",
+    "above_tdst_buy",
+    "below_tdst_buy",
+    "tdst_sell_active",
+    "above_tdst_sell",
+    "below_tdst_sell",
+]
+
+# Proporciones calculadas en `to_frame` sobre los símbolos con nivel en vigor
+SHARE_COLUMNS = [
+    "share_above_tdst_buy",
+    "share_below_tdst_buy",
+    "share_above_tdst_sell",
+    "share_below_tdst_sell",
+]
+
+_DAY_NS = 24 * 3600 * 10 ** 9
+
+
+def _day(ts) -> int:
+    """Día (ns desde epoch, a medianoche) de un timestamp; con zona horaria, el día local."""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize().value
+
+
+# Offset final de un texto con hora ("...10:30-05:00", "...10:30:00Z"): se descarta y queda la hora local
+_OFFSET = r"^(.*\d:\d\d(?::\d\d(?:\.\d+)?)?)\s*(?:Z|[+-]\d\d:?\d\d)$"
+
+
+def _days(index) -> np.ndarray:
+    """
+    Días de un índice de fechas (ver `_day`). Un índice de textos u objetos con offsets (aunque
+    sean distintos, p.ej. por cambios de horario) se agrupa también por el día local de cada
+    elemento, como hace `add_day` con el mismo dato.
+    """
+    if not isinstance(index, pd.DatetimeIndex):
+        values = pd.Index(index)
+        if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            values = values.astype(str).str.replace(_OFFSET, r"\1", regex=True)
+        try:
+            index = pd.to_datetime(values)
+        except (TypeError, ValueError):
+            raise ValueError("El índice no se puede convertir a fechas") from None
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    ns = index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return ns - ns % _DAY_NS
+
+
+def _in_force(level, prev, broken):
+    """Nivel de la barra o, si la barra rompe el anterior (y no abre otro), el nivel roto."""
+    return np.where(np.isnan(level) & broken, prev, level)
+
+
+class BreadthAggregator:
+    """
+    Acumulador de `BREADTH_COLUMNS` por día.
+
+    Uso:
+        breadth = BreadthAggregator()
+        for df in frames:                  # un símbolo cada vez
+            breadth.add_symbol(df)
+        daily = breadth.to_frame()
+    """
+
+    def __init__(self, length_setup: int = 9, length_countdown: int = 13):
+        self.length_setup = length_setup
+        self.length_countdown = length_countdown
+        self._days = np.empty(0, dtype=np.int64)
+        self._counts = np.zeros((0, len(BREADTH_COLUMNS)), dtype=np.int64)
+
+    def _accumulate(self, days, values) -> None:
+        """Suma `values` (una fila por día, días únicos y ordenados) en los contadores."""
+        if not len(days):
+            return
+        pos = np.searchsorted(self._days, days)
+        known = pos < len(self._days)
+        known[known] = self._days[pos[known]] == days[known]
+        if not known.all():
+            merged = np.union1d(self._days, days)
+            counts = np.zeros((len(merged), len(BREADTH_COLUMNS)), dtype=np.int64)
+            counts[np.searchsorted(merged, self._days)] = self._counts
+            self._days, self._counts = merged, counts
+            pos = np.searchsorted(merged, days)
+        self._counts[pos] += values
+
+    def add_results(self, index, close, buy_setup_count, sell_setup_count, buy_countdown_count,
+                    sell_countdown_count, tdst_buy, tdst_sell) -> None:
+        """
+        Acumula el histórico ya calculado de un símbolo.
+
+        `tdst_buy`/`tdst_sell` son los niveles en vigor de cada barra (ver la cabecera del
+        módulo); `index` son las fechas de las barras, en orden.
+        """
+        day = _days(index)
+        if not len(day):
+            return
+        if (np.diff(day) < 0).any():
+            raise ValueError("El índice no está ordenado por fecha")
+        starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+        ends = np.r_[starts[1:], len(day)] - 1
+
+        L, LC = self.length_setup, self.length_countdown
+        signals = np.column_stack([
+            np.asarray(buy_setup_count) == L,
+            np.asarray(sell_setup_count) == L,
+            np.asarray(buy_countdown_count) == LC,
+            np.asarray(sell_countdown_count) == LC,
+        ])
+        signals = np.maximum.reduceat(signals, starts, axis=0)
+        close = np.asarray(close, dtype=float)[ends]
+        buy = np.asarray(tdst_buy, dtype=float)[ends]
+        sell = np.asarray(tdst_sell, dtype=float)[ends]
+        values = np.column_stack([
+            np.ones(len(starts), dtype=bool), signals,
+            ~np.isnan(buy), close > buy, close < buy,
+            ~np.isnan(sell), close > sell, close < sell,
+        ])
+        self._accumulate(day[starts], values.astype(np.int64))
+
+    def add_symbol(self, df: pd.DataFrame, high_col: str = "High", low_col: str = "Low",
+                   close_col: str = "Close", engine: str = "auto") -> None:
+        """Calcula TD Sequential y TDST de un símbolo (índice de fechas) y lo acumula."""
+        for col in [close_col, high_col, low_col]:
+            if col not in df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        high = df[high_col].to_numpy(dtype=float)
+        low = df[low_col].to_numpy(dtype=float)
+        close = df[close_col].to_numpy(dtype=float)
+        n = len(close)
+        if n == 0:
+            return
+        _, td_kernel = _get_td_kernel(engine, n)
+        _, tdst_kernel = _get_tdst_kernel(engine, n)
+        out = td_kernel(close, high, low, self.length_setup, self.length_countdown)
+        tdst_buy, tdst_sell = tdst_kernel(high, low, out["buy_setup_count"], out["sell_setup_count"])
+
+        # Nivel de la barra anterior, para recuperar el que se rompe en cada barra
+        prev_buy = np.r_[np.nan, tdst_buy[:-1]]
+        prev_sell = np.r_[np.nan, tdst_sell[:-1]]
+        self.add_results(df.index, close, out["buy_setup_count"], out["sell_setup_count"],
+                         out["buy_countdown_count"], out["sell_countdown_count"],
+                         _in_force(tdst_buy, prev_buy, low < prev_buy),
+                         _in_force(tdst_sell, prev_sell, high > prev_sell))
+
+    def add_day(self, day, store, ids, high, low, close) -> dict:
+        """
+        Procesa la barra diaria de los símbolos `ids` con `store.update` y acumula el día.
+
+        Debe llamarse una vez por día (una barra por símbolo). Retorna el dict de `store.update`.
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        prev_buy = store.tdst_buy[ids].copy()
+        prev_sell = store.tdst_sell[ids].copy()
+        res = store.update(ids, high, low, close)
+        buy = _in_force(res["tdst_buy"], prev_buy, np.asarray(res["tdst_buy_break"], dtype=bool))
+        sell = _in_force(res["tdst_sell"], prev_sell, np.asarray(res["tdst_sell_break"], dtype=bool))
+        close = np.asarray(close, dtype=float)
+        L, LC = self.length_setup, self.length_countdown
+        values = np.array([
+            len(ids),
+            np.count_nonzero(res["buy_setup_count"] == L),
+            np.count_nonzero(res["sell_setup_count"] == L),
+            np.count_nonzero(res["buy_countdown_count"] == LC),
+            np.count_nonzero(res["sell_countdown_count"] == LC),
+            np.count_nonzero(~np.isnan(buy)), np.count_nonzero(close > buy), np.count_nonzero(close < buy),
+            np.count_nonzero(~np.isnan(sell)), np.count_nonzero(close > sell), np.count_nonzero(close < sell),
+        ], dtype=np.int64)
+        self._accumulate(np.array([_day(day)], dtype=np.int64), values[None, :])
+        return res
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame por día con `BREADTH_COLUMNS` y `SHARE_COLUMNS` (NaN sin niveles en vigor)."""
+        df = pd.DataFrame(self._counts, columns=BREADTH_COLUMNS,
+                          index=pd.DatetimeIndex(self._days.view("datetime64[ns]"), name="date"))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for side in ("buy", "sell"):
+                active = df[f"tdst_{side}_active"].to_numpy(dtype=float)
+                active[active == 0] = np.nan
+                for pos in ("above", "below"):
+                    df[f"share_{pos}_tdst_{side}"] = df[f"{pos}_tdst_{side}"].to_numpy() / active
+        return df
+
+
+def compute_breadth(frames, high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+                    length_setup: int = 9, length_countdown: int = 13, engine: str = "auto") -> pd.DataFrame:
+    """
+    Agregados diarios de amplitud de un universo (ver `BreadthAggregator.to_frame`).
+
+    Parámetros:
+    - frames: dict {símbolo: DataFrame OHLC} o iterable de DataFrames (índice de fechas); se
+      procesan de uno en uno, así que un generador mantiene en memoria un único símbolo
+    - engine: motor de cálculo ('auto', 'python' o 'numpy')
+    """
+    breadth = BreadthAggregator(length_setup, length_countdown)
+    for df in (frames.values() if isinstance(frames, dict) else frames):
+        breadth.add_symbol(df, high_col=high_col, low_col=low_col, close_col=close_col, engine=engine)
+    return breadth.to_frame()
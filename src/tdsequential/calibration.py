@@ -0,0 +1,195 @@
+"""
+Selección automática del motor de cálculo (`engine="auto"`) a partir de un perfil de calibración.
+
+El motor más rápido depende de la longitud de la serie y de la máquina: el recorrido en Python
+tiene menos coste fijo con series muy cortas y el motor NumPy gana con series largas. `calibrate`
+ejecuta un microbenchmark corto (menos de un segundo) de cada kernel y motor con varias
+longitudes y guarda los tiempos en un perfil JSON por máquina:
+
+- ruta: variable de entorno `TDSEQUENTIAL_PROFILE` o `~/.cache/tdsequential/engine_profile.json`
+  (respeta `XDG_CACHE_HOME`)
+- el perfil se descarta si cambian los motores disponibles, la versión de NumPy o la de Python
+  (hasta volver a calibrar se usa la regla fija)
+
+Con `engine="auto"` se carga el perfil y se elige el motor con menor tiempo en la longitud
+calibrada más cercana (en escala logarítmica). Sin perfil válido se usa una regla fija (NumPy a
+partir de `STATIC_NUMPY_FROM` barras) y no se mide ni se escribe nada: el perfil solo se crea al
+llamar a `calibrate()` o con `tdsequential calibrate`. El motor elegido se guarda en
+`df.attrs["engine"]` del resultado para poder registrarlo.
+"""
+
+import json
+import math
+import os
+import platform
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .core import _KERNELS as _TD_KERNELS, _td_kernel
+from .levels import _KERNELS as _TDST_KERNELS
+
+
+PROFILE_VERSION = 1
+PROFILE_ENV = "TDSEQUENTIAL_PROFILE"
+DEFAULT_LENGTHS = (32, 128, 512, 2048, 8192)
+# Regla sin perfil: longitud desde la que NumPy suele ganar (cruce medido en torno a 100 barras)
+STATIC_NUMPY_FROM = 100
+
+_KINDS = {"td": _TD_KERNELS, "tdst": _TDST_KERNELS}
+_lock = threading.Lock()
+_profile = None
+_profile_path = None
+_missing = set()  # rutas ya consultadas sin perfil válido (sin un open() por cada cálculo)
+
+
+def profile_path() -> str:
+    """Ruta del perfil de calibración de esta máquina."""
+    path = os.environ.get(PROFILE_ENV)
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "tdsequential", "engine_profile.json")
+
+
+def _environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "engines": sorted(set(_TD_KERNELS) & set(_TDST_KERNELS)),
+    }
+
+
+def _sample(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    return close, high, low
+
+
+def _timeit(fn, min_time: float) -> float:
+    """Mediana de varias repeticiones (cada una de al menos `min_time` segundos o 1 llamada)."""
+    fn()  # calentamiento
+    times = []
+    for _ in range(3):
+        calls = 0
+        t0 = time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - t0
+            if elapsed >= min_time:
+                break
+        times.append(elapsed / calls)
+    return float(np.median(times))
+
+
+def calibrate(lengths=DEFAULT_LENGTHS, path: str = None, save: bool = True, min_time: float = 0.002) -> dict:
+    """
+    Mide cada motor de `calculate_td_sequential` ("td") y `calculate_tdst_levels` ("tdst").
+
+    Parámetros:
+    - lengths: longitudes de serie a medir
+    - path: fichero del perfil (None = `profile_path()`)
+    - save: guardar el perfil (los errores de escritura se ignoran: el perfil queda en memoria)
+    - min_time: duración mínima de cada repetición
+
+    Retorna:
+    - el perfil (dict), que pasa a ser el activo para `engine="auto"`
+    """
+    global _profile, _profile_path
+    lengths = sorted(int(n) for n in lengths)
+    if not lengths or lengths[0] <= 0:
+        raise ValueError("lengths debe contener longitudes positivas")
+    env = _environment()
+    kernels = {kind: {"lengths": lengths, "seconds": {e: [] for e in env["engines"]}} for kind in _KINDS}
+    for n in lengths:
+        close, high, low = _sample(n)
+        counts = _td_kernel(close, high, low, 9, 13)
+        buy, sell = counts["buy_setup_count"], counts["sell_setup_count"]
+        for engine in env["engines"]:
+            td = _TD_KERNELS[engine]
+            tdst = _TDST_KERNELS[engine]
+            kernels["td"]["seconds"][engine].append(
+                _timeit(lambda: td(close, high, low, 9, 13), min_time))
+            kernels["tdst"]["seconds"][engine].append(
+                _timeit(lambda: tdst(high, low, buy, sell), min_time))
+
+    profile = dict(env, version=PROFILE_VERSION, created=datetime.now(timezone.utc).isoformat(),
+                   kernels=kernels)
+    path = path or profile_path()
+    if save:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(profile, fh, indent=2)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    with _lock:
+        _profile, _profile_path = profile, path
+        _missing.clear()
+    return profile
+
+
+def _valid(profile) -> bool:
+    if not isinstance(profile, dict) or profile.get("version") != PROFILE_VERSION:
+        return False
+    env = _environment()
+    return all(profile.get(key) == env[key] for key in ("python", "numpy", "engines")) \
+        and set(profile.get("kernels", {})) == set(_KINDS)
+
+
+def load_profile(path: str = None):
+    """Perfil guardado en `path` (None = `profile_path()`), o None si no existe o está obsoleto."""
+    try:
+        with open(path or profile_path(), encoding="utf-8") as fh:
+            profile = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return profile if _valid(profile) else None
+
+
+def get_profile():
+    """
+    Perfil activo: el ya cargado o el guardado en disco; None si no hay (nunca calibra).
+
+    Que una ruta no tiene perfil se recuerda hasta el siguiente `calibrate()` de este proceso;
+    un perfil creado desde otro proceso (`tdsequential calibrate`) se ve al reiniciar.
+    """
+    global _profile, _profile_path
+    path = profile_path()
+    if path in _missing:
+        return None
+    with _lock:
+        if _profile is not None and _profile_path == path:
+            return _profile
+        profile = load_profile(path)
+        if profile is None:
+            _missing.add(path)
+        else:
+            _profile, _profile_path = profile, path
+        return profile
+
+
+def select_engine(kind: str, n: int) -> str:
+    """
+    Motor más rápido según el perfil para el kernel `kind` ("td" o "tdst") con `n` barras.
+
+    Sin perfil: "numpy" si `n >= STATIC_NUMPY_FROM` y "python" en otro caso.
+    """
+    profile = get_profile()
+    if profile is None:
+        return "numpy" if n >= STATIC_NUMPY_FROM else "python"
+    table = profile["kernels"][kind]
+    lengths = table["lengths"]
+    target = math.log(max(int(n), 1))
+    k = min(range(len(lengths)), key=lambda j: abs(math.log(lengths[j]) - target))
+    seconds = table["seconds"]
+    return min(sorted(seconds), key=lambda e: seconds[e][k])
@@ -0,0 +1,149 @@
+"""
+Recalculo parcial de TD Sequential/TDST cuando se corrige el histórico.
+
+`CheckpointedSeries` calcula la serie completa una vez y guarda un snapshot del estado
+incremental cada `every` barras. Cuando el proveedor revisa barras antiguas (splits,
+prints erróneos), `revise` vuelve al checkpoint más cercano anterior a la primera barra
+modificada y recalcula solo hacia adelante, deteniéndose en cuanto el estado recalculado
+coincide otra vez con el guardado en un checkpoint posterior a la última barra modificada.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .stream import TDSequentialState
+
+
+COUNT_COLUMNS = ["buy_setup_count", "sell_setup_count", "buy_countdown_count", "sell_countdown_count"]
+LEVEL_COLUMNS = ["tdst_buy", "tdst_sell"]
+
+
+class CheckpointedSeries:
+    """
+    Resultado TD Sequential + TDST de una serie con checkpoints periódicos del estado.
+
+    Parámetros:
+    - df: DataFrame OHLC
+    - every: distancia (en barras) entre checkpoints
+    - high_col, low_col, close_col: nombres de columnas
+    - length_setup, length_countdown: igual que en `calculate_td_sequential`
+
+    El checkpoint de la barra k guarda el estado ANTES de procesar la barra k.
+    """
+
+    def __init__(self, df: pd.DataFrame, every: int = 500, high_col: str = "High", low_col: str = "Low",
+                 close_col: str = "Close", length_setup: int = 9, length_countdown: int = 13):
+        if every <= 0:
+            raise ValueError("'every' debe ser positivo")
+        self.every = every
+        self.high_col = high_col
+        self.low_col = low_col
+        self.close_col = close_col
+        self.length_setup = length_setup
+        self.length_countdown = length_countdown
+        self.checkpoints = {}
+        self.last_recomputed = 0
+        self._state = TDSequentialState(length_setup, length_countdown)
+        self._set_data(df)
+        self._counts = np.zeros((0, 4), dtype=int)
+        self._levels = np.zeros((0, 2), dtype=float)
+        self._resize(len(df))
+        self.checkpoints[0] = self._state.snapshot()
+        self._run(0, len(df))
+        self._final = self._state.snapshot()
+
+    def _set_data(self, df: pd.DataFrame) -> None:
+        for col in [self.close_col, self.high_col, self.low_col]:
+            if col not in df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        self.df = df
+        self._high = df[self.high_col].to_numpy(dtype=float)
+        self._low = df[self.low_col].to_numpy(dtype=float)
+        self._close = df[self.close_col].to_numpy(dtype=float)
+
+    def _resize(self, n: int) -> None:
+        counts = np.zeros((n, 4), dtype=int)
+        levels = np.full((n, 2), np.nan)
+        m = min(n, len(self._counts))
+        counts[:m] = self._counts[:m]
+        levels[:m] = self._levels[:m]
+        self._counts, self._levels = counts, levels
+        self.checkpoints = {k: v for k, v in self.checkpoints.items() if k < n or k == 0}
+
+    def _run(self, start: int, stop: int, stop_after: int = None) -> int:
+        """
+        Procesa las barras [start, stop) desde el estado actual.
+
+        Si `stop_after` no es None, se detiene en el primer checkpoint k > stop_after cuyo
+        estado recalculado coincide con el guardado. Devuelve la barra donde se detuvo.
+        """
+        state = self._state
+        every = self.every
+        high, low, close = self._high.tolist(), self._low.tolist(), self._close.tolist()
+        counts, levels = self._counts, self._levels
+        for i in range(start, stop):
+            if i % every == 0:
+                snap = state.snapshot()
+                if stop_after is not None and i > stop_after and self.checkpoints.get(i) == snap:
+                    return i
+                self.checkpoints[i] = snap
+            res = state.update(high[i], low[i], close[i])
+            counts[i] = res[:4]
+            levels[i] = res[4:6]
+        return stop
+
+    def append(self, df_new: pd.DataFrame) -> None:
+        """Añade barras nuevas al final y las procesa incrementalmente."""
+        n_old = len(self.df)
+        self._set_data(pd.concat([self.df, df_new]))
+        self._resize(len(self.df))
+        self._state.restore(self._final)
+        self._run(n_old, len(self.df))
+        self._final = self._state.snapshot()
+
+    def revise(self, df: pd.DataFrame, first_changed: int, last_changed: int = None) -> int:
+        """
+        Sustituye el histórico por `df` (corregido) y recalcula desde el checkpoint previo
+        a `first_changed`.
+
+        Parámetros:
+        - df: histórico completo corregido
+        - first_changed: posición de la primera barra modificada
+        - last_changed: posición de la última barra modificada (None = hasta el final)
+
+        Retorna:
+        - número de barras recalculadas
+        """
+        n_old = len(self.df)
+        self._set_data(df)
+        n = len(df)
+        if n != n_old or last_changed is None:
+            # Si cambia la longitud no hay estados antiguos comparables: recalcular hasta el final
+            last_changed = n - 1
+        self._resize(n)
+
+        start = max(k for k in self.checkpoints if k <= first_changed)
+        self._state.restore(self.checkpoints[start])
+        stop = self._run(start, n, stop_after=last_changed)
+        if stop < n:
+            # El estado volvió a coincidir: restaurar el estado final guardado
+            self._state.restore(self._final)
+        self._final = self._state.snapshot()
+        self.last_recomputed = stop - start
+        return self.last_recomputed
+
+    @property
+    def state(self) -> TDSequentialState:
+        """Copia del estado incremental tras la última barra (para seguir con `update` en vivo)."""
+        state = TDSequentialState(self.length_setup, self.length_countdown)
+        state.restore(self._final)
+        return state
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame de entrada con las columnas TD Sequential y TDST."""
+        out = self.df.copy()
+        for j, col in enumerate(COUNT_COLUMNS):
+            out[col] = self._counts[:, j]
+        for j, col in enumerate(LEVEL_COLUMNS):
+            out[col] = self._levels[:, j]
+        return out
@@ -0,0 +1,428 @@
+"""
+Línea de comandos `tdsequential`.
+
+    tdsequential scan DATA/ "more/**/*.parquet" -o scan.ndjson --workers 8
+    tdsequential serve --port 8765
+    tdsequential calibrate
+    tdsequential replay tests/bkx_data.csv --synthetic 200 --speedup 1e6
+
+`scan` recorre ficheros OHLC (CSV o Parquet) en un pool de procesos y escribe, a medida que
+terminan, un registro por fichero con los conteos de la última barra, los niveles TDST
+activos y la última señal completada. La salida es NDJSON (una línea JSON por fichero, por
+defecto a stdout) o Parquet (por lotes, requiere `pyarrow`); nunca se acumulan todos los
+resultados en memoria. El progreso y el throughput se informan por stderr.
+
+`serve` arranca el servicio local de cálculo de server.py (HTTP sobre TCP o socket Unix).
+`calibrate` mide los motores de cálculo y guarda el perfil que usa `engine="auto"`.
+`replay` reproduce históricos intercalados por fecha por el camino en vivo (ver replay.py) e
+imprime latencias, throughput y la verificación contra el cálculo batch.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from .core import _get_kernel as _get_td_kernel
+from .levels import _get_kernel as _get_tdst_kernel
+from .stream import BUY_COUNTDOWN, BUY_SETUP, SELL_COUNTDOWN, SELL_SETUP
+
+
+EXTENSIONS = (".csv", ".parquet", ".pq")
+# Nombres (sin distinguir mayúsculas) que se toman como columna de fechas por defecto
+INDEX_NAMES = ("date", "datetime", "timestamp", "time")
+
+SCAN_FIELDS = [
+    "file", "symbol", "bars", "timestamp", "close",
+    "buy_setup_count", "sell_setup_count", "buy_countdown_count", "sell_countdown_count",
+    "tdst_buy", "tdst_sell", "last_signal", "last_signal_timestamp", "last_signal_bars_ago", "error",
+]
+
+
+def expand_paths(inputs) -> list:
+    """Ficheros OHLC a partir de directorios (recursivo), globs o rutas; ordenados y sin repetir."""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files += [os.path.join(root, n) for n in names if n.lower().endswith(EXTENSIONS)]
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            files += [p for p in glob.glob(item, recursive=True)
+                      if os.path.isfile(p) and p.lower().endswith(EXTENSIONS)]
+    return sorted(set(files))
+
+
+def _index_column(names, index_col=None, stored=()):
+    """
+    Columna del índice entre `names`: `index_col` si se indica; si no, la primera con nombre de
+    fecha (`INDEX_NAMES`) o, en su defecto, la del índice guardado por pandas (`stored`).
+    None = sin columna de índice (posiciones).
+    """
+    if index_col is not None:
+        if index_col not in names:
+            raise ValueError(f"Columna '{index_col}' no encontrada en DataFrame")
+        return index_col
+    for name in names:
+        if str(name).strip().lower() in INDEX_NAMES:
+            return name
+    return next(iter(stored), None)
+
+
+def read_ohlc(path: str, columns, index_col: str = None) -> pd.DataFrame:
+    """
+    Lee solo las columnas necesarias (y la del índice) de un CSV o Parquet.
+
+    El índice sigue la misma regla en los dos formatos (ver `_index_column`): `index_col`, una
+    columna de fechas (Date, Timestamp...) o el índice que guardó pandas (la primera columna
+    sin nombre de `to_csv` o el índice de los metadatos Parquet).
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as fh:
+            header = next(csv.reader(fh), [])
+        # pandas llama "Unnamed: i" a las columnas sin nombre
+        names = [name if name else f"Unnamed: {i}" for i, name in enumerate(header)]
+        index = _index_column(names, index_col, names[:1] if header[:1] == [""] else ())
+        df = pd.read_csv(path, usecols=lambda c: c in columns or c == index)
+        if index is not None and not header[names.index(index)]:
+            df = df.set_index(index).rename_axis(None)
+    else:
+        from .events import _require_pyarrow
+
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(path)
+        # Columnas del índice guardadas por pandas (un RangeIndex no ocupa columna)
+        stored = [c for c in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)]
+        index = _index_column(schema.names, index_col, stored)
+        # pandas restaura como índice las columnas de `stored`; las demás se leen como columnas
+        df = pd.read_parquet(path, columns=[c for c in schema.names if c in columns or c == index])
+    if index is not None and index in df.columns:
+        df = df.set_index(index)
+    return df[[c for c in df.columns if c in columns]]
+
+
+def _nan_to_none(x):
+    x = float(x)
+    return None if math.isnan(x) else x
+
+
+def scan_file(path: str, high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+              length_setup: int = 9, length_countdown: int = 13, engine: str = "auto",
+              index_col: str = None) -> dict:
+    """
+    Resumen de la última barra de un fichero (ver `SCAN_FIELDS`); los errores se devuelven en `error`.
+
+    `index_col`: columna de fechas de `timestamp` (por defecto la de `read_ohlc`).
+    """
+    record = dict.fromkeys(SCAN_FIELDS)
+    record["file"] = path
+    record["symbol"] = os.path.splitext(os.path.basename(path))[0]
+    try:
+        df = read_ohlc(path, (high_col, low_col, close_col), index_col=index_col)
+        for col in [close_col, high_col, low_col]:
+            if col not in df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        high = df[high_col].to_numpy(dtype=float)
+        low = df[low_col].to_numpy(dtype=float)
+        close = df[close_col].to_numpy(dtype=float)
+        n = len(close)
+        record["bars"] = n
+        if n == 0:
+            return record
+        out = _get_td_kernel(engine, n)[1](close, high, low, length_setup, length_countdown)
+        tdst_buy, tdst_sell = _get_tdst_kernel(engine, n)[1](high, low, out["buy_setup_count"],
+                                                             out["sell_setup_count"])
+
+        record["timestamp"] = str(df.index[-1])
+        record["close"] = _nan_to_none(close[-1])
+        for name in ("buy_setup_count", "sell_setup_count", "buy_countdown_count", "sell_countdown_count"):
+            record[name] = int(out[name][-1])
+        record["tdst_buy"] = _nan_to_none(tdst_buy[-1])
+        record["tdst_sell"] = _nan_to_none(tdst_sell[-1])
+
+        # Última señal completada (mismo orden de prioridad que get_last_signal)
+        best = -1
+        for name, kind, length in [
+            ("sell_countdown_count", SELL_COUNTDOWN, length_countdown),
+            ("buy_countdown_count", BUY_COUNTDOWN, length_countdown),
+            ("sell_setup_count", SELL_SETUP, length_setup),
+            ("buy_setup_count", BUY_SETUP, length_setup),
+        ]:
+            hits = np.flatnonzero(out[name] == length)
+            if len(hits) and hits[-1] >= best:
+                best = hits[-1]
+                record["last_signal"] = kind
+        if best >= 0:
+            record["last_signal_timestamp"] = str(df.index[best])
+            record["last_signal_bars_ago"] = int(n - 1 - best)
+    except Exception as exc:  # un fichero defectuoso no detiene el escaneo
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    return record
+
+
+def _scan_task(args):
+    path, kwargs = args
+    return scan_file(path, **kwargs)
+
+
+class _NDJSONWriter:
+    def __init__(self, fh):
+        self.fh = fh
+
+    def write(self, record: dict) -> None:
+        self.fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.fh.flush()
+
+    def close(self) -> None:
+        if self.fh is not sys.stdout:
+            self.fh.close()
+
+
+class _ParquetWriter:
+    """Escribe los registros por lotes en un único fichero Parquet (row group por lote)."""
+
+    def __init__(self, path: str, batch_size: int = 1024):
+        from .events import _require_pyarrow
+
+        _require_pyarrow()
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ("file", pa.string()), ("symbol", pa.string()), ("bars", pa.int64()), ("timestamp", pa.string()),
+            ("close", pa.float64()), ("buy_setup_count", pa.int16()), ("sell_setup_count", pa.int16()),
+            ("buy_countdown_count", pa.int16()), ("sell_countdown_count", pa.int16()),
+            ("tdst_buy", pa.float64()), ("tdst_sell", pa.float64()), ("last_signal", pa.string()),
+            ("last_signal_timestamp", pa.string()), ("last_signal_bars_ago", pa.int64()), ("error", pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.pending = []
+
+    def write(self, record: dict) -> None:
+        self.pending.append(record)
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.pending:
+            self.writer.write_table(self._pa.Table.from_pylist(self.pending, schema=self.schema))
+            self.pending = []
+
+    def close(self) -> None:
+        self._flush()
+        self.writer.close()
+
+
+def _open_writer(output: str, fmt: str):
+    if fmt is None:
+        fmt = "parquet" if output and output.lower().endswith((".parquet", ".pq")) else "ndjson"
+    if fmt == "parquet":
+        if not output or output == "-":
+            raise ValueError("La salida Parquet requiere un fichero (-o)")
+        return _ParquetWriter(output)
+    fh = sys.stdout if not output or output == "-" else open(output, "w", encoding="utf-8")
+    return _NDJSONWriter(fh)
+
+
+def run_scan(files, writer, workers: int = None, progress=None, progress_every: float = 2.0, **kwargs) -> dict:
+    """
+    Escanea `files` en un pool de procesos escribiendo cada resultado en cuanto termina.
+
+    Parámetros:
+    - writer: objeto con `write(record)`
+    - workers: procesos (None = núcleos disponibles; 0 = en el proceso actual)
+    - progress: flujo de texto para el progreso (None = sin progreso)
+    - kwargs: se pasan a `scan_file`
+
+    Retorna:
+    - dict con files, errors, bars y seconds
+    """
+    total = len(files)
+    stats = {"files": 0, "errors": 0, "bars": 0, "seconds": 0.0}
+    t0 = last = time.monotonic()
+
+    def handle(record):
+        nonlocal last
+        writer.write(record)
+        stats["files"] += 1
+        stats["errors"] += record["error"] is not None
+        stats["bars"] += record["bars"] or 0
+        now = time.monotonic()
+        if progress is not None and (now - last >= progress_every or stats["files"] == total):
+            last = now
+            elapsed = max(now - t0, 1e-9)
+            progress.write(f"[{stats['files']}/{total}] {stats['files'] / elapsed:.1f} ficheros/s, "
+                           f"{stats['bars'] / elapsed:,.0f} barras/s, {stats['errors']} errores\n")
+            progress.flush()
+
+    if workers == 0:
+        for path in files:
+            handle(scan_file(path, **kwargs))
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Ventana acotada de tareas en curso: memoria constante aunque haya muchos ficheros
+            window = 4 * workers
+            pending = set()
+            for path in files:
+                pending.add(pool.submit(_scan_task, (path, kwargs)))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        handle(fut.result())
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    handle(fut.result())
+    stats["seconds"] = time.monotonic() - t0
+    return stats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tdsequential", description="Herramientas TD Sequential")
+    sub = parser.add_subparsers(dest="command")
+
+    scan = sub.add_parser("scan", help="Escanea ficheros OHLC (CSV/Parquet) en paralelo")
+    scan.add_argument("paths", nargs="+", help="Directorios, ficheros o globs (p.ej. 'data/**/*.csv')")
+    scan.add_argument("-o", "--output", default="-", help="Fichero de salida ('-' = stdout)")
+    scan.add_argument("-f", "--format", choices=["ndjson", "parquet"], default=None,
+                      help="Formato de salida (por defecto según la extensión; NDJSON en stdout)")
+    scan.add_argument("-w", "--workers", type=int, default=None,
+                      help="Procesos del pool (por defecto núcleos disponibles; 0 = sin pool)")
+    scan.add_argument("--high-col", default="High")
+    scan.add_argument("--low-col", default="Low")
+    scan.add_argument("--close-col", default="Close")
+    scan.add_argument("--index-col", default=None,
+                      help="Columna de fechas (por defecto Date/Datetime/Timestamp/Time o el índice guardado)")
+    scan.add_argument("--length-setup", type=int, default=9)
+    scan.add_argument("--length-countdown", type=int, default=13)
+    scan.add_argument("-q", "--quiet", action="store_true", help="Sin informe de progreso")
+
+    serve = sub.add_parser("serve", help="Servicio local de cálculo con estado caliente (HTTP)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", default=None, help="Socket Unix en lugar de TCP")
+    serve.add_argument("--batch-window-ms", type=float, default=1.0,
+                       help="Espera máxima para agrupar peticiones en un lote")
+    serve.add_argument("--length-setup", type=int, default=9)
+    serve.add_argument("--length-countdown", type=int, default=13)
+
+    calibrate = sub.add_parser("calibrate", help="Mide los motores y guarda el perfil de engine='auto'")
+    calibrate.add_argument("-o", "--output", default=None, help="Fichero del perfil (por defecto el de la máquina)")
+
+    replay = sub.add_parser("replay", help="Replay acelerado de históricos por el camino en vivo")
+    replay.add_argument("paths", nargs="*", help="Directorios, ficheros o globs OHLC (índice = fecha)")
+    replay.add_argument("--index-col", default=None, help="Columna de fechas (como en scan)")
+    replay.add_argument("--synthetic", type=int, default=0, help="Añadir N símbolos sintéticos")
+    replay.add_argument("--bars", type=int, default=500, help="Barras por símbolo sintético")
+    replay.add_argument("--seed", type=int, default=0)
+    replay.add_argument("--speedup", type=float, default=None,
+                        help="Factor sobre el ritmo real (por defecto sin esperas)")
+    replay.add_argument("--no-verify", action="store_true", help="No comparar con el cálculo batch")
+    replay.add_argument("--length-setup", type=int, default=9)
+    replay.add_argument("--length-countdown", type=int, default=13)
+    return parser
+
+
+def _replay(args) -> int:
+    from .replay import run_replay, synthetic_universe
+
+    frames = {}
+    for path in expand_paths(args.paths):
+        df = read_ohlc(path, ["Open", "High", "Low", "Close"], index_col=args.index_col)
+        frames[os.path.splitext(os.path.basename(path))[0]] = df
+    if args.synthetic:
+        frames.update(synthetic_universe(args.synthetic, args.bars, seed=args.seed))
+    if not frames:
+        print("No hay datos: indique ficheros o --synthetic N", file=sys.stderr)
+        return 1
+    try:
+        report = run_replay(frames, speedup=args.speedup, verify=not args.no_verify,
+                            length_setup=args.length_setup, length_countdown=args.length_countdown)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    print(json.dumps(report, indent=2))
+    return 1 if report["verified"] is False else 0
+
+
+def _calibrate(args) -> int:
+    from .calibration import calibrate, profile_path
+
+    path = args.output or profile_path()
+    profile = calibrate(path=path)
+    for kind, table in profile["kernels"].items():
+        for k, n in enumerate(table["lengths"]):
+            times = ", ".join(f"{e}={table['seconds'][e][k] * 1e3:.3f}ms" for e in sorted(table["seconds"]))
+            print(f"{kind:5s} {n:>7d} barras: {times}")
+    print(f"Perfil guardado en {path}", file=sys.stderr)
+    return 0
+
+
+def _serve(args) -> int:
+    import asyncio
+
+    from .server import TDServer, TDService
+
+    service = TDService(length_setup=args.length_setup, length_countdown=args.length_countdown,
+                        batch_window=args.batch_window_ms / 1e3)
+    server = TDServer(service, host=args.host, port=args.port, path=args.unix)
+    print(f"Sirviendo en {args.unix or f'http://{args.host}:{args.port}'}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(service.latency_summary(), indent=2), file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        return _serve(args)
+    if args.command == "calibrate":
+        return _calibrate(args)
+    if args.command == "replay":
+        return _replay(args)
+    if args.command != "scan":
+        parser.print_help()
+        return 2
+
+    files = expand_paths(args.paths)
+    if not files:
+        print("No se encontraron ficheros CSV/Parquet", file=sys.stderr)
+        return 1
+    try:
+        writer = _open_writer(args.output, args.format)
+    except (ValueError, ImportError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    try:
+        stats = run_scan(files, writer, workers=args.workers, progress=None if args.quiet else sys.stderr,
+                         high_col=args.high_col, low_col=args.low_col, close_col=args.close_col,
+                         length_setup=args.length_setup, length_countdown=args.length_countdown,
+                         index_col=args.index_col)
+    finally:
+        writer.close()
+    if not args.quiet:
+        print(f"{stats['files']} ficheros, {stats['bars']:,} barras en {stats['seconds']:.2f}s "
+              f"({stats['errors']} errores)", file=sys.stderr)
+    return 0 if stats["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,18 +13,372 @@ Ajustado para que el resultado sea consistente con la lógica del código del gr
       Buy:  Close[i] <= Low[i-2]
       Sell: Close[i] >= High[i-2]
   - Se cancela SOLO si aparece un Setup contrario completado (un 9 contrario) DESPUÉS.
+  - Un nuevo Setup del mismo lado reinicia el countdown en curso (recycle).
   - Puede haber "pausas": si no cumple condición, el valor en esa barra es 0.
   - Si llega a 13, se marca 13 en esa barra.
 
+- Calificadores (opcionales, `return_flags=True`), calculados en la misma pasada:
+  - Setup perfeccionado: Buy  min(Low[8], Low[9]) <= min(Low[6], Low[7])
+                         Sell max(High[8], High[9]) >= max(High[6], High[7])
+  - Countdown perfeccionado: Buy Low[13] <= Close[8], Sell High[13] >= Close[8]
+    (barras 8 y 13 del countdown).
+  - 13 diferido: 13 impreso pero no perfeccionado.
+  - Setup recycle: Setup completado mientras el countdown del mismo lado estaba activo.
+
 Nota:
-- Esta implementación calcula setups y luego aplica countdown por cada setup completado,
-  como en tu código del gráfico, en vez de un único countdown global.
+- Setup, countdown y calificadores se calculan en un único recorrido de las barras. Mantener
+  un único countdown por lado (reiniciado por cada setup del mismo lado) da exactamente el
+  mismo conteo que aplicar un countdown por cada setup completado como en el gráfico.
+
+Motores (`engine=`):
+- "python": el recorrido barra a barra (`_td_kernel`).
+- "numpy": el mismo resultado solo con operaciones NumPy en bloque (`_td_kernel_numpy`). NumPy
+  libera el GIL dentro de esas operaciones y el kernel no comparte estado, así que varios hilos
+  pueden calcular símbolos distintos en paralelo (también en CPython sin GIL, 3.13+).
+- "auto" (por defecto): el más rápido para la longitud de la serie según el perfil de
+  calibración de la máquina, o una regla fija sin perfil (ver calibration.py). El motor usado
+  queda en `attrs["engine"]`.
+
+Tipos de precio (`preserve_dtype=True`):
+- Los precios float32 o enteros (p.ej. ticks) se usan tal cual, sin convertir ni copiar a float64.
+- Todas las condiciones son comparaciones entre precios del mismo tipo, y convertir float32 o
+  enteros (|x| < 2**53) a float64 es exacto, así que el resultado es idéntico al del modo por
+  defecto sobre los mismos datos. Lo que cambia es guardar en float32 precios que eran float64:
+  dos precios distintos que redondean al mismo float32 pasan a ser un empate, y los empates
+  cuentan en las condiciones no estrictas (countdown: Close <= Low[i-2], Close >= High[i-2])
+  pero no en las estrictas (setup y flip: Close < Close[i-4], ...; ruptura TDST: Low < nivel).
+  Con precios de hasta ~7 cifras significativas (p.ej. 2 decimales por debajo de 100.000) el
+  redondeo a float32 conserva el orden y los empates, y los conteos no cambian.
 """
 
 import pandas as pd
 import numpy as np
 
 
+FLAG_COLUMNS = [
+    "buy_setup_perfected",
+    "sell_setup_perfected",
+    "buy_countdown_perfected",
+    "sell_countdown_perfected",
+    "buy_countdown_deferred",
+    "sell_countdown_deferred",
+    "buy_setup_recycle",
+    "sell_setup_recycle",
+]
+
+
+def _td_kernel(close, high, low, length_setup, length_countdown, apply_perfection=True, flags=False):
+    """
+    Recorrido único de Setup + Countdown (+ calificadores si `flags`).
+
+    Retorna:
+    - dict columna -> array (conteos int y, si `flags`, columnas de `FLAG_COLUMNS` en int8)
+    """
+    n = len(close)
+    buy_setup_count = np.zeros(n, dtype=int)
+    sell_setup_count = np.zeros(n, dtype=int)
+    buy_countdown_count = np.zeros(n, dtype=int)
+    sell_countdown_count = np.zeros(n, dtype=int)
+    out = {
+        "buy_setup_count": buy_setup_count,
+        "sell_setup_count": sell_setup_count,
+        "buy_countdown_count": buy_countdown_count,
+        "sell_countdown_count": sell_countdown_count,
+    }
+    if flags:
+        f = {name: np.zeros(n, dtype=np.int8) for name in FLAG_COLUMNS}
+        out.update(f)
+
+    buy_count = 0
+    sell_count = 0
+    buy_cd = 0
+    sell_cd = 0
+    buy_active = False
+    sell_active = False
+    buy_close8 = None
+    sell_close8 = None
+
+    for i in range(n):
+        buy_done = False
+        sell_done = False
+
+        # ----------------------------
+        # 1) SETUP (requiere i-5)
+        # ----------------------------
+        if i >= 5:
+            if (close[i] < close[i - 4]) and (close[i - 1] > close[i - 5]):
+                # Bearish Flip -> inicia Buy Setup y rompe el Sell en curso
+                sell_count = 0
+                buy_count = 1
+                buy_setup_count[i] = 1
+            elif (close[i] > close[i - 4]) and (close[i - 1] < close[i - 5]):
+                # Bullish Flip -> inicia Sell Setup y rompe el Buy en curso
+                buy_count = 0
+                sell_count = 1
+                sell_setup_count[i] = 1
+            else:
+                if buy_count > 0:
+                    if close[i] < close[i - 4]:
+                        buy_count += 1
+                        buy_setup_count[i] = buy_count
+                        if buy_count == length_setup:
+                            buy_done = True
+                            buy_count = 0
+                    else:
+                        buy_count = 0
+                if sell_count > 0:
+                    if close[i] > close[i - 4]:
+                        sell_count += 1
+                        sell_setup_count[i] = sell_count
+                        if sell_count == length_setup:
+                            sell_done = True
+                            sell_count = 0
+                    else:
+                        sell_count = 0
+
+        # ----------------------------
+        # 2) COUNTDOWN: un setup completado (re)inicia su lado y cancela el contrario
+        # ----------------------------
+        if buy_done:
+            if flags:
+                f["buy_setup_perfected"][i] = min(low[i], low[i - 1]) <= min(low[i - 3], low[i - 2])
+                f["buy_setup_recycle"][i] = buy_active
+            buy_active = True
+            buy_cd = 0
+            buy_close8 = None
+            sell_active = False
+        if sell_done:
+            if flags:
+                f["sell_setup_perfected"][i] = max(high[i], high[i - 1]) >= max(high[i - 3], high[i - 2])
+                f["sell_setup_recycle"][i] = sell_active
+            sell_active = True
+            sell_cd = 0
+            sell_close8 = None
+            buy_active = False
+
+        # Condición Buy Countdown: Close <= Low[i-2]
+        if buy_active and i >= 2 and close[i] <= low[i - 2]:
+            buy_cd += 1
+            buy_countdown_count[i] = buy_cd
+            if buy_cd == 8:
+                buy_close8 = close[i]
+            if buy_cd == length_countdown:
+                buy_active = False
+                if flags:
+                    perfected = (not apply_perfection or buy_close8 is None or low[i] <= buy_close8)
+                    f["buy_countdown_perfected"][i] = perfected
+                    f["buy_countdown_deferred"][i] = not perfected
+
+        # Condición Sell Countdown: Close >= High[i-2]
+        if sell_active and i >= 2 and close[i] >= high[i - 2]:
+            sell_cd += 1
+            sell_countdown_count[i] = sell_cd
+            if sell_cd == 8:
+                sell_close8 = close[i]
+            if sell_cd == length_countdown:
+                sell_active = False
+                if flags:
+                    perfected = (not apply_perfection or sell_close8 is None or high[i] >= sell_close8)
+                    f["sell_countdown_perfected"][i] = perfected
+                    f["sell_countdown_deferred"][i] = not perfected
+
+    return out
+
+
+def _runs(cond, flip, length):
+    """
+    Conteo de setup vectorizado: posición dentro de cada racha de `cond`, solo si la racha empieza
+    con un Price Flip y hasta `length` (después el setup está completado y la racha ya no cuenta).
+
+    Un flip exige que la barra anterior no cumpla la condición, así que solo puede ocurrir al
+    inicio de una racha y cada racha empieza siempre con el contador a 0. Como en `_td_kernel`,
+    el flip (conteo 1) no completa el setup: con `length` < 2 la racha cuenta sin límite.
+    """
+    n = len(cond)
+    idx = np.arange(n)
+    start = cond.copy()
+    start[1:] &= ~cond[:-1]
+    first = np.maximum.accumulate(np.where(start, idx, 0))
+    pos = idx - first + 1
+    counting = cond & flip[first]
+    if length > 1:
+        counting &= pos <= length
+    return np.where(counting, pos, 0)
+
+
+def _countdown(cond, done, other_done, length_countdown, first=None):
+    """
+    Countdown vectorizado: número de barras con `cond` desde el último setup completado de su lado
+    (inclusive), mientras no haya un setup contrario posterior y sin pasar de `length_countdown`.
+
+    `first`: inicio del segmento de cada barra (ver `_segment_starts`); los setups de segmentos
+    anteriores no cuentan.
+
+    Retorna:
+    - (conteo visible, countdown activo al cerrar cada barra, inicio de la época o -1)
+    """
+    n = len(cond)
+    idx = np.arange(n)
+    last = np.maximum.accumulate(np.where(done, idx, -1))
+    last_other = np.maximum.accumulate(np.where(other_done, idx, -1))
+    if first is not None:
+        last = np.where(last >= first, last, -1)
+        last_other = np.where(last_other >= first, last_other, -1)
+    epoch = np.maximum(last, 0)
+    cum = np.cumsum(cond)
+    k = cum - (cum[epoch] - cond[epoch])
+    active = last > last_other
+    return np.where(active & cond & (k <= length_countdown), k, 0), active & (k < length_countdown), last
+
+
+def _segment_starts(n: int, starts) -> np.ndarray:
+    """Inicio del segmento de cada posición; `starts` son los inicios en orden (el primero, 0)."""
+    starts = np.asarray(starts, dtype=np.int64)
+    return np.repeat(starts, np.diff(np.r_[starts, n]))
+
+
+def _py_min(a, b):
+    # min() de Python (misma semántica con NaN que el recorrido barra a barra)
+    return np.where(b < a, b, a)
+
+
+def _py_max(a, b):
+    return np.where(b > a, b, a)
+
+
+def _td_kernel_numpy(close, high, low, length_setup, length_countdown, apply_perfection=True, flags=False,
+                     starts=None):
+    """
+    Igual que `_td_kernel` pero solo con operaciones NumPy en bloque (sin bucle por barra).
+
+    `starts`: posiciones donde empieza cada serie si se pasan varias concatenadas (la primera,
+    0). El estado se reinicia en cada una, igual que llamando al kernel por separado.
+
+    Retorna:
+    - dict columna -> array (mismos tipos y valores que `_td_kernel`)
+    """
+    close = np.asarray(close)
+    high = np.asarray(high)
+    low = np.asarray(low)
+    n = len(close)
+    idx = np.arange(n)
+
+    # Setup (requiere i-5)
+    lt = np.zeros(n, dtype=bool)
+    gt = np.zeros(n, dtype=bool)
+    prev_gt = np.zeros(n, dtype=bool)
+    prev_lt = np.zeros(n, dtype=bool)
+    if n > 5:
+        lt[5:] = close[5:] < close[1:-4]
+        gt[5:] = close[5:] > close[1:-4]
+        prev_gt[5:] = close[4:-1] > close[:-5]
+        prev_lt[5:] = close[4:-1] < close[:-5]
+    first = None
+    if starts is not None:
+        # Sin barras i-5 / i-2 del mismo segmento no hay condición (nada cruza de una serie a otra)
+        first = _segment_starts(n, starts)
+        local = idx - first
+        lt &= local >= 5
+        gt &= local >= 5
+    buy_setup_count = _runs(lt, lt & prev_gt, length_setup)
+    sell_setup_count = _runs(gt, gt & prev_lt, length_setup)
+    buy_done = (buy_setup_count == length_setup) & (length_setup > 1)
+    sell_done = (sell_setup_count == length_setup) & (length_setup > 1)
+
+    # Countdown: Close <= Low[i-2] / Close >= High[i-2]
+    cond_b = np.zeros(n, dtype=bool)
+    cond_s = np.zeros(n, dtype=bool)
+    if n > 2:
+        cond_b[2:] = close[2:] <= low[:-2]
+        cond_s[2:] = close[2:] >= high[:-2]
+    if first is not None:
+        cond_b &= local >= 2
+        cond_s &= local >= 2
+    buy_countdown_count, buy_active, buy_last = _countdown(cond_b, buy_done, sell_done, length_countdown, first)
+    sell_countdown_count, sell_active, sell_last = _countdown(cond_s, sell_done, buy_done, length_countdown, first)
+
+    out = {
+        "buy_setup_count": buy_setup_count,
+        "sell_setup_count": sell_setup_count,
+        "buy_countdown_count": buy_countdown_count,
+        "sell_countdown_count": sell_countdown_count,
+    }
+    if not flags:
+        return out
+
+    f = {name: np.zeros(n, dtype=np.int8) for name in FLAG_COLUMNS}
+    out.update(f)
+    for side, done, count, active, last, cmp in [
+        ("buy", buy_done, buy_countdown_count, buy_active, buy_last, np.less_equal),
+        ("sell", sell_done, sell_countdown_count, sell_active, sell_last, np.greater_equal),
+    ]:
+        d = np.flatnonzero(done)
+        if side == "buy":
+            f["buy_setup_perfected"][d] = _py_min(low[d], low[d - 1]) <= _py_min(low[d - 3], low[d - 2])
+        else:
+            f["sell_setup_perfected"][d] = _py_max(high[d], high[d - 1]) >= _py_max(high[d - 3], high[d - 2])
+        # Recycle: el countdown del mismo lado seguía activo al cerrar la barra anterior
+        f[f"{side}_setup_recycle"][d] = active[d - 1]
+        # Perfección del 13: extremo de la barra 13 frente al cierre de la barra 8 de la misma época
+        t = np.flatnonzero(count == length_countdown)
+        eight = np.maximum.accumulate(np.where(count == 8, idx, -1))[t]
+        has8 = eight >= last[t]
+        extreme = low[t] if side == "buy" else high[t]
+        perfected = ~has8 | cmp(extreme, close[np.maximum(eight, 0)])
+        if not apply_perfection:
+            perfected[:] = True
+        f[f"{side}_countdown_perfected"][t] = perfected
+        f[f"{side}_countdown_deferred"][t] = ~perfected
+    return out
+
+
+_KERNELS = {"python": _td_kernel, "numpy": _td_kernel_numpy}
+ENGINES = tuple(_KERNELS)
+
+
+def _get_kernel(engine: str, n: int):
+    """(motor, kernel) para `engine`; "auto" se resuelve con el perfil de calibración (o la regla fija sin perfil)."""
+    if engine == "auto":
+        from .calibration import select_engine
+
+        engine = select_engine("td", n)
+    kernel = _KERNELS.get(engine)
+    if kernel is None:
+        raise ValueError(f"Motor desconocido: '{engine}' (use 'auto' o uno de {', '.join(ENGINES)})")
+    return engine, kernel
+
+
+def _price_arrays(df: pd.DataFrame, columns, preserve_dtype: bool) -> list:
+    """
+    Arrays de precios de `columns`: float64 o, con `preserve_dtype`, en su tipo original.
+
+    Con `preserve_dtype` se validan los tipos: numéricos no booleanos, sin mezclar enteros con
+    decimales y sin valores ausentes en columnas enteras (nullable).
+    """
+    if not preserve_dtype:
+        return [df[col].to_numpy(dtype=float) for col in columns]
+    arrays = []
+    for col in columns:
+        s = df[col]
+        numpy_dtype = getattr(s.dtype, "numpy_dtype", None)  # Int64, Float32... (nullable)
+        if numpy_dtype is not None and not isinstance(s.dtype, np.dtype):
+            if numpy_dtype.kind in "iu" and s.isna().any():
+                raise ValueError(f"Columna '{col}' de enteros con valores ausentes")
+            arr = s.to_numpy(dtype=numpy_dtype, na_value=np.nan if numpy_dtype.kind == "f" else None)
+        else:
+            arr = s.to_numpy()
+        if arr.dtype.kind not in "iuf":
+            raise ValueError(f"Columna '{col}' no es numérica ({arr.dtype})")
+        arrays.append(arr)
+    kinds = {arr.dtype.kind for arr in arrays}
+    common = np.result_type(*arrays)
+    # Enteros con decimales, o int64 con uint64 (se promocionan a float64): conversión no exacta
+    if ("f" in kinds and len(kinds) > 1) or (common.kind == "f" and kinds != {"f"}):
+        raise ValueError("Las columnas de precios mezclan tipos sin conversión exacta: "
+                         + ", ".join(str(arr.dtype) for arr in arrays))
+    return [arr.astype(common, copy=False) for arr in arrays]
+
+
 def calculate_td_sequential(
     df: pd.DataFrame,
     open_col: str = "Open",
@@ -33,8 +387,31 @@ def calculate_td_sequential(
     close_col: str = "Close",
     length_setup: int = 9,
     length_countdown: int = 13,
-    apply_perfection: bool = True,  # se mantiene por compatibilidad (no altera el conteo)
+    apply_perfection: bool = True,  # solo afecta a los calificadores (no altera el conteo)
+    return_flags: bool = False,
+    engine: str = "auto",
+    preserve_dtype: bool = False,
 ) -> pd.DataFrame:
+    """
+    Calcula Setup y Countdown TD Sequential.
+
+    Parámetros adicionales:
+    - apply_perfection: evalúa la perfección del countdown en los calificadores; con False
+      todos los 13 se consideran perfeccionados (ninguno diferido). No altera los conteos.
+    - return_flags: añade las columnas int8 de `FLAG_COLUMNS` (1 en la barra del 9 / 13)
+    - engine: "auto" (según la calibración), "python" (recorrido barra a barra) o "numpy"
+      (operaciones en bloque que liberan el GIL); todos dan el mismo resultado
+    - preserve_dtype: usar los precios en su tipo (float32, float64 o enteros) sin convertirlos
+      a float64; ver la nota sobre empates al inicio del módulo
+
+    Retorna:
+    - copia de `df` con buy_setup_count, sell_setup_count, buy_countdown_count,
+      sell_countdown_count (y los calificadores si `return_flags`); `attrs["engine"]` indica
+      el motor usado
+    """
+    if engine != "auto":
+        _get_kernel(engine, 0)
+
     # Copiar DataFrame para no modificar el original
     df_res = df.copy()
 
@@ -43,142 +420,16 @@ def calculate_td_sequential(
         if col not in df_res.columns:
             raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
 
-    close = df_res[close_col].to_numpy(dtype=float)
-    high = df_res[high_col].to_numpy(dtype=float)
-    low = df_res[low_col].to_numpy(dtype=float)
-    n = len(df_res)
-
-    # ----------------------------
-    # 1) SETUP (mismo estilo gráfico)
-    # ----------------------------
-    buy_setup_count = np.zeros(n, dtype=int)
-    sell_setup_count = np.zeros(n, dtype=int)
-
-    completed_buy_setups = []   # índices donde buy_setup_count == 9
-    completed_sell_setups = []  # índices donde sell_setup_count == 9
-
-    buy_count = 0
-    sell_count = 0
-
-    # El gráfico itera desde i=5 (requiere i-5)
-    for i in range(5, n):
-        # Bearish Flip -> inicia Buy Setup:
-        # (Close[i] < Close[i-4]) and (Close[i-1] > Close[i-5])
-        if (close[i] < close[i - 4]) and (close[i - 1] > close[i - 5]):
-            # rompe sell en curso
-            sell_count = 0
-
-            # inicia buy
-            buy_count = 1
-            buy_setup_count[i] = buy_count
-            continue
-
-        # Bullish Flip -> inicia Sell Setup:
-        # (Close[i] > Close[i-4]) and (Close[i-1] < Close[i-5])
-        if (close[i] > close[i - 4]) and (close[i - 1] < close[i - 5]):
-            # rompe buy en curso
-            buy_count = 0
-
-            # inicia sell
-            sell_count = 1
-            sell_setup_count[i] = sell_count
-            continue
-
-        # Continuar Buy Setup
-        if buy_count > 0:
-            if close[i] < close[i - 4]:
-                buy_count += 1
-                buy_setup_count[i] = buy_count
-                if buy_count == length_setup:
-                    completed_buy_setups.append(i)
-                    buy_count = 0
-            else:
-                # se rompe antes de completar
-                buy_count = 0
-
-        # Continuar Sell Setup
-        if sell_count > 0:
-            if close[i] > close[i - 4]:
-                sell_count += 1
-                sell_setup_count[i] = sell_count
-                if sell_count == length_setup:
-                    completed_sell_setups.append(i)
-                    sell_count = 0
-            else:
-                sell_count = 0
+    close, high, low = _price_arrays(df_res, [close_col, high_col, low_col], preserve_dtype)
 
-    # ----------------------------
-    # 2) COUNTDOWN (igual que gráfico)
-    #    - Por cada setup completado
-    #    - Cancela solo por setup contrario completado
-    # ----------------------------
-    buy_countdown_count = np.zeros(n, dtype=int)
-    sell_countdown_count = np.zeros(n, dtype=int)
+    engine, kernel = _get_kernel(engine, len(close))
+    columns = kernel(close, high, low, length_setup, length_countdown,
+                     apply_perfection=apply_perfection, flags=return_flags)
 
-    contrary_for_buy = set(completed_sell_setups)  # cancela buy countdown
-    contrary_for_sell = set(completed_buy_setups)  # cancela sell countdown
-
-    # Buy countdowns: desde cada setup_index (la barra del 9 incluida)
-    for setup_index in completed_buy_setups:
-        count = 0
-        countdown_bar8_close = None
-
-        for i in range(setup_index, n):
-            # Cancelación SOLO si aparece un setup contrario completado
-            if i in contrary_for_buy:
-                break
-
-            if i < 2:
-                continue
-
-            # Condición Buy Countdown: Close <= Low[i-2]
-            if close[i] <= low[i - 2]:
-                count += 1
-                buy_countdown_count[i] = count
-
-                if apply_perfection and count == 8:
-                    countdown_bar8_close = close[i]
-
-                if count == length_countdown:
-                    # Perfection (no altera conteo; placeholder)
-                    if apply_perfection and countdown_bar8_close is not None:
-                        # Ejemplo regla: Low[13] <= Close[8]
-                        _ = (low[i] <= countdown_bar8_close)
-                    break
-
-    # Sell countdowns: desde cada setup_index (la barra del 9 incluida)
-    for setup_index in completed_sell_setups:
-        count = 0
-        countdown_bar8_close = None
-
-        for i in range(setup_index, n):
-            if i in contrary_for_sell:
-                break
-
-            if i < 2:
-                continue
-
-            # Condición Sell Countdown: Close >= High[i-2]
-            if close[i] >= high[i - 2]:
-                count += 1
-                sell_countdown_count[i] = count
-
-                if apply_perfection and count == 8:
-                    countdown_bar8_close = close[i]
-
-                if count == length_countdown:
-                    if apply_perfection and countdown_bar8_close is not None:
-                        # Ejemplo regla: High[13] >= Close[8]
-                        _ = (high[i] >= countdown_bar8_close)
-                    break
-
-    # ----------------------------
-    # 3) Escribir columnas y retornar
-    # ----------------------------
-    df_res["buy_setup_count"] = buy_setup_count
-    df_res["sell_setup_count"] = sell_setup_count
-    df_res["buy_countdown_count"] = buy_countdown_count
-    df_res["sell_countdown_count"] = sell_countdown_count
+    # Escribir columnas y retornar
+    for name, values in columns.items():
+        df_res[name] = values
+    df_res.attrs["engine"] = engine
 
     return df_res
 
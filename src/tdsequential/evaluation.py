@@ -0,0 +1,179 @@
+"""
+Estudio de eventos vectorizado para evaluar las señales TD Sequential.
+
+Para cada Setup 9 / Countdown 13 calcula retornos a N barras vista, MAE/MFE (máxima
+excursión adversa/favorable) y estadísticas condicionales por tipo de señal. Todo se hace
+con operaciones gather de NumPy (matrices de índices evento x horizonte), sin bucles por
+evento, y funciona sobre un panel multi-símbolo: los horizontes nunca cruzan el final de
+la serie de un símbolo (quedan como NaN).
+
+Convención de signo: los retornos "signed_*" y MAE/MFE se expresan a favor de la señal
+(compra = subida, venta = bajada), de modo que un acierto es siempre signed_ret > 0.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .stream import BUY_COUNTDOWN, BUY_SETUP, SELL_COUNTDOWN, SELL_SETUP
+
+
+SIGNAL_COLUMNS = [
+    ("buy_setup_count", BUY_SETUP, 1),
+    ("sell_setup_count", SELL_SETUP, -1),
+    ("buy_countdown_count", BUY_COUNTDOWN, 1),
+    ("sell_countdown_count", SELL_COUNTDOWN, -1),
+]
+
+
+def _group_ends(n: int, groups) -> np.ndarray:
+    """Última posición del grupo de cada fila (grupos contiguos)."""
+    if groups is None:
+        return np.full(n, n - 1)
+    groups = np.asarray(groups)
+    change = np.r_[groups[1:] != groups[:-1], True]
+    ends = np.flatnonzero(change)
+    return np.repeat(ends, np.diff(np.r_[-1, ends]))
+
+
+def forward_returns(close, bars, horizons=(1, 5, 10, 20), groups=None) -> np.ndarray:
+    """
+    Retornos simples close[bar + h] / close[bar] - 1 para cada evento y horizonte.
+
+    Parámetros:
+    - close: array de cierres (panel concatenado si hay varios símbolos)
+    - bars: posiciones de los eventos en `close`
+    - horizons: horizontes en barras
+    - groups: etiqueta de símbolo por fila (contiguas); un horizonte que sale del grupo es NaN
+
+    Retorna:
+    - matriz (n_eventos, n_horizontes)
+    """
+    close = np.asarray(close, dtype=float)
+    bars = np.asarray(bars, dtype=np.int64)
+    h = np.asarray(horizons, dtype=np.int64)
+    target = bars[:, None] + h[None, :]
+    limit = _group_ends(len(close), groups)[bars][:, None]
+    valid = target <= limit
+    out = close[np.minimum(target, len(close) - 1)] / close[bars][:, None] - 1.0
+    out[~valid] = np.nan
+    return out
+
+
+def excursions(high, low, close, bars, horizon: int, side, groups=None):
+    """
+    MAE y MFE de cada evento en las `horizon` barras siguientes, relativas al cierre del evento.
+
+    Parámetros:
+    - side: +1 (señal de compra) o -1 (venta), escalar o array por evento
+
+    Retorna:
+    - (mae, mfe): arrays por evento; mae <= 0 y mfe >= 0 en términos a favor de la señal.
+      Las ventanas se truncan al final del grupo; sin barras posteriores -> NaN.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    bars = np.asarray(bars, dtype=np.int64)
+    side = np.broadcast_to(np.asarray(side), bars.shape)
+
+    idx = bars[:, None] + np.arange(1, horizon + 1)[None, :]
+    valid = idx <= _group_ends(len(close), groups)[bars][:, None]
+    idx = np.minimum(idx, len(close) - 1)
+    entry = close[bars]
+    hi = np.where(valid, high[idx], -np.inf).max(axis=1)
+    lo = np.where(valid, low[idx], np.inf).min(axis=1)
+    up = hi / entry - 1.0
+    down = lo / entry - 1.0
+
+    buy = side > 0
+    mfe = np.where(buy, up, -down)
+    mae = np.where(buy, down, -up)
+    empty = ~valid.any(axis=1)
+    mfe[empty] = np.nan
+    mae[empty] = np.nan
+    return np.minimum(mae, 0.0), np.maximum(mfe, 0.0)
+
+
+def event_study(df: pd.DataFrame, horizons=(1, 5, 10, 20), symbol_col: str = None,
+                high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+                length_setup: int = 9, length_countdown: int = 13, excursion_horizon: int = None) -> pd.DataFrame:
+    """
+    Tabla de eventos con retornos futuros y MAE/MFE.
+
+    Parámetros:
+    - df: resultado de `calculate_td_sequential`; para un panel, filas de todos los símbolos
+      con la columna `symbol_col` (se ordena de forma estable por símbolo si no es contigua)
+    - horizons: horizontes de retorno en barras
+    - excursion_horizon: ventana de MAE/MFE (por defecto el mayor horizonte)
+
+    Retorna:
+    - DataFrame con symbol, bar, timestamp, kind, side, ret_h / signed_ret_h por horizonte, mae y mfe;
+      `bar` es la posición de la fila del evento en el `df` recibido (`df.iloc[bar]`), también
+      si el panel se reordenó por símbolo internamente
+    """
+    if "buy_setup_count" not in df.columns:
+        raise ValueError("El DataFrame no contiene columnas TD Sequential. Ejecute calculate_td_sequential primero.")
+
+    groups = None
+    rows = None  # posición en el df recibido de cada fila del df (re)ordenado
+    if symbol_col is not None:
+        sym = df[symbol_col].to_numpy()
+        codes, _ = pd.factorize(sym)
+        # factorize numera por orden de aparición: grupos contiguos <=> códigos no decrecientes
+        if (np.diff(codes) < 0).any():
+            order = np.argsort(codes, kind="stable")
+            df = df.iloc[order]
+            codes = codes[order]
+            rows = order
+        groups = codes
+
+    parts = []
+    for col, kind, side in SIGNAL_COLUMNS:
+        length = length_setup if "setup" in col else length_countdown
+        b = np.flatnonzero(df[col].to_numpy() == length)
+        parts.append((b, np.full(len(b), kind, dtype=object), np.full(len(b), side, dtype=np.int8)))
+    bars = np.concatenate([p[0] for p in parts])
+    kinds = np.concatenate([p[1] for p in parts])
+    sides = np.concatenate([p[2] for p in parts])
+    order = np.argsort(bars, kind="stable")
+    bars, kinds, sides = bars[order], kinds[order], sides[order]
+
+    close = df[close_col].to_numpy(dtype=float)
+    rets = forward_returns(close, bars, horizons, groups)
+    mae, mfe = excursions(df[high_col].to_numpy(dtype=float), df[low_col].to_numpy(dtype=float), close,
+                          bars, excursion_horizon or max(horizons), sides, groups)
+
+    out = {
+        "symbol": df[symbol_col].to_numpy()[bars] if symbol_col is not None else None,
+        "bar": bars if rows is None else rows[bars],
+        "timestamp": df.index.to_numpy()[bars],
+        "kind": kinds,
+        "side": sides,
+    }
+    for j, h in enumerate(horizons):
+        out[f"ret_{h}"] = rets[:, j]
+    for j, h in enumerate(horizons):
+        out[f"signed_ret_{h}"] = rets[:, j] * sides
+    out["mae"] = mae
+    out["mfe"] = mfe
+    return pd.DataFrame(out)
+
+
+def summarize_events(events: pd.DataFrame, horizons=(1, 5, 10, 20)) -> pd.DataFrame:
+    """
+    Estadísticas condicionales por tipo de señal: número de eventos, retorno medio/mediano a
+    favor de la señal, tasa de acierto por horizonte y MAE/MFE medios.
+    """
+    rows = {}
+    for kind, g in events.groupby("kind", sort=True):
+        row = {"events": len(g)}
+        for h in horizons:
+            r = g[f"signed_ret_{h}"].to_numpy()
+            valid = ~np.isnan(r)
+            row[f"mean_{h}"] = r[valid].mean() if valid.any() else np.nan
+            row[f"median_{h}"] = np.median(r[valid]) if valid.any() else np.nan
+            row[f"hit_rate_{h}"] = (r[valid] > 0).mean() if valid.any() else np.nan
+        row["mae_mean"] = g["mae"].mean()
+        row["mfe_mean"] = g["mfe"].mean()
+        rows[kind] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,261 @@
+"""
+Extracción y archivo de eventos de señal (Setup 9 / Countdown 13).
+
+- `extract_signal_events`: convierte las columnas de conteo de `calculate_td_sequential`
+  en una tabla de eventos (una fila por señal) con máscaras vectorizadas.
+- `SignalEventStore`: almacén append-only de eventos en ficheros Parquet particionados por
+  mes (`month=YYYY-MM/part-NNNNN.parquet`). Cada `append` escribe un fichero por mes que
+  toca, ordenado por (symbol, timestamp) en row groups pequeños, de modo que las consultas
+  por símbolo y rango de fechas descartan particiones por nombre y row groups por
+  estadísticas min/max, sin leer todo el histórico.
+- Muchos `append` pequeños dejan muchos ficheros por mes; `compact()` los reescribe en uno
+  solo por mes (ordenado por símbolo), con lo que la poda por row group vuelve a ser efectiva.
+
+Requiere `pyarrow` para el almacén (`pip install tdsequential[parquet]`).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .stream import BUY_COUNTDOWN, BUY_SETUP, SELL_COUNTDOWN, SELL_SETUP
+
+
+EVENT_COLUMNS = ["timestamp", "symbol", "kind", "bar", "close"]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            "SignalEventStore requiere 'pyarrow'. Instale con: pip install tdsequential[parquet]"
+        ) from exc
+    return pyarrow
+
+
+def extract_signal_events(df: pd.DataFrame, symbol=None, close_col: str = "Close",
+                          length_setup: int = 9, length_countdown: int = 13) -> pd.DataFrame:
+    """
+    Extrae los eventos de Setup/Countdown completados de un DataFrame con conteos TD Sequential.
+
+    Parámetros:
+    - df: resultado de `calculate_td_sequential` (índice DatetimeIndex para el timestamp)
+    - symbol: símbolo a asignar a los eventos
+    - close_col: columna de cierre (se guarda el precio de la barra de la señal)
+
+    Retorna:
+    - DataFrame con columnas timestamp, symbol, kind, bar (posición) y close,
+      ordenado por barra
+    """
+    if "buy_setup_count" not in df.columns:
+        raise ValueError("El DataFrame no contiene columnas TD Sequential. Ejecute calculate_td_sequential primero.")
+
+    parts = []
+    for col, kind, length in [
+        ("buy_setup_count", BUY_SETUP, length_setup),
+        ("sell_setup_count", SELL_SETUP, length_setup),
+        ("buy_countdown_count", BUY_COUNTDOWN, length_countdown),
+        ("sell_countdown_count", SELL_COUNTDOWN, length_countdown),
+    ]:
+        bars = np.flatnonzero(df[col].to_numpy() == length)
+        parts.append(pd.DataFrame({"bar": bars, "kind": kind}))
+    events = pd.concat(parts, ignore_index=True).sort_values("bar", kind="stable", ignore_index=True)
+
+    bars = events["bar"].to_numpy()
+    timestamps = df.index[bars].to_numpy() if isinstance(df.index, pd.DatetimeIndex) else pd.NaT
+    closes = df[close_col].to_numpy(dtype=float)[bars] if close_col in df.columns else np.nan
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "symbol": symbol,
+        "kind": events["kind"].to_numpy(),
+        "bar": bars.astype(np.int64),
+        "close": closes,
+    }, columns=EVENT_COLUMNS)
+
+
+def _naive_utc(ts) -> pd.Timestamp:
+    """Timestamp sin zona en UTC (misma regla que `SignalEventStore.append`)."""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("timestamp", pa.timestamp("ns")),
+        ("symbol", pa.string()),
+        ("kind", pa.string()),
+        ("bar", pa.int64()),
+        ("close", pa.float64()),
+    ])
+
+
+class SignalEventStore:
+    """
+    Almacén append-only de eventos de señal en Parquet particionado por mes.
+
+    Parámetros:
+    - root: directorio del almacén (se crea si no existe)
+    - row_group_size: filas por row group (más pequeño = poda más fina)
+    """
+
+    def __init__(self, root, row_group_size: int = 4096):
+        _require_pyarrow()
+        self.root = str(root)
+        self.row_group_size = row_group_size
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def _partition_name(month) -> str:
+        return f"month={pd.Timestamp(month).strftime('%Y-%m')}"
+
+    @staticmethod
+    def _month(ts) -> pd.Timestamp:
+        ts = _naive_utc(ts)
+        return pd.Timestamp(ts.year, ts.month, 1)
+
+    def partitions(self) -> list:
+        """Meses (Timestamp del día 1) con eventos almacenados, ordenados."""
+        months = [d[len("month="):] for d in os.listdir(self.root) if d.startswith("month=")]
+        return sorted(pd.Timestamp(f"{m}-01") for m in months)
+
+    @staticmethod
+    def _parts(folder) -> list:
+        return sorted(f for f in os.listdir(folder) if f.startswith("part-") and f.endswith(".parquet"))
+
+    def _files(self, start=None, end=None) -> list:
+        files = []
+        lo = None if start is None else self._month(start)
+        hi = None if end is None else self._month(end)
+        for month in self.partitions():
+            if (lo is not None and month < lo) or (hi is not None and month > hi):
+                continue
+            folder = os.path.join(self.root, self._partition_name(month))
+            files += [os.path.join(folder, f) for f in self._parts(folder)]
+        return files
+
+    def _write(self, folder, table) -> str:
+        """Escribe `table` como el siguiente `part-NNNNN.parquet` de `folder` (rename atómico)."""
+        import pyarrow.parquet as pq
+
+        os.makedirs(folder, exist_ok=True)
+        parts = self._parts(folder)
+        n = int(parts[-1][len("part-"):-len(".parquet")]) + 1 if parts else 0
+        tmp = os.path.join(folder, f".part-{n:05d}.parquet.tmp")
+        pq.write_table(table, tmp, row_group_size=self.row_group_size)
+        path = os.path.join(folder, f"part-{n:05d}.parquet")
+        os.replace(tmp, path)
+        return path
+
+    def append(self, events: pd.DataFrame) -> int:
+        """
+        Añade eventos (columnas de `EVENT_COLUMNS`). Escribe un fichero nuevo por mes,
+        ordenado por (symbol, timestamp). Devuelve el número de filas escritas.
+
+        Conviene agrupar los eventos de muchos símbolos en una sola llamada (o ejecutar
+        `compact()` después): cada llamada añade un fichero a cada mes que toca.
+        """
+        import pyarrow as pa
+
+        missing = [c for c in EVENT_COLUMNS if c not in events.columns]
+        if missing:
+            raise ValueError(f"Faltan columnas de evento: {missing}")
+        if len(events) == 0:
+            return 0
+        events = events[EVENT_COLUMNS].copy()
+        events["timestamp"] = pd.to_datetime(events["timestamp"])
+        if events["timestamp"].dt.tz is not None:
+            events["timestamp"] = events["timestamp"].dt.tz_convert("UTC").dt.tz_localize(None)
+        if events["timestamp"].isna().any():
+            raise ValueError("Todos los eventos deben tener timestamp para particionar por fecha")
+        events["symbol"] = events["symbol"].astype(str)
+        events["bar"] = events["bar"].astype(np.int64)
+
+        for month, part in events.groupby(events["timestamp"].dt.to_period("M"), sort=True):
+            part = part.sort_values(["symbol", "timestamp"], kind="stable")
+            table = pa.Table.from_pandas(part, schema=_schema(), preserve_index=False)
+            self._write(os.path.join(self.root, self._partition_name(month.start_time)), table)
+        return len(events)
+
+    def compact(self) -> int:
+        """
+        Reescribe cada mes con más de un fichero en uno solo ordenado por (symbol, timestamp).
+
+        No debe ejecutarse a la vez que `append`. Si se interrumpe tras escribir el fichero
+        compactado y antes de borrar los anteriores, ese mes queda con eventos duplicados.
+        Devuelve el número de meses compactados.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        compacted = 0
+        for month in self.partitions():
+            folder = os.path.join(self.root, self._partition_name(month))
+            parts = self._parts(folder)
+            if len(parts) < 2:
+                continue
+            table = pa.concat_tables([pq.read_table(os.path.join(folder, f), schema=_schema()) for f in parts])
+            table = table.sort_by([("symbol", "ascending"), ("timestamp", "ascending")])
+            self._write(folder, table)
+            for f in parts:
+                os.remove(os.path.join(folder, f))
+            compacted += 1
+        return compacted
+
+    def append_frame(self, df: pd.DataFrame, symbol, **kwargs) -> int:
+        """Extrae los eventos de un resultado de `calculate_td_sequential` y los añade."""
+        return self.append(extract_signal_events(df, symbol=symbol, **kwargs))
+
+    def append_frames(self, frames: dict, **kwargs) -> int:
+        """
+        Como `append_frame` para {símbolo: resultado} en una sola escritura (un fichero por mes
+        para todos los símbolos).
+        """
+        events = [extract_signal_events(df, symbol=symbol, **kwargs) for symbol, df in frames.items()]
+        return self.append(pd.concat(events, ignore_index=True)) if events else 0
+
+    def query(self, symbol=None, start=None, end=None, kind=None) -> pd.DataFrame:
+        """
+        Eventos filtrados por símbolo, rango [start, end] y tipo (los timestamps con zona
+        horaria se comparan en UTC, igual que se guardan).
+
+        Las particiones fuera del rango de fechas no se abren; dentro de cada fichero,
+        los row groups se descartan por estadísticas de symbol/timestamp.
+        """
+        import pyarrow.dataset as ds
+
+        files = self._files(start, end)
+        if not files:
+            return pd.DataFrame({c: pd.Series(dtype=t) for c, t in [
+                ("timestamp", "datetime64[ns]"), ("symbol", object), ("kind", object),
+                ("bar", np.int64), ("close", float)]})
+
+        expr = None
+
+        def _and(e, cond):
+            return cond if e is None else (e & cond)
+
+        if symbol is not None:
+            expr = _and(expr, ds.field("symbol") == str(symbol))
+        if start is not None:
+            expr = _and(expr, ds.field("timestamp") >= _naive_utc(start).to_datetime64())
+        if end is not None:
+            expr = _and(expr, ds.field("timestamp") <= _naive_utc(end).to_datetime64())
+        if kind is not None:
+            expr = _and(expr, ds.field("kind") == kind)
+
+        table = ds.dataset(files, format="parquet").to_table(filter=expr)
+        out = table.to_pandas()
+        return out.sort_values(["timestamp", "symbol"], kind="stable", ignore_index=True)
+
+    def on_date(self, date, kind=None) -> pd.DataFrame:
+        """Todos los eventos de un día (p.ej. todos los countdown 13 del día D)."""
+        day = pd.Timestamp(date).normalize()
+        return self.query(start=day, end=day + pd.Timedelta(days=1) - pd.Timedelta(1, "ns"), kind=kind)
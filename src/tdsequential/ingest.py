@@ -0,0 +1,146 @@
+"""
+Ingesta por bloques de CSV OHLC muy grandes con memoria acotada.
+
+`iter_csv_results` lee solo las columnas necesarias en bloques de tamaño fijo y los pasa
+por un `TDSequentialState`, que conserva entre bloques el estado de setup/countdown/TDST:
+el resultado es idéntico al de `calculate_tdst_levels(calculate_td_sequential(df))` sobre
+el fichero completo, pero nunca hay más de un bloque en memoria.
+
+Lectores:
+- "pandas": `pd.read_csv(chunksize=..., usecols=...)` (siempre disponible)
+- "pyarrow": lector CSV en streaming de pyarrow (multihilo, más rápido; requiere `pyarrow`).
+  Convierte los decimales con precisión exacta (round-trip), como
+  `pd.read_csv(..., float_precision="round_trip")`; el lector por defecto de pandas puede
+  diferir en el último bit y, con empates exactos, dar conteos distintos.
+
+`ingest_csv` consume todos los bloques y, opcionalmente, escribe los resultados a medida que
+se calculan (CSV o Parquet), devolviendo el estado final para continuar en vivo.
+"""
+
+import pandas as pd
+
+from .stream import TDSequentialState
+
+
+RESULT_COLUMNS = [
+    "buy_setup_count",
+    "sell_setup_count",
+    "buy_countdown_count",
+    "sell_countdown_count",
+    "tdst_buy",
+    "tdst_sell",
+]
+
+
+def _header(path: str) -> list:
+    with open(path, newline="") as fh:
+        return [c.strip() for c in fh.readline().rstrip("\r\n").split(",")]
+
+
+def iter_csv_chunks(path: str, columns, index_col=0, chunksize: int = 100_000, parser: str = "pandas"):
+    """
+    Bloques (DataFrame) de `path` con solo `columns` y el índice `index_col`
+    (posición o nombre de columna; None = sin índice).
+    """
+    if chunksize <= 0:
+        raise ValueError("chunksize debe ser positivo")
+    header = _header(path)
+    for col in columns:
+        if col not in header:
+            raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+    index_name = header[index_col] if isinstance(index_col, int) else index_col
+    wanted = list(columns) + ([index_name] if index_name is not None and index_name not in columns else [])
+
+    if parser == "pandas":
+        reader = pd.read_csv(path, usecols=wanted, chunksize=chunksize)
+        for chunk in reader:
+            yield chunk.set_index(index_name) if index_name is not None else chunk
+    elif parser == "pyarrow":
+        from .events import _require_pyarrow
+
+        _require_pyarrow()
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        # block_size en bytes: aproximación a `chunksize` filas de ~64 bytes
+        read_options = pacsv.ReadOptions(block_size=max(chunksize * 64, 1 << 16))
+        # El índice se deja como texto, igual que con el lector de pandas
+        types = {c: pa.float64() for c in columns}
+        if index_name is not None:
+            types[index_name] = pa.string()
+        convert_options = pacsv.ConvertOptions(include_columns=wanted, column_types=types)
+        with pacsv.open_csv(path, read_options=read_options, convert_options=convert_options) as stream:
+            for batch in stream:
+                chunk = batch.to_pandas()
+                yield chunk.set_index(index_name) if index_name is not None else chunk
+    else:
+        raise ValueError(f"Lector desconocido: '{parser}' (use 'pandas' o 'pyarrow')")
+
+
+def iter_csv_results(path: str, state: TDSequentialState = None, chunksize: int = 100_000,
+                     parser: str = "pandas", index_col=0, high_col: str = "High", low_col: str = "Low",
+                     close_col: str = "Close", length_setup: int = 9, length_countdown: int = 13,
+                     keep_ohlc: bool = False):
+    """
+    Genera, bloque a bloque, los resultados TD Sequential/TDST de un CSV.
+
+    Parámetros:
+    - state: estado del que continuar (p.ej. ingestas incrementales); None = desde cero
+    - chunksize: filas por bloque (acota la memoria)
+    - parser: "pandas" o "pyarrow"
+    - keep_ohlc: incluir High/Low/Close en cada bloque de salida
+
+    Cada bloque es un DataFrame con el índice del fichero y `RESULT_COLUMNS`.
+    """
+    if state is None:
+        state = TDSequentialState(length_setup, length_countdown)
+    columns = [high_col, low_col, close_col]
+    for chunk in iter_csv_chunks(path, columns, index_col=index_col, chunksize=chunksize, parser=parser):
+        res = state.update_many(chunk[high_col].to_numpy(), chunk[low_col].to_numpy(),
+                                chunk[close_col].to_numpy())
+        res.index = chunk.index
+        if keep_ohlc:
+            res = pd.concat([chunk[columns], res], axis=1)
+        yield res
+
+
+def ingest_csv(path: str, output: str = None, state: TDSequentialState = None, chunksize: int = 100_000,
+               parser: str = "pandas", index_col=0, high_col: str = "High", low_col: str = "Low",
+               close_col: str = "Close", length_setup: int = 9, length_countdown: int = 13,
+               keep_ohlc: bool = False) -> TDSequentialState:
+    """
+    Procesa un CSV completo por bloques y devuelve el estado final.
+
+    Parámetros:
+    - output: fichero donde escribir los resultados según se calculan (".csv" o ".parquet";
+      None = no escribir)
+    - resto: ver `iter_csv_results`
+    """
+    if state is None:
+        state = TDSequentialState(length_setup, length_countdown)
+    writer = None
+    first = True
+    try:
+        for res in iter_csv_results(path, state=state, chunksize=chunksize, parser=parser, index_col=index_col,
+                                    high_col=high_col, low_col=low_col, close_col=close_col,
+                                    keep_ohlc=keep_ohlc):
+            if output is None:
+                continue
+            if output.lower().endswith((".parquet", ".pq")):
+                from .events import _require_pyarrow
+
+                _require_pyarrow()
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(res, preserve_index=True)
+                if writer is None:
+                    writer = pq.ParquetWriter(output, table.schema)
+                writer.write_table(table)
+            else:
+                res.to_csv(output, mode="w" if first else "a", header=first)
+            first = False
+    finally:
+        if writer is not None:
+            writer.close()
+    return state
@@ -1,7 +1,11 @@
 import numpy as np
 import pandas as pd
 
-def calculate_tdst_levels(df, high_col='High', low_col='Low') -> pd.DataFrame:
+from .core import _price_arrays, _segment_starts
+
+
+def calculate_tdst_levels(df, high_col='High', low_col='Low', engine='auto',
+                          preserve_dtype=False) -> pd.DataFrame:
     """
     Calcula niveles TDST (Tom DeMark Support/Resistance) tras completar un Setup.
 
@@ -16,48 +20,130 @@ def calculate_tdst_levels(df, high_col='High', low_col='Low') -> pd.DataFrame:
       - 'buy_setup_count' (1..9)
       - 'sell_setup_count' (1..9)
 
+    engine: 'auto' (según la calibración, ver calibration.py), 'python' (recorrido barra a barra)
+    o 'numpy' (operaciones en bloque que liberan el GIL); todos dan el mismo resultado
+
+    preserve_dtype: usar High/Low en su tipo (float32, float64 o enteros) sin convertir a float64
+    (ver `calculate_td_sequential`). Los niveles salen en float32 si los precios son float32 y en
+    float64 en otro caso (los enteros necesitan NaN para "sin nivel").
+
     Retorna:
     - El DataFrame original con dos nuevas columnas:
         - 'tdst_buy'
         - 'tdst_sell'
+      y el motor usado en attrs['tdst_engine']
     """
+    engine, kernel = _get_kernel(engine, len(df))
     df = df.copy()
 
-    # Crear columnas si no existen
-    if 'tdst_buy' not in df.columns:
-        df['tdst_buy'] = np.nan
+    # Las columnas de setup son obligatorias (KeyError si faltan)
+    buy_setup_count = df['buy_setup_count'].to_numpy()
+    sell_setup_count = df['sell_setup_count'].to_numpy()
+    if preserve_dtype:
+        high, low = _price_arrays(df, [high_col, low_col], True)
     else:
-        df['tdst_buy'] = np.nan
+        high = df[high_col].to_numpy(dtype=float)
+        low = df[low_col].to_numpy(dtype=float)
+    dtype = np.float32 if high.dtype == np.float32 else np.float64
+    tdst_buy, tdst_sell = kernel(high, low, buy_setup_count, sell_setup_count, dtype=dtype)
+
+    # Crear/sobrescribir columnas (por posición: no depende del tipo de índice)
+    df['tdst_buy'] = tdst_buy
+    df['tdst_sell'] = tdst_sell
+    df.attrs['tdst_engine'] = engine
+
+    return df
 
-    if 'tdst_sell' not in df.columns:
-        df['tdst_sell'] = np.nan
-    else:
-        df['tdst_sell'] = np.nan
 
-    active_buy_tdst = None
-    active_sell_tdst = None
+def _tdst_kernel(high, low, buy_setup_count, sell_setup_count, dtype=np.float64):
+    """
+    Recorrido de niveles TDST sobre arrays (misma lógica que `calculate_tdst_levels`).
+
+    Retorna:
+    - (tdst_buy, tdst_sell): arrays `dtype` con NaN donde no hay nivel activo
+    """
+    n = len(high)
+    tdst_buy = np.full(n, np.nan, dtype=dtype)
+    tdst_sell = np.full(n, np.nan, dtype=dtype)
+
+    active_buy_tdst = np.nan
+    active_sell_tdst = np.nan
 
-    n = len(df)
     for i in range(n):
         # Invalidar TDST ANTES de asignar (verificar ruptura en barra anterior)
-        if active_buy_tdst is not None and df.loc[i, low_col] < active_buy_tdst:
-            active_buy_tdst = None
+        if low[i] < active_buy_tdst:
+            active_buy_tdst = np.nan
 
-        if active_sell_tdst is not None and df.loc[i, high_col] > active_sell_tdst:
-            active_sell_tdst = None
+        if high[i] > active_sell_tdst:
+            active_sell_tdst = np.nan
 
         # Detectar fin de Buy Setup (vela 9) - usar Low del rango
-        if i >= 8 and df.loc[i, 'buy_setup_count'] == 9:
+        if i >= 8 and buy_setup_count[i] == 9:
             # TDST Buy = Low más bajo de las barras 1-9 del setup (SOPORTE)
-            active_buy_tdst = df.loc[i - 8:i, low_col].min()
+            active_buy_tdst = np.fmin.reduce(low[i - 8:i + 1])
 
         # Detectar fin de Sell Setup (vela 9) - usar High del rango
-        if i >= 8 and df.loc[i, 'sell_setup_count'] == 9:
+        if i >= 8 and sell_setup_count[i] == 9:
             # TDST Sell = High más alto de las barras 1-9 del setup (RESISTENCIA)
-            active_sell_tdst = df.loc[i - 8:i, high_col].max()
+            active_sell_tdst = np.fmax.reduce(high[i - 8:i + 1])
 
         # Asignar niveles actuales (persisten hasta que se rompan)
-        df.at[i, 'tdst_buy'] = active_buy_tdst
-        df.at[i, 'tdst_sell'] = active_sell_tdst
+        tdst_buy[i] = active_buy_tdst
+        tdst_sell[i] = active_sell_tdst
 
-    return df
+    return tdst_buy, tdst_sell
+
+
+def _tdst_side(values, setup_count, reduce, breaks, dtype, first=0):
+    """
+    Nivel TDST de un lado sin bucle por barra: cada 9 abre un segmento con su nivel, que sigue
+    activo hasta la primera ruptura posterior dentro del segmento (suma acumulada segmentada).
+
+    `first`: inicio de la serie de cada barra si hay varias concatenadas (0 = una sola).
+    """
+    n = len(values)
+    idx = np.arange(n)
+    sets = (np.asarray(setup_count) == 9) & (idx - first >= 8)
+    at = np.flatnonzero(sets)
+    level = np.full(n, np.nan, dtype=dtype)
+    level[at] = reduce.reduce(values[at[:, None] + np.arange(-8, 1)], axis=1)
+    seg = np.maximum.accumulate(np.where(sets, idx, -1))
+    has = seg >= first
+    seg = np.maximum(seg, 0)
+    current = np.where(has, level[seg], np.nan)
+    # La barra del 9 solo puede romper el nivel anterior, que se sustituye en esa misma barra
+    broken = breaks(values, current) & ~sets
+    cum = np.cumsum(broken)
+    alive = has & (cum == cum[seg])
+    return np.where(alive, current, np.nan)
+
+
+def _tdst_kernel_numpy(high, low, buy_setup_count, sell_setup_count, dtype=np.float64, starts=None):
+    """
+    Igual que `_tdst_kernel` pero solo con operaciones NumPy en bloque.
+
+    `starts`: inicios de cada serie si se pasan varias concatenadas (ver `_td_kernel_numpy`).
+
+    Retorna:
+    - (tdst_buy, tdst_sell): arrays `dtype` con NaN donde no hay nivel activo
+    """
+    high = np.asarray(high)
+    low = np.asarray(low)
+    first = 0 if starts is None else _segment_starts(len(high), starts)
+    return (_tdst_side(low, buy_setup_count, np.fmin, np.less, dtype, first),
+            _tdst_side(high, sell_setup_count, np.fmax, np.greater, dtype, first))
+
+
+_KERNELS = {'python': _tdst_kernel, 'numpy': _tdst_kernel_numpy}
+
+
+def _get_kernel(engine, n):
+    """(motor, kernel) para `engine`; 'auto' se resuelve con el perfil de calibración (o la regla fija sin perfil)."""
+    if engine == 'auto':
+        from .calibration import select_engine
+
+        engine = select_engine('tdst', n)
+    kernel = _KERNELS.get(engine)
+    if kernel is None:
+        raise ValueError(f"Motor desconocido: '{engine}' (use 'auto' o uno de {', '.join(_KERNELS)})")
+    return engine, kernel
@@ -0,0 +1,106 @@
+"""
+Modo en vivo con memoria acotada para procesos de larga duración.
+
+`LiveTDSequential` combina un `TDSequentialState` (que ya guarda solo las ventanas mínimas
+que exigen las reglas: 6 cierres para Close[i-4]/Close[i-5] y 9 High/Low para Low[i-2],
+High[i-2] y la ventana TDST) con un buffer circular preasignado para las últimas `tail`
+barras que se quieran mostrar. La memoria por símbolo es constante sin importar cuántas
+barras se procesen.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .stream import BarResult, TDSequentialState
+
+
+LIVE_COLUMNS = [
+    "Open",
+    "High",
+    "Low",
+    "Close",
+    "buy_setup_count",
+    "sell_setup_count",
+    "buy_countdown_count",
+    "sell_countdown_count",
+    "tdst_buy",
+    "tdst_sell",
+]
+
+
+class RingBuffer:
+    """
+    Buffer circular preasignado de filas numéricas con timestamp.
+
+    Guarda como máximo `capacity` filas de `width` columnas float64; al llenarse
+    sobrescribe las más antiguas.
+    """
+
+    def __init__(self, capacity: int, width: int):
+        if capacity <= 0:
+            raise ValueError("La capacidad del buffer debe ser positiva")
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._values = np.full((capacity, width), np.nan)
+        self._head = 0   # próxima posición a escribir
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+    def append(self, timestamp: int, row) -> None:
+        h = self._head
+        self._timestamps[h] = timestamp
+        self._values[h] = row
+        self._head = (h + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _order(self) -> np.ndarray:
+        start = (self._head - self._size) % self.capacity
+        return (start + np.arange(self._size)) % self.capacity
+
+    def timestamps(self) -> np.ndarray:
+        """Timestamps (ns) en orden cronológico (copia)."""
+        return self._timestamps[self._order()]
+
+    def values(self) -> np.ndarray:
+        """Filas en orden cronológico (copia)."""
+        return self._values[self._order()]
+
+
+class LiveTDSequential:
+    """
+    TD Sequential en vivo para un símbolo con memoria constante.
+
+    Parámetros:
+    - tail: número de barras recientes que se conservan para mostrar (`frame()`)
+    - length_setup, length_countdown: igual que en `calculate_td_sequential`
+    """
+
+    def __init__(self, tail: int = 500, length_setup: int = 9, length_countdown: int = 13):
+        self.state = TDSequentialState(length_setup, length_countdown)
+        self.buffer = RingBuffer(tail, len(LIVE_COLUMNS))
+
+    @property
+    def n_bars(self) -> int:
+        """Barras procesadas desde el inicio (no solo las que están en el buffer)."""
+        return self.state.n_bars
+
+    def update(self, timestamp, open_: float, high: float, low: float, close: float) -> BarResult:
+        """Procesa una barra y la guarda en el buffer circular."""
+        res = self.state.update(high, low, close)
+        self.buffer.append(pd.Timestamp(timestamp).value, (open_, high, low, close) + tuple(res[:6]))
+        return res
+
+    def frame(self) -> pd.DataFrame:
+        """Últimas `tail` barras con las columnas TD Sequential/TDST, en orden cronológico."""
+        index = pd.DatetimeIndex(self.buffer.timestamps().astype("datetime64[ns]"))
+        df = pd.DataFrame(self.buffer.values(), index=index, columns=LIVE_COLUMNS)
+        for col in LIVE_COLUMNS[4:8]:
+            df[col] = df[col].astype(int)
+        return df
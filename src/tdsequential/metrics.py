@@ -0,0 +1,391 @@
+"""
+Métricas ligeras (latencias, contadores y gauges) para el modo streaming.
+
+`MetricsRegistry` agrupa métricas con nombre (y etiquetas opcionales):
+
+- `Counter`: total acumulado (`inc`).
+- `Gauge`: valor instantáneo (`set`/`inc`/`dec`) o calculado al leer con `fn=` (coste nulo en
+  el camino caliente, p.ej. la profundidad de una cola).
+- `Histogram`: histograma de latencias estilo HDR en nanosegundos enteros, con cubetas
+  log-lineales de error relativo acotado (2**-significant_bits, ~3% por defecto) y rango
+  dinámico ilimitado.
+
+Coste por observación: los valores no se clasifican al registrarlos, se añaden a un buffer que
+se vuelca en las cubetas de forma vectorizada (cada `buffer_size` valores con `record_ns` y en
+cada lectura). Para el camino más caliente `recorder()` devuelve directamente el `append` del
+buffer: una llamada a `list.append`, unas decenas de ns; quien lo use llama a `fold()` de vez en
+cuando para acotar la memoria.
+
+`to_prometheus()` genera el formato de texto de Prometheus (0.0.4) y `start_http_server` lo
+sirve en un hilo para un scrape local. Ver `SignalStream(metrics=...)` en aio.py.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+# Límites `le` (segundos) con que se exportan los histogramas a Prometheus
+PROMETHEUS_BUCKETS = (
+    1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Counter:
+    """Contador monótono."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n=1) -> None:
+        self.value += n
+
+
+class Gauge:
+    """Valor instantáneo; con `fn` se calcula al leerlo."""
+
+    __slots__ = ("value", "fn")
+
+    def __init__(self, fn=None):
+        self.value = 0
+        self.fn = fn
+
+    def set(self, value) -> None:
+        self.value = value
+
+    def inc(self, n=1) -> None:
+        self.value += n
+
+    def dec(self, n=1) -> None:
+        self.value -= n
+
+    def read(self):
+        return self.fn() if self.fn is not None else self.value
+
+
+class Histogram:
+    """
+    Histograma HDR de valores enteros (nanosegundos).
+
+    Los valores menores que 2**(significant_bits + 1) tienen cubeta propia; por encima, cada
+    potencia de 2 se divide en 2**significant_bits cubetas iguales.
+    """
+
+    def __init__(self, significant_bits: int = 5, buffer_size: int = 4096):
+        if not 1 <= significant_bits <= 10:
+            raise ValueError("significant_bits debe estar entre 1 y 10")
+        self.significant_bits = significant_bits
+        self.buffer_size = buffer_size
+        self.counts = np.zeros(2 ** (significant_bits + 1), dtype=np.int64)
+        self.count = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+        self._buf = []
+        self._append = self._buf.append
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Registro
+    # ----------------------------
+    def record_ns(self, ns: int) -> None:
+        """Registra un valor en nanosegundos."""
+        self._append(ns)
+        if len(self._buf) >= self.buffer_size:
+            self.fold()
+
+    def observe(self, seconds: float) -> None:
+        """Registra un valor en segundos."""
+        self.record_ns(int(seconds * 1e9))
+
+    def recorder(self):
+        """`append` del buffer (camino más rápido); el volcado lo hacen las lecturas o `fold()`."""
+        return self._append
+
+    def time(self):
+        """Context manager que registra la duración del bloque."""
+        return _Timer(self)
+
+    def record_many(self, values_ns) -> None:
+        """Registra un array de valores en nanosegundos."""
+        self._add(np.asarray(values_ns, dtype=np.int64))
+
+    def fold(self) -> None:
+        """
+        Vuelca el buffer en las cubetas.
+
+        Se puede llamar desde varios hilos a la vez (p.ej. el hilo del scrape y el del stream):
+        cada volcado se queda con su parte del buffer bajo el lock y la suma a las cubetas
+        fuera de él. Los `append` concurrentes van siempre al final de la lista, así que no
+        se pierden: quedan para el siguiente volcado.
+        """
+        buf = self._buf
+        with self._lock:
+            k = len(buf)
+            if not k:
+                return
+            taken = buf[:k]
+            del buf[:k]
+        self._add(np.array(taken, dtype=np.int64))
+
+    def _index(self, values):
+        S = self.significant_bits
+        values = np.maximum(values, 0)
+        # bit_length exacto vía frexp (exacto para valores < 2**53)
+        bits = np.frexp(values.astype(np.float64))[1].astype(np.int64)
+        shift = np.maximum(bits - (S + 1), 0)
+        return (shift << S) + (values >> shift)
+
+    def _add(self, values) -> None:
+        if not len(values):
+            return
+        idx = self._index(values)
+        with self._lock:
+            top = int(idx.max())
+            if top >= len(self.counts):
+                grown = np.zeros(max(top + 1, 2 * len(self.counts)), dtype=np.int64)
+                grown[:len(self.counts)] = self.counts
+                self.counts = grown
+            self.counts += np.bincount(idx, minlength=len(self.counts))
+            self.count += len(values)
+            self.sum_ns += int(values.sum())
+            self.max_ns = max(self.max_ns, int(values.max()))
+
+    # ----------------------------
+    # Lectura
+    # ----------------------------
+    def _bounds(self, idx):
+        """Límites [inferior, superior] (ns) de las cubetas `idx`."""
+        S = self.significant_bits
+        idx = np.asarray(idx, dtype=np.int64)
+        shift = np.maximum((idx >> S) - 1, 0)
+        mant = idx - (shift << S)
+        return mant << shift, ((mant + 1) << shift) - 1
+
+    def quantile(self, q: float) -> float:
+        """Cuantil `q` (0..1) en segundos (punto medio de su cubeta; NaN sin datos)."""
+        self.fold()
+        if self.count == 0:
+            return float("nan")
+        cum = np.cumsum(self.counts)
+        k = int(np.searchsorted(cum, max(q * self.count, 1), side="left"))
+        lo, hi = self._bounds(k)
+        return min((int(lo) + int(hi)) / 2, self.max_ns) / 1e9
+
+    def summary(self) -> dict:
+        """count, mean, p50, p90, p99, p999 y max en segundos."""
+        self.fold()
+        out = {"count": self.count, "mean": self.sum_ns / self.count / 1e9 if self.count else float("nan")}
+        for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999)):
+            out[name] = self.quantile(q)
+        out["max"] = self.max_ns / 1e9 if self.count else float("nan")
+        return out
+
+    def cumulative(self, bounds_seconds=PROMETHEUS_BUCKETS) -> list:
+        """Número de valores <= cada límite (segundos), para exportar a Prometheus."""
+        self.fold()
+        _, hi = self._bounds(np.arange(len(self.counts)))
+        cum = np.cumsum(self.counts)
+        pos = np.searchsorted(hi, np.asarray(bounds_seconds) * 1e9, side="right")
+        return [int(cum[p - 1]) if p > 0 else 0 for p in pos]
+
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.record_ns(time.perf_counter_ns() - self.t0)
+
+
+class _Family:
+    """Métrica con nombre: un hijo por combinación de etiquetas."""
+
+    def __init__(self, kind, name, help, labelnames, factory):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.factory = factory
+        self.children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        """Hijo para unos valores de etiqueta (posicionales o por nombre)."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"'{self.name}' espera las etiquetas {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self.children.get(key)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(key, self.factory())
+        return child
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas.
+
+    Uso:
+        metrics = MetricsRegistry()
+        latency = metrics.histogram("tdsequential_update_latency_seconds", "Latencia por barra")
+        signals = metrics.counter("tdsequential_signals_total", "Señales", labelnames=("kind",))
+        latency.record_ns(dt)
+        signals.labels(kind="buy_setup").inc()
+        print(metrics.to_prometheus())
+
+    Pedir dos veces el mismo nombre devuelve la misma métrica (varios productores pueden
+    compartir registro).
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+        self.created = time.time()
+
+    def _get(self, kind, name, help, labelnames, factory):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = _Family(kind, name, help, labelnames, factory)
+            elif family.kind != kind or family.labelnames != tuple(labelnames):
+                raise ValueError(f"La métrica '{name}' ya existe con otro tipo o etiquetas")
+        return family if family.labelnames else family.labels()
+
+    def counter(self, name: str, help: str = "", labelnames=()):
+        """`Counter` (o familia con `.labels()` si hay `labelnames`)."""
+        return self._get("counter", name, help, labelnames, Counter)
+
+    def gauge(self, name: str, help: str = "", labelnames=(), fn=None):
+        """
+        `Gauge` (o familia con `.labels()`).
+
+        fn: función llamada al leer; sin etiquetas devuelve un número y con etiquetas un dict
+        {valor de etiqueta (o tupla de valores): número}.
+        """
+        if fn is not None and labelnames:
+            family = self._get("gauge", name, help, labelnames, Gauge)
+            family.fn = fn
+            return family
+        return self._get("gauge", name, help, labelnames, lambda: Gauge(fn))
+
+    def histogram(self, name: str, help: str = "", labelnames=(), significant_bits: int = 5):
+        """`Histogram` en nanosegundos (o familia con `.labels()`); se exporta en segundos."""
+        return self._get("histogram", name, help, labelnames, lambda: Histogram(significant_bits))
+
+    def _samples(self, family):
+        """(etiquetas, métrica) de una familia, incluidas las de un gauge con `fn` por etiquetas."""
+        fn = getattr(family, "fn", None)
+        if fn is not None:
+            out = []
+            for key, value in fn().items():
+                key = key if isinstance(key, tuple) else (key,)
+                out.append((tuple(str(k) for k in key), value))
+            return out
+        return list(family.children.items())
+
+    def snapshot(self) -> dict:
+        """{nombre: valor} o {nombre: {etiquetas: valor}}; los histogramas como `Histogram.summary()`."""
+        out = {}
+        for name, family in list(self._families.items()):
+            values = {}
+            for key, metric in self._samples(family):
+                if isinstance(metric, Histogram):
+                    values[key] = metric.summary()
+                elif isinstance(metric, (Counter, Gauge)):
+                    values[key] = metric.read() if isinstance(metric, Gauge) else metric.value
+                else:
+                    values[key] = metric
+            if family.labelnames:
+                out[name] = {",".join(k): v for k, v in values.items()}
+            else:
+                out[name] = values.get((), 0)
+        return out
+
+    def to_prometheus(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus."""
+        lines = []
+        for name, family in list(self._families.items()):
+            if family.help:
+                lines.append(f"# HELP {name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {name} {family.kind}")
+            for key, metric in self._samples(family):
+                labels = list(zip(family.labelnames, key))
+                if isinstance(metric, Histogram):
+                    for le, c in zip(PROMETHEUS_BUCKETS, metric.cumulative()):
+                        lines.append(f"{name}_bucket{_labels(labels + [('le', repr(le))])} {c}")
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', '+Inf')])} {metric.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {metric.sum_ns / 1e9!r}")
+                    lines.append(f"{name}_count{_labels(labels)} {metric.count}")
+                else:
+                    if isinstance(metric, Gauge):
+                        value = metric.read()
+                    elif isinstance(metric, Counter):
+                        value = metric.value
+                    else:
+                        value = metric
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value) -> str:
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if value.is_integer() and abs(value) < 2 ** 53 else repr(value)
+
+
+def start_http_server(registry: MetricsRegistry, port: int = 9464, host: str = "127.0.0.1"):
+    """
+    Sirve `registry.to_prometheus()` en http://host:port/metrics desde un hilo daemon.
+
+    Retorna:
+    - el servidor (`server.server_address`, `server.shutdown()` para pararlo)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            data = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="tdsequential-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,203 @@
+"""
+Conciliación de nuestras señales con ficheros de referencia de un proveedor (p.ej. Bloomberg).
+
+- `compare_signals`: alinea por timestamp nuestros conteos y niveles TDST con los de la
+  referencia y devuelve una fila por discrepancia (comparación vectorizada columna a columna).
+- `reconcile_symbol`: resumen de un símbolo (número de discrepancias, primera barra divergente
+  y su tipo). Si no se pasa nuestro resultado, se calcula a partir del OHLC de la referencia.
+- `reconcile_universe`: ejecuta `reconcile_symbol` sobre miles de símbolos en paralelo
+  (`concurrent.futures`) y devuelve una tabla resumen con una fila por símbolo.
+
+Tipos de discrepancia (`DIVERGENCE_KINDS`):
+- missing_ours / missing_reference: el timestamp solo existe en uno de los dos lados
+- setup_count / countdown_count: conteos distintos en la misma barra
+- tdst_presence: un lado tiene nivel TDST activo y el otro no
+- tdst_level: ambos tienen nivel pero difieren más que la tolerancia
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .core import calculate_td_sequential
+from .levels import calculate_tdst_levels
+
+
+RECONCILE_COLUMNS = [
+    "buy_setup_count",
+    "sell_setup_count",
+    "buy_countdown_count",
+    "sell_countdown_count",
+    "tdst_buy",
+    "tdst_sell",
+]
+
+DIVERGENCE_KINDS = [
+    "missing_ours",
+    "missing_reference",
+    "setup_count",
+    "countdown_count",
+    "tdst_presence",
+    "tdst_level",
+]
+
+MISMATCH_COLUMNS = ["timestamp", "bar", "column", "kind", "ours", "reference"]
+
+
+def _column_kind(col: str) -> str:
+    if "setup" in col:
+        return "setup_count"
+    if "countdown" in col:
+        return "countdown_count"
+    return "tdst_level"
+
+
+def compute_signals(df: pd.DataFrame, high_col: str = "High", low_col: str = "Low", close_col: str = "Close",
+                    length_setup: int = 9, length_countdown: int = 13) -> pd.DataFrame:
+    """Conteos y niveles TDST de `df` conservando su índice (timestamps)."""
+    res = calculate_td_sequential(df.reset_index(drop=True), high_col=high_col, low_col=low_col,
+                                  close_col=close_col, length_setup=length_setup,
+                                  length_countdown=length_countdown)
+    # calculate_tdst_levels indexa por posición: se calcula sobre RangeIndex y se restaura el índice
+    res = calculate_tdst_levels(res, high_col=high_col, low_col=low_col)
+    res.index = df.index
+    return res
+
+
+def compare_signals(ours: pd.DataFrame, reference: pd.DataFrame, columns=None, column_map: dict = None,
+                    tolerance: float = 1e-6) -> pd.DataFrame:
+    """
+    Discrepancias barra a barra entre nuestro resultado y la referencia, alineados por índice.
+
+    Parámetros:
+    - ours, reference: DataFrames indexados por timestamp (índices únicos)
+    - columns: columnas a comparar (por defecto `RECONCILE_COLUMNS` presentes en `ours`)
+    - column_map: nombre de cada columna en la referencia si difiere ({nuestra: del proveedor})
+    - tolerance: tolerancia relativa para los niveles TDST
+
+    Retorna:
+    - DataFrame con `MISMATCH_COLUMNS`, ordenado por timestamp (y orden de columnas)
+    """
+    column_map = column_map or {}
+    if columns is None:
+        columns = [c for c in RECONCILE_COLUMNS if c in ours.columns]
+    for col in columns:
+        if col not in ours.columns:
+            raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        if column_map.get(col, col) not in reference.columns:
+            raise ValueError(f"Columna '{column_map.get(col, col)}' no encontrada en la referencia")
+    if not ours.index.is_unique or not reference.index.is_unique:
+        raise ValueError("Los índices deben ser únicos para alinear por timestamp")
+
+    index = ours.index.union(reference.index)
+    in_ours = index.isin(ours.index)
+    in_ref = index.isin(reference.index)
+    both = in_ours & in_ref
+    a = ours[columns].reindex(index).to_numpy(dtype=float)
+    b = reference[[column_map.get(c, c) for c in columns]].reindex(index).to_numpy(dtype=float)
+
+    # Código de discrepancia por celda (-1 = coincide)
+    code = np.full(a.shape, -1, dtype=np.int8)
+    kinds = list(DIVERGENCE_KINDS)
+    for j, col in enumerate(columns):
+        x, y = a[:, j], b[:, j]
+        kind = _column_kind(col)
+        if kind == "tdst_level":
+            nx, ny = np.isnan(x), np.isnan(y)
+            presence = both & (nx != ny)
+            with np.errstate(invalid="ignore"):
+                level = both & ~nx & ~ny & (np.abs(x - y) > tolerance * np.maximum(1.0, np.abs(y)))
+            code[presence, j] = kinds.index("tdst_presence")
+            code[level, j] = kinds.index("tdst_level")
+        else:
+            diff = both & (np.nan_to_num(x) != np.nan_to_num(y))
+            code[diff, j] = kinds.index(kind)
+    code[~in_ours, :] = kinds.index("missing_ours")
+    code[~in_ref, :] = kinds.index("missing_reference")
+    # Las filas ausentes en un lado cuentan una sola vez (primera columna)
+    code[~both, 1:] = -1
+
+    rows, cols = np.nonzero(code >= 0)
+    return pd.DataFrame({
+        "timestamp": index[rows],
+        "bar": rows,
+        "column": np.asarray(columns, dtype=object)[cols],
+        "kind": np.asarray(kinds, dtype=object)[code[rows, cols]],
+        "ours": a[rows, cols],
+        "reference": b[rows, cols],
+    }, columns=MISMATCH_COLUMNS)
+
+
+def summarize_mismatches(mismatches: pd.DataFrame, symbol=None, bars: int = None) -> dict:
+    """Resumen de `compare_signals`: totales por tipo y primera divergencia."""
+    summary = {"symbol": symbol, "bars": bars, "mismatches": len(mismatches)}
+    counts = mismatches["kind"].value_counts()
+    for kind in DIVERGENCE_KINDS:
+        summary[kind] = int(counts.get(kind, 0))
+    if len(mismatches):
+        first = mismatches.iloc[0]
+        summary.update(first_timestamp=first["timestamp"], first_bar=int(first["bar"]),
+                       first_column=first["column"], first_kind=first["kind"])
+    else:
+        summary.update(first_timestamp=None, first_bar=None, first_column=None, first_kind=None)
+    return summary
+
+
+def reconcile_symbol(reference: pd.DataFrame, ours: pd.DataFrame = None, symbol=None, columns=None,
+                     column_map: dict = None, tolerance: float = 1e-6, high_col: str = "High",
+                     low_col: str = "Low", close_col: str = "Close", length_setup: int = 9,
+                     length_countdown: int = 13) -> dict:
+    """
+    Concilia un símbolo y devuelve su resumen (ver `summarize_mismatches`).
+
+    Si `ours` es None se calcula con `calculate_td_sequential` + `calculate_tdst_levels`
+    sobre las columnas OHLC de la referencia.
+    """
+    if ours is None:
+        ours = compute_signals(reference, high_col=high_col, low_col=low_col, close_col=close_col,
+                               length_setup=length_setup, length_countdown=length_countdown)
+    mismatches = compare_signals(ours, reference, columns=columns, column_map=column_map, tolerance=tolerance)
+    return summarize_mismatches(mismatches, symbol=symbol, bars=len(ours.index.union(reference.index)))
+
+
+def _reconcile_one(args):
+    symbol, load, kwargs = args
+    try:
+        data = load(symbol)
+        reference, ours = data if isinstance(data, tuple) else (data, None)
+        summary = reconcile_symbol(reference, ours, symbol=symbol, **kwargs)
+        summary["error"] = None
+        return summary
+    except Exception as exc:  # un símbolo defectuoso no debe abortar la conciliación nocturna
+        return {"symbol": symbol, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def reconcile_universe(symbols, load, max_workers: int = None, executor=None, chunksize: int = 16,
+                       **kwargs) -> pd.DataFrame:
+    """
+    Concilia muchos símbolos en paralelo.
+
+    Parámetros:
+    - symbols: símbolos a conciliar
+    - load: función `load(symbol)` que devuelve la referencia, o una tupla (referencia, nuestro
+      resultado); debe ser serializable (función de módulo) si se usan procesos
+    - max_workers: procesos del pool por defecto
+    - executor: `concurrent.futures.Executor` propio (p.ej. ThreadPoolExecutor); None = procesos
+    - kwargs: se pasan a `reconcile_symbol` (columns, column_map, tolerance, ...)
+
+    Retorna:
+    - DataFrame indexado por símbolo con el resumen de cada uno y una columna `error`
+      (None si la conciliación se completó)
+    """
+    tasks = [(symbol, load, kwargs) for symbol in symbols]
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_reconcile_one, tasks, chunksize=chunksize))
+    else:
+        results = list(executor.map(_reconcile_one, tasks))
+
+    columns = ["symbol", "bars", "mismatches"] + DIVERGENCE_KINDS + [
+        "first_timestamp", "first_bar", "first_column", "first_kind", "error"]
+    out = pd.DataFrame(results, columns=columns)
+    return out.set_index("symbol")
@@ -0,0 +1,248 @@
+"""
+Replay determinista y acelerado de históricos OHLC por el camino en vivo (`SignalStream`).
+
+Sirve para medir, sin tráfico real, si un cambio empeora la latencia del procesamiento en vivo:
+
+- `synthetic_universe` genera históricos multi-símbolo reproducibles (semilla) con huecos y
+  fechas de alta distintas por símbolo, para que el intercalado no sea trivial.
+- `interleave` ordena las barras de todos los símbolos por timestamp (empates en el orden de
+  los símbolos): el mismo orden en cada ejecución.
+- `replay` entrega las barras a `SignalStream.run()` a `speedup` veces el ritmo real (None =
+  tan rápido como sea posible) y recoge el resultado de cada una con el hook `on_bar` del
+  stream. La latencia extremo a extremo de cada barra va desde su llegada (instante programado
+  según su timestamp, o el de entrega sin ritmo) hasta tener su resultado, e incluye la espera
+  en la cola del stream, las cesiones al loop cada `yield_every` barras y el retraso del
+  productor.
+- Con `verify=True` compara el resultado de cada barra con
+  `calculate_tdst_levels(calculate_td_sequential(df))` de su símbolo.
+
+    frames = synthetic_universe(n_symbols=200, n_bars=1000)
+    frames["BKX"] = pd.read_csv("tests/bkx_data.csv", index_col=0, parse_dates=True)
+    report = run_replay(frames, speedup=1e6)
+    report["latency"]["p99"], report["verified"]
+"""
+
+import asyncio
+import time
+from collections import Counter, defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+from .aio import SignalStream
+from .core import calculate_td_sequential
+from .levels import calculate_tdst_levels
+from .metrics import MetricsRegistry
+from .stream import Bar, BarResult
+
+
+VERIFY_COLUMNS = [
+    "buy_setup_count",
+    "sell_setup_count",
+    "buy_countdown_count",
+    "sell_countdown_count",
+    "tdst_buy",
+    "tdst_sell",
+]
+
+
+def synthetic_universe(n_symbols: int = 50, n_bars: int = 500, start: str = "2020-01-01", freq: str = "B",
+                       missing: float = 0.02, seed: int = 0) -> dict:
+    """
+    Históricos OHLC sintéticos {símbolo: DataFrame} con índice de fechas.
+
+    Parámetros:
+    - n_bars: barras del calendario común (cada símbolo empieza en una barra aleatoria del primer
+      cuarto y le falta una fracción `missing` de barras)
+    - freq: frecuencia del calendario (p.ej. "B", "1min")
+    - seed: semilla; la misma semilla da los mismos datos
+
+    Los precios se redondean a centésimas, así que hay empates como en datos reales.
+    """
+    if n_symbols <= 0 or n_bars <= 0:
+        raise ValueError("n_symbols y n_bars deben ser positivos")
+    if not 0 <= missing < 1:
+        raise ValueError("missing debe estar en [0, 1)")
+    rng = np.random.default_rng(seed)
+    calendar = pd.date_range(start, periods=n_bars, freq=freq)
+    frames = {}
+    for s in range(n_symbols):
+        keep = rng.random(n_bars) >= missing
+        keep[:int(rng.integers(0, n_bars // 4 + 1))] = False
+        keep[-1] = True
+        n = int(keep.sum())
+        close = 20 + 80 * rng.random() * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+        open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, 0.002, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, n)))
+        frames[f"S{s:04d}"] = pd.DataFrame(
+            {"Open": open_.round(2), "High": high.round(2), "Low": low.round(2), "Close": close.round(2)},
+            index=calendar[keep].rename("Date"),
+        )
+    return frames
+
+
+def _timestamps_ns(symbol, df: pd.DataFrame) -> np.ndarray:
+    index = df.index
+    if not isinstance(index, pd.DatetimeIndex):
+        # utc=True admite offsets mixtos (p.ej. cambios de horario); sin zona se toma como UTC
+        try:
+            index = pd.to_datetime(index, utc=True)
+        except (TypeError, ValueError):
+            raise ValueError(f"El índice de '{symbol}' no se puede convertir a fechas") from None
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    # La unidad interna puede no ser ns (pandas >= 2)
+    return index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def interleave(frames: dict, open_col: str = "Open", high_col: str = "High", low_col: str = "Low",
+               close_col: str = "Close"):
+    """
+    Genera (Bar, timestamp en ns) de todos los símbolos en orden de timestamp.
+
+    El orden es determinista: dentro de un símbolo se respeta el de su DataFrame (debe estar
+    ordenado por fecha) y los empates entre símbolos siguen el orden de `frames`.
+    """
+    symbols = list(frames)
+    columns = {}
+    times = []
+    for symbol in symbols:
+        df = frames[symbol]
+        for col in [close_col, high_col, low_col]:
+            if col not in df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        ts = _timestamps_ns(symbol, df)
+        if len(ts) > 1 and (np.diff(ts) < 0).any():
+            raise ValueError(f"El índice de '{symbol}' no está ordenado por fecha")
+        close = df[close_col].to_numpy(dtype=float)
+        open_ = df[open_col].to_numpy(dtype=float) if open_col in df.columns else close
+        columns[symbol] = (df.index, open_.tolist(), df[high_col].to_numpy(dtype=float).tolist(),
+                           df[low_col].to_numpy(dtype=float).tolist(), close.tolist())
+        times.append(ts)
+    if not times:
+        return
+    sizes = np.array([len(t) for t in times])
+    owner = np.repeat(np.arange(len(symbols)), sizes)
+    position = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    all_times = np.concatenate(times)
+    # Ordenación estable: los empates quedan en el orden de los símbolos
+    order = np.argsort(all_times, kind="stable")
+    for k, i, t in zip(owner[order].tolist(), position[order].tolist(), all_times[order].tolist()):
+        symbol = symbols[k]
+        index, open_, high, low, close = columns[symbol]
+        yield Bar(symbol, index[i], open_[i], high[i], low[i], close[i]), t
+
+
+async def replay(frames: dict, speedup: float = None, maxsize: int = 10000, yield_every: int = 256,
+                 verify: bool = True, metrics: MetricsRegistry = None, length_setup: int = 9,
+                 length_countdown: int = 13, open_col: str = "Open", high_col: str = "High",
+                 low_col: str = "Low", close_col: str = "Close") -> dict:
+    """
+    Reproduce `frames` ({símbolo: DataFrame OHLC}) intercalados por timestamp por el camino en vivo.
+
+    Parámetros:
+    - speedup: factor sobre el ritmo real (p.ej. 3600 = una hora de datos por segundo);
+      None = sin esperas (throughput máximo con backpressure de la cola)
+    - maxsize, yield_every: los del `SignalStream` que procesa las barras
+    - verify: comparar cada barra con el cálculo batch de su símbolo (guarda los resultados en memoria)
+    - metrics: registro donde publicar las métricas del stream y la latencia extremo a extremo
+      (`tdsequential_replay_latency_seconds`); None = uno propio
+
+    Retorna:
+    - dict con bars, symbols, seconds, bars_per_s, speedup, latency (extremo a extremo) y
+      update_latency (solo `TDSequentialState.update`) como `Histogram.summary()` en segundos,
+      signals por tipo, verified (None sin `verify`) y mismatches (símbolos que no coinciden)
+    """
+    if speedup is not None and speedup <= 0:
+        raise ValueError("speedup debe ser positivo (o None para no esperar)")
+    if metrics is None:
+        metrics = MetricsRegistry()
+    latency = metrics.histogram("tdsequential_replay_latency_seconds",
+                                "Latencia extremo a extremo por barra en el replay")
+    record = latency.recorder()
+    results = {symbol: [] for symbol in frames} if verify else None
+    signals = Counter()
+    # Llegadas pendientes por símbolo: el stream aplica las barras de cada símbolo en orden
+    # (también las retenidas durante un warm-up), así que la primera es la de la barra aplicada
+    arrivals = defaultdict(deque)
+    processed = 0
+
+    def on_bar(bar, res, events):
+        nonlocal processed
+        record(time.perf_counter_ns() - arrivals[bar.symbol].popleft())
+        if results is not None:
+            results[bar.symbol].append(res)
+        processed += 1
+        if processed % yield_every == 0:
+            latency.fold()
+
+    stream = SignalStream(length_setup, length_countdown, maxsize=maxsize, yield_every=yield_every,
+                          metrics=metrics, on_bar=on_bar)
+    bars = interleave(frames, open_col=open_col, high_col=high_col, low_col=low_col, close_col=close_col)
+
+    async def source(start_ns):
+        first = None
+        for bar, ts in bars:
+            if speedup is None:
+                arrival = time.perf_counter_ns()
+            else:
+                if first is None:
+                    first = ts
+                arrival = start_ns + int((ts - first) / speedup)
+                delay = (arrival - time.perf_counter_ns()) / 1e9
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            arrivals[bar.symbol].append(arrival)
+            yield bar
+
+    start_ns = time.perf_counter_ns()
+    async for event in stream.run(source(start_ns)):
+        signals[event.kind] += 1
+    seconds = (time.perf_counter_ns() - start_ns) / 1e9
+
+    report = {
+        "bars": processed,
+        "symbols": len(frames),
+        "seconds": seconds,
+        "bars_per_s": processed / seconds if seconds > 0 else float("nan"),
+        "speedup": speedup,
+        "latency": latency.summary(),
+        "update_latency": metrics.histogram("tdsequential_update_latency_seconds").summary(),
+        "signals": dict(signals),
+        "verified": None,
+        "mismatches": [],
+    }
+    if verify:
+        report["mismatches"] = verify_results(frames, results, length_setup, length_countdown,
+                                              open_col=open_col, high_col=high_col, low_col=low_col,
+                                              close_col=close_col)
+        report["verified"] = not report["mismatches"]
+    return report
+
+
+def verify_results(frames: dict, results: dict, length_setup: int = 9, length_countdown: int = 13,
+                   open_col: str = "Open", high_col: str = "High", low_col: str = "Low",
+                   close_col: str = "Close") -> list:
+    """
+    Símbolos cuyos resultados barra a barra (`BarResult` en orden) no coinciden con
+    `calculate_tdst_levels(calculate_td_sequential(df))` en `VERIFY_COLUMNS`.
+    """
+    mismatches = []
+    for symbol, df in frames.items():
+        expected = calculate_tdst_levels(
+            calculate_td_sequential(df, open_col=open_col, high_col=high_col, low_col=low_col,
+                                    close_col=close_col, length_setup=length_setup,
+                                    length_countdown=length_countdown),
+            high_col=high_col, low_col=low_col)
+        got = pd.DataFrame.from_records(results.get(symbol, []), columns=BarResult._fields)
+        if len(got) != len(expected) or not all(
+                np.array_equal(got[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float), equal_nan=True)
+                for col in VERIFY_COLUMNS):
+            mismatches.append(symbol)
+    return mismatches
+
+
+def run_replay(frames: dict, **kwargs) -> dict:
+    """Versión síncrona de `replay` (crea su propio event loop)."""
+    return asyncio.run(replay(frames, **kwargs))
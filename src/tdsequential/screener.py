@@ -0,0 +1,189 @@
+"""
+Screener en vivo sobre el estado actual de setups/countdowns de todo el universo.
+
+`Screener` se apoya en un `StateStore` (arrays por id de símbolo) y mantiene, por cada
+conteo, un índice por cubetas (ids ordenados por valor + inicio de cada cubeta, como un
+counting sort). Una consulta de umbral ("buy setup >= 7") es un slice del índice; el resto
+de condiciones se filtran solo sobre esos candidatos.
+
+Las barras nuevas se procesan con `update` (vectorizado). Un índice se construye la primera
+vez que se consulta su columna (ordenación completa); después `update` solo mueve de cubeta
+los ids cuyo conteo cambió: se quitan del índice con una máscara y se insertan al final de
+su cubeta nueva, en O(n_símbolos) de copias y O(k log k) para los k ids movidos, sin volver
+a ordenar el universo. Si el `StateStore` se modifica sin pasar por `update` hay que llamar
+a `invalidate`.
+
+Columnas disponibles:
+- buy_setup / sell_setup: conteo de setup en curso (el de la última barra, 0-9)
+- buy_countdown / sell_countdown: conteo de countdown en curso (0-13)
+- tdst_buy_distance / tdst_sell_distance: |close - TDST| / TDST (NaN si no hay nivel activo)
+"""
+
+import numpy as np
+import pandas as pd
+
+from .store import StateStore
+
+
+COUNT_COLUMNS = ["buy_setup", "sell_setup", "buy_countdown", "sell_countdown"]
+
+
+class Screener:
+    """
+    Índice de consultas sobre el estado TD Sequential actual de muchos símbolos.
+
+    Parámetros:
+    - store: `StateStore` existente, o None para crear uno en memoria con `capacity`
+    - capacity: número de símbolos si no se pasa `store`
+    - symbols: nombres de los símbolos (posición = id), usados en `frame`
+    """
+
+    def __init__(self, store: StateStore = None, capacity: int = None, symbols=None):
+        if store is None:
+            if capacity is None:
+                capacity = len(symbols) if symbols is not None else None
+            if capacity is None:
+                raise ValueError("Debe indicarse 'store', 'capacity' o 'symbols'")
+            store = StateStore(capacity)
+        self.store = store
+        self.symbols = None if symbols is None else np.asarray(symbols, dtype=object)
+        self._index = {}  # columna -> (ids ordenados, inicio de cada cubeta, valor indexado por id)
+
+    def update(self, ids, high, low, close) -> dict:
+        """Procesa una barra nueva para `ids` (ver `StateStore.update`) y mueve esos ids en los índices."""
+        ids = np.asarray(ids, dtype=np.intp)
+        out = self.store.update(ids, high, low, close)
+        for name in list(self._index):
+            self._move(name, ids)
+        return out
+
+    def invalidate(self) -> None:
+        """Descarta los índices (p.ej. tras modificar el `StateStore` directamente)."""
+        self._index.clear()
+
+    # ----------------------------
+    # Columnas derivadas
+    # ----------------------------
+    def column(self, name: str) -> np.ndarray:
+        """Valores actuales de una columna del screener para todos los símbolos."""
+        s = self.store
+        if name == "buy_setup":
+            return s.buy_setup_count
+        if name == "sell_setup":
+            return s.sell_setup_count
+        if name == "buy_countdown":
+            return self._countdown(s.buy_countdown, s.buy_countdown_active, s.buy_countdown_count)
+        if name == "sell_countdown":
+            return self._countdown(s.sell_countdown, s.sell_countdown_active, s.sell_countdown_count)
+        if name == "tdst_buy_distance":
+            return np.abs(s.last_close - s.tdst_buy) / s.tdst_buy
+        if name == "tdst_sell_distance":
+            return np.abs(s.last_close - s.tdst_sell) / s.tdst_sell
+        raise ValueError(f"Columna de screener desconocida: '{name}'")
+
+    def _countdown(self, counter, active, last_bar):
+        # Countdown activo: su contador; recién completado en la última barra: 13; si no, 0
+        completed = last_bar == self.store.length_countdown
+        return np.where(active | completed, counter, 0).astype(np.int16)
+
+    def _values_at(self, name: str, ids) -> np.ndarray:
+        """Valores de una columna de conteo solo para `ids`."""
+        s = self.store
+        if name == "buy_countdown":
+            return self._countdown(s.buy_countdown[ids], s.buy_countdown_active[ids], s.buy_countdown_count[ids])
+        if name == "sell_countdown":
+            return self._countdown(s.sell_countdown[ids], s.sell_countdown_active[ids], s.sell_countdown_count[ids])
+        return self.column(name)[ids]
+
+    def _bucket_index(self, name: str):
+        idx = self._index.get(name)
+        if idx is None:
+            values = np.array(self.column(name), dtype=np.intp)
+            order = np.argsort(values, kind="stable")
+            starts = np.concatenate([[0], np.cumsum(np.bincount(values, minlength=1))])
+            idx = (order, starts, values)
+            self._index[name] = idx
+        return idx
+
+    def _move(self, name: str, ids) -> None:
+        """Pasa a su cubeta nueva los `ids` cuyo valor cambió desde que se indexaron."""
+        order, starts, values = self._index[name]
+        new = self._values_at(name, ids).astype(np.intp)
+        changed = new != values[ids]
+        if not changed.any():
+            return
+        moved, new = ids[changed], new[changed]
+        if len(moved) * 8 > len(values):
+            # Con muchos cambios sale más barato reconstruir (en la próxima consulta)
+            del self._index[name]
+            return
+        old = values[moved]
+        values[moved] = new
+
+        size = max(len(starts) - 1, int(new.max()) + 1)
+        counts = np.zeros(size, dtype=np.intp)
+        counts[:len(starts) - 1] = np.diff(starts)
+        counts -= np.bincount(old, minlength=size)
+        flagged = np.zeros(len(values), dtype=bool)
+        flagged[moved] = True
+        rest = order[~flagged[order]]
+        rest_starts = np.concatenate([[0], np.cumsum(counts)])
+
+        # Insertar al final de cada cubeta nueva (np.insert mantiene el orden de `moved` en empates)
+        sort = np.argsort(new, kind="stable")
+        moved, new = moved[sort], new[sort]
+        order = np.insert(rest, rest_starts[new + 1], moved)
+        counts += np.bincount(new, minlength=size)
+        self._index[name] = (order, np.concatenate([[0], np.cumsum(counts)]), values)
+
+    def ids_at_least(self, name: str, threshold: int) -> np.ndarray:
+        """Ids de los símbolos con `name >= threshold` (slice del índice por cubetas, sin orden por id)."""
+        order, starts, _ = self._bucket_index(name)
+        threshold = max(int(threshold), 0)
+        if threshold >= len(starts) - 1:
+            return order[:0]
+        return order[starts[threshold]:]
+
+    def query(self, buy_setup=None, sell_setup=None, buy_countdown=None, sell_countdown=None,
+              tdst_buy_within=None, tdst_sell_within=None) -> np.ndarray:
+        """
+        Ids (ordenados) de los símbolos que cumplen todas las condiciones.
+
+        Parámetros:
+        - buy_setup, sell_setup, buy_countdown, sell_countdown: valor mínimo del conteo
+        - tdst_buy_within, tdst_sell_within: distancia relativa máxima al nivel TDST (0.01 = 1%)
+
+        Ejemplo: `screener.query(sell_countdown=11, tdst_sell_within=0.01)`
+        """
+        thresholds = {k: v for k, v in zip(COUNT_COLUMNS, (buy_setup, sell_setup, buy_countdown, sell_countdown))
+                      if v is not None}
+        candidates = None
+        if thresholds:
+            # Empezar por la cubeta más selectiva y filtrar el resto sobre los candidatos
+            slices = sorted((self.ids_at_least(k, v) for k, v in thresholds.items()), key=len)
+            candidates = slices[0]
+            for name, value in thresholds.items():
+                candidates = candidates[self.column(name)[candidates] >= value]
+        elif tdst_buy_within is None and tdst_sell_within is None:
+            return np.arange(self.store.capacity)
+
+        for name, limit in (("tdst_buy_distance", tdst_buy_within), ("tdst_sell_distance", tdst_sell_within)):
+            if limit is None:
+                continue
+            if candidates is None:
+                candidates = np.flatnonzero(self.column(name) <= limit)
+            else:
+                candidates = candidates[self.column(name)[candidates] <= limit]
+        return np.sort(candidates)
+
+    def frame(self, ids=None) -> pd.DataFrame:
+        """DataFrame con las columnas del screener para `ids` (todos si es None)."""
+        ids = np.arange(self.store.capacity) if ids is None else np.asarray(ids, dtype=np.intp)
+        data = {name: self.column(name)[ids] for name in COUNT_COLUMNS}
+        data["close"] = self.store.last_close[ids]
+        data["tdst_buy"] = self.store.tdst_buy[ids]
+        data["tdst_sell"] = self.store.tdst_sell[ids]
+        data["tdst_buy_distance"] = self.column("tdst_buy_distance")[ids]
+        data["tdst_sell_distance"] = self.column("tdst_sell_distance")[ids]
+        index = pd.Index(self.symbols[ids], name="symbol") if self.symbols is not None else pd.Index(ids, name="id")
+        return pd.DataFrame(data, index=index)
@@ -0,0 +1,609 @@
+"""
+Servicio local de cálculo TD Sequential con micro-batching y coalescencia de peticiones.
+
+Pensado para varias aplicaciones de la misma máquina que piden los mismos símbolos con
+segundos de diferencia. `TDService` mantiene en memoria, por símbolo:
+
+- el estado incremental (un `StateStore` compartido): `update` añade una barra y las
+  peticiones que llegan dentro de la misma ventana (`batch_window`) se procesan en una
+  única llamada vectorizada a `StateStore.update` (una barra por símbolo y llamada);
+- el último resultado de serie completa: `compute` devuelve el resultado cacheado si la
+  serie es la misma; si la serie nueva extiende la anterior solo recalcula la cola con el
+  calentamiento mínimo exacto de `warmstart`; peticiones idénticas de la misma ventana
+  comparten un único cálculo (coalescencia). Las series de una ventana se concatenan y se
+  calculan con una sola pasada del kernel NumPy, que reinicia el estado en cada serie
+  (`warmstart._compute_many`). La huella de cada serie (blake2b) también se calcula en la
+  tarea del executor, no en el event loop. Mientras un lote se calcula las peticiones nuevas
+  esperan y forman el siguiente, que ya ve en caché los resultados del anterior.
+
+`TDServer` expone el servicio por HTTP/1.1 (TCP o socket Unix, solo biblioteca estándar):
+
+    GET  /health                      -> {"status": "ok"}
+    GET  /stats                       -> contadores y latencias p50/p99 por ruta
+    GET  /metrics                     -> métricas en formato de texto de Prometheus
+    GET  /state/<symbol>              -> conteos de la última barra de `update`
+    POST /update   {"symbol", "high", "low", "close"} o {"bars": [...]}
+    POST /compute  {"symbol", "high": [...], "low": [...], "close": [...], "tail": n}
+
+Arranque: `tdsequential serve --port 8765` (ver cli.py). `load_test` genera carga
+concurrente contra un servidor y devuelve el throughput y las latencias observadas.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .metrics import MetricsRegistry
+from .store import FIELDS, StateStore
+from .stream import (
+    BUY_COUNTDOWN, BUY_SETUP, SELL_COUNTDOWN, SELL_SETUP, TDST_BUY_BREAK, TDST_SELL_BREAK,
+)
+from .warmstart import _compute, _compute_many, _exact_from
+
+
+COUNT_COLUMNS = ["buy_setup_count", "sell_setup_count", "buy_countdown_count", "sell_countdown_count"]
+RESULT_COLUMNS = COUNT_COLUMNS + ["tdst_buy", "tdst_sell"]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error"}
+
+
+def _fingerprint(high, low, close) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for arr in (high, low, close):
+        h.update(arr.tobytes())
+    return h.digest()
+
+
+class _Series:
+    __slots__ = ("key", "high", "low", "close", "out")
+
+    def __init__(self, key, high, low, close, out):
+        self.key = key
+        self.high = high
+        self.low = low
+        self.close = close
+        self.out = out
+
+
+class TDService:
+    """
+    Estado y resultados TD Sequential por símbolo, compartidos entre clientes concurrentes.
+
+    Parámetros:
+    - capacity: símbolos iniciales del `StateStore` (crece al doble si se llena)
+    - batch_window: segundos que se espera a otras peticiones antes de procesar un lote
+    - max_batch: peticiones a partir de las cuales el lote se procesa sin esperar
+    - cache_size: series completas (una por símbolo) que se mantienen calientes
+    - executor: executor para `compute` (None = el executor por defecto del loop)
+    - metrics: `MetricsRegistry` donde publicar latencias (None = uno propio en `self.metrics`)
+
+    Los métodos son corutinas y deben usarse desde un único event loop.
+    """
+
+    def __init__(self, capacity: int = 1024, length_setup: int = 9, length_countdown: int = 13,
+                 batch_window: float = 0.001, max_batch: int = 4096, cache_size: int = 1024, executor=None,
+                 metrics: MetricsRegistry = None):
+        self.length_setup = length_setup
+        self.length_countdown = length_countdown
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        self.executor = executor
+        self.store = StateStore(capacity, length_setup=length_setup, length_countdown=length_countdown)
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.requests = self.metrics.histogram("tdsequential_server_request_seconds",
+                                               "Latencia de las peticiones HTTP", labelnames=("route",))
+        self.kernels = self.metrics.histogram("tdsequential_server_kernel_seconds",
+                                              "Duración de las llamadas al kernel", labelnames=("kind",))
+        self.stats = dict.fromkeys(
+            ["updates", "update_batches", "computes", "compute_batches", "cache_hits", "coalesced",
+             "extended"], 0)
+        self._ids = {}
+        self._updates = []
+        self._update_timer = None
+        self._computes = []
+        self._compute_timer = None
+        self._compute_running = False
+        self._series = OrderedDict()
+
+    # ----------------------------
+    # Barras incrementales
+    # ----------------------------
+    def _symbol_id(self, symbol) -> int:
+        sid = self._ids.get(symbol)
+        if sid is None:
+            sid = len(self._ids)
+            if sid >= self.store.capacity:
+                self._grow()
+            self._ids[symbol] = sid
+        return sid
+
+    def _grow(self) -> None:
+        old = self.store
+        new = StateStore(old.capacity * 2, length_setup=self.length_setup,
+                         length_countdown=self.length_countdown)
+        for name, _, _ in FIELDS:
+            getattr(new, name)[:old.capacity] = getattr(old, name)
+        self.store = new
+
+    async def update(self, symbol, high: float, low: float, close: float) -> dict:
+        """
+        Añade una barra al estado de `symbol` y devuelve sus conteos, niveles TDST y eventos.
+
+        Las barras de un mismo símbolo se aplican en el orden de llegada.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._updates.append((self._symbol_id(symbol), float(high), float(low), float(close), fut))
+        self.stats["updates"] += 1
+        if len(self._updates) >= self.max_batch:
+            self._flush_updates()
+        elif self._update_timer is None:
+            self._update_timer = loop.call_later(self.batch_window, self._flush_updates)
+        return await fut
+
+    def _flush_updates(self) -> None:
+        if self._update_timer is not None:
+            self._update_timer.cancel()
+            self._update_timer = None
+        batch, self._updates = self._updates, []
+        while batch:
+            # Una barra por símbolo en cada llamada vectorizada; las repetidas pasan a la siguiente
+            seen = set()
+            now, later = [], []
+            for item in batch:
+                (later if item[0] in seen else now).append(item)
+                seen.add(item[0])
+            ids, high, low, close, futs = zip(*now)
+            t0 = time.perf_counter_ns()
+            try:
+                out = self.store.update(np.array(ids), high, low, close)
+            except Exception as exc:
+                for fut in futs:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                batch = later
+                continue
+            self.kernels.labels("update").record_ns(time.perf_counter_ns() - t0)
+            self.stats["update_batches"] += 1
+            for k, fut in enumerate(futs):
+                if not fut.done():
+                    fut.set_result(self._bar_result(out, k))
+            batch = later
+
+    def _bar_result(self, out: dict, k: int) -> dict:
+        res = {name: int(out[name][k]) for name in COUNT_COLUMNS}
+        for name in ("tdst_buy", "tdst_sell"):
+            res[name] = _nan_to_none(out[name][k])
+        events = []
+        if res["buy_setup_count"] == self.length_setup:
+            events.append(BUY_SETUP)
+        if res["sell_setup_count"] == self.length_setup:
+            events.append(SELL_SETUP)
+        if res["buy_countdown_count"] == self.length_countdown:
+            events.append(BUY_COUNTDOWN)
+        if res["sell_countdown_count"] == self.length_countdown:
+            events.append(SELL_COUNTDOWN)
+        if out["tdst_buy_break"][k]:
+            events.append(TDST_BUY_BREAK)
+        if out["tdst_sell_break"][k]:
+            events.append(TDST_SELL_BREAK)
+        res["events"] = events
+        return res
+
+    def state(self, symbol) -> dict:
+        """Valores de la última barra añadida con `update` (ValueError si el símbolo no existe)."""
+        sid = self._ids.get(symbol)
+        if sid is None:
+            raise ValueError(f"Símbolo '{symbol}' no encontrado")
+        store = self.store
+        res = {"bars": int(store.n_bars[sid]), "close": _nan_to_none(store.last_close[sid])}
+        for name in COUNT_COLUMNS:
+            res[name] = int(getattr(store, name)[sid])
+        res["tdst_buy"] = _nan_to_none(store.tdst_buy[sid])
+        res["tdst_sell"] = _nan_to_none(store.tdst_sell[sid])
+        return res
+
+    def latency_summary(self) -> dict:
+        """{ruta o kernel_<tipo>: {"count", "p50_ms", "p99_ms", "max_ms"}}."""
+        out = {}
+        for prefix, family in (("", self.requests), ("kernel_", self.kernels)):
+            for (label,), hist in list(family.children.items()):
+                s = hist.summary()
+                out[prefix + label] = {"count": s["count"], "p50_ms": s["p50"] * 1e3, "p99_ms": s["p99"] * 1e3,
+                                       "max_ms": s["max"] * 1e3}
+        return out
+
+    # ----------------------------
+    # Series completas
+    # ----------------------------
+    async def compute(self, symbol, high, low, close) -> dict:
+        """
+        TD Sequential + TDST de una serie completa de `symbol`.
+
+        Retorna:
+        - dict columna -> array de solo lectura (compartido con otros clientes: no modificar)
+        """
+        high = np.ascontiguousarray(high, dtype=float)
+        low = np.ascontiguousarray(low, dtype=float)
+        close = np.ascontiguousarray(close, dtype=float)
+        if not (high.ndim == low.ndim == close.ndim == 1 and len(high) == len(low) == len(close)):
+            raise ValueError("high, low y close deben ser series de la misma longitud")
+        self.stats["computes"] += 1
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._computes.append((symbol, high, low, close, fut))
+        if len(self._computes) >= self.max_batch:
+            self._flush_computes()
+        elif self._compute_timer is None:
+            self._compute_timer = loop.call_later(self.batch_window, self._flush_computes)
+        return await asyncio.shield(fut)
+
+    def _flush_computes(self) -> None:
+        if self._compute_timer is not None:
+            self._compute_timer.cancel()
+            self._compute_timer = None
+        if self._compute_running or not self._computes:
+            return  # `_finish_computes` lanza el siguiente lote
+        batch, self._computes = self._computes[:self.max_batch], self._computes[self.max_batch:]
+        cached = {symbol: self._series.get(symbol) for symbol, *_ in batch}
+        self._compute_running = True
+        self.stats["compute_batches"] += 1
+        task = asyncio.get_running_loop().run_in_executor(self.executor, self._run_computes, batch, cached)
+        asyncio.ensure_future(self._finish_computes(batch, task))
+
+    def _run_computes(self, batch, cached) -> list:
+        """
+        Calcula un lote en el executor. Retorna, por petición, (key, out, tipo) con tipo
+        "hit", "coalesced", "extended" o "computed" (o (key, excepción, None)).
+
+        Las series nuevas y las colas de las extendidas (con `warmup` barras de calentamiento)
+        van en una sola llamada a `_compute_many`; solo las colas cuyo calentamiento no basta
+        se repiten por separado con `_series_kernel`.
+        """
+        L, LC = self.length_setup, self.length_countdown
+        results = [None] * len(batch)
+        first = {}   # key -> posición de la primera petición con esa serie
+        jobs = []    # (posición, inicio de la cola o 0, serie previa extendida o None)
+        for k, (symbol, high, low, close, _) in enumerate(batch):
+            key = (symbol, _fingerprint(high, low, close))
+            prev = cached.get(symbol)
+            if prev is not None and prev.key == key:
+                results[k] = (key, prev.out, "hit")
+            elif key in first:
+                results[k] = (key, None, "coalesced")
+            else:
+                first[key] = k
+                s = 0
+                if prev is not None and _extends(prev, high, low, close):
+                    s = max(len(prev.close) - 64, 0)
+                jobs.append((k, s, prev if s > 0 else None))
+                results[k] = (key, None, None)
+
+        t0 = time.perf_counter_ns()
+        try:
+            outs = _compute_many([(batch[k][1][s:], batch[k][2][s:], batch[k][3][s:]) for k, s, _ in jobs],
+                                 L, LC, True)
+        except Exception:
+            outs = [None] * len(jobs)  # se repiten una a una para asignar el error a su petición
+        for (k, s, prev), out in zip(jobs, outs):
+            key = results[k][0]
+            _, high, low, close, _ = batch[k]
+            try:
+                kind = "computed"
+                if out is not None and prev is not None:
+                    n0 = len(prev.close)
+                    exact = _exact_from(out, L, True)
+                    if exact is not None and s + exact <= n0:
+                        out = {name: np.concatenate([prev.out[name], out[name][n0 - s:]])
+                               for name in RESULT_COLUMNS}
+                        kind = "extended"
+                    else:
+                        out = None
+                if out is None:
+                    out, extended = self._series_kernel(high, low, close, prev, warmup=128)
+                    kind = "extended" if extended else "computed"
+            except Exception as exc:
+                results[k] = (key, exc, None)
+                continue
+            for arr in out.values():
+                arr.setflags(write=False)
+            results[k] = (key, out, kind)
+        if jobs:
+            self.kernels.labels("compute").record_ns(time.perf_counter_ns() - t0)
+
+        for k, (key, out, kind) in enumerate(results):
+            if kind == "coalesced":
+                shared = results[first[key]]
+                results[k] = (key, shared[1], "coalesced" if shared[2] is not None else None)
+        return results
+
+    def _series_kernel(self, high, low, close, prev, warmup: int = 64):
+        n = len(close)
+        L, LC = self.length_setup, self.length_countdown
+        if prev is not None and _extends(prev, high, low, close):
+            # La serie extiende la anterior: recalcular solo la cola con calentamiento exacto
+            n0 = len(prev.close)
+            while True:
+                s = max(n0 - warmup, 0)
+                out = _compute(high, low, close, s, n, L, LC, True)
+                if s == 0:
+                    return out, False
+                exact = _exact_from(out, L, True)
+                if exact is not None and s + exact <= n0:
+                    return {name: np.concatenate([prev.out[name], out[name][n0 - s:]])
+                            for name in RESULT_COLUMNS}, True
+                warmup *= 2
+        return _compute(high, low, close, 0, n, L, LC, True), False
+
+    async def _finish_computes(self, batch, task) -> None:
+        try:
+            results = await task
+        except Exception as exc:
+            results = [(None, exc, None)] * len(batch)
+        for (symbol, high, low, close, fut), (key, out, kind) in zip(batch, results):
+            if kind is None:
+                fut.set_exception(out)
+                continue
+            if kind == "hit":
+                self.stats["cache_hits"] += 1
+                if symbol in self._series:
+                    self._series.move_to_end(symbol)
+            elif kind == "coalesced":
+                self.stats["coalesced"] += 1
+            else:
+                self.stats["extended"] += kind == "extended"
+                self._series[symbol] = _Series(key, high, low, close, out)
+                self._series.move_to_end(symbol)
+                while len(self._series) > self.cache_size:
+                    self._series.popitem(last=False)
+            fut.set_result(out)
+        self._compute_running = False
+        if self._computes:
+            self._flush_computes()
+
+
+def _extends(prev, high, low, close) -> bool:
+    """La serie (high, low, close) empieza por la serie cacheada `prev` (y no está vacía)."""
+    n0 = len(prev.close)
+    return (0 < n0 <= len(close) and np.array_equal(prev.close, close[:n0])
+            and np.array_equal(prev.high, high[:n0]) and np.array_equal(prev.low, low[:n0]))
+
+
+def _nan_to_none(x):
+    x = float(x)
+    return None if math.isnan(x) else x
+
+
+def _jsonable(out: dict, tail=None) -> dict:
+    res = {}
+    for name in RESULT_COLUMNS:
+        arr = out[name] if tail is None else out[name][len(out[name]) - tail:]
+        if name in COUNT_COLUMNS:
+            res[name] = arr.astype(int).tolist()
+        else:
+            res[name] = [None if math.isnan(x) else x for x in arr.tolist()]
+    return res
+
+
+class TDServer:
+    """
+    Servidor HTTP/1.1 (keep-alive, cuerpos JSON) sobre un `TDService`.
+
+    Uso:
+        server = TDServer(port=8765)            # o TDServer(path="/tmp/td.sock")
+        await server.start()
+        ...
+        await server.close()
+
+    O `asyncio.run(server.serve_forever())`.
+    """
+
+    def __init__(self, service: TDService = None, host: str = "127.0.0.1", port: int = 8765, path: str = None,
+                 max_body: int = 64 << 20):
+        self.service = service if service is not None else TDService()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_body = max_body
+        self.started = None
+        self._server = None
+
+    @property
+    def address(self):
+        """(host, puerto) real (útil con port=0) o la ruta del socket Unix."""
+        if self.path is not None:
+            return self.path
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self) -> None:
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.started = time.time()
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t0 = time.perf_counter_ns()
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Petición HTTP inválida"}, False)
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = h.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                if length > self.max_body:
+                    await self._respond(writer, 400, {"error": "Cuerpo demasiado grande"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                route = target.split("?", 1)[0]
+                try:
+                    status, payload = await self._dispatch(method, route, body)
+                except ValueError as exc:
+                    status, payload = 400, {"error": str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                await self._respond(writer, status, payload, keep_alive)
+                name = "/state" if route.startswith("/state/") else route
+                self.service.requests.labels(f"{method} {name}").record_ns(time.perf_counter_ns() - t0)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status: int, payload, keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            data, ctype = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            data, ctype = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8"), "application/json"
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: {ctype}\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, route: str, body: bytes):
+        service = self.service
+        if route == "/health":
+            return 200, {"status": "ok"}
+        if route == "/stats":
+            return 200, {"uptime": time.time() - self.started, "symbols": len(service._ids),
+                         "cached_series": len(service._series), "counters": dict(service.stats),
+                         "latency": service.latency_summary()}
+        if route == "/metrics":
+            return 200, service.metrics.to_prometheus()
+        if route.startswith("/state/"):
+            symbol = route[len("/state/"):]
+            if symbol not in service._ids:
+                return 404, {"error": f"Símbolo '{symbol}' no encontrado"}
+            return 200, service.state(symbol)
+        if route not in ("/update", "/compute"):
+            return 404, {"error": f"Ruta desconocida: '{route}'"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            req = json.loads(body or b"{}")
+        except ValueError:
+            raise ValueError("El cuerpo no es JSON válido")
+        if not isinstance(req, dict):
+            raise ValueError("El cuerpo debe ser un objeto JSON")
+
+        if route == "/update":
+            bars = req.get("bars", [req])
+            try:
+                calls = [service.update(b["symbol"], b["high"], b["low"], b["close"]) for b in bars]
+            except (KeyError, TypeError) as exc:
+                raise ValueError(f"Barra inválida, falta {exc}")
+            results = await asyncio.gather(*calls)
+            return 200, (results[0] if "bars" not in req else {"results": results})
+
+        try:
+            symbol, high, low, close = req["symbol"], req["high"], req["low"], req["close"]
+        except KeyError as exc:
+            raise ValueError(f"Falta el campo {exc}")
+        out = await service.compute(symbol, high, low, close)
+        tail = req.get("tail")
+        if tail is not None:
+            tail = max(0, min(int(tail), len(out["buy_setup_count"])))
+        return 200, _jsonable(out, tail)
+
+
+async def request(address, method: str, path: str, payload=None, reader=None, writer=None):
+    """
+    Cliente mínimo: envía una petición y devuelve (status, json) (texto si la respuesta no es JSON).
+
+    `address` es (host, puerto) o la ruta de un socket Unix. Si se pasan `reader`/`writer`
+    se reutiliza esa conexión (keep-alive).
+    """
+    own = writer is None
+    if own:
+        if isinstance(address, str):
+            reader, writer = await asyncio.open_unix_connection(address)
+        else:
+            reader, writer = await asyncio.open_connection(*address)
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: tdsequential\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: {'close' if own else 'keep-alive'}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    data = json.loads(body) if headers.get("content-type") == "application/json" else body.decode("utf-8")
+    if own:
+        writer.close()
+    return status, data
+
+
+async def load_test(address, n_requests: int = 10_000, concurrency: int = 64, symbols: int = 100,
+                    seed: int = 0) -> dict:
+    """
+    Genera carga de `POST /update` con `concurrency` conexiones keep-alive sobre `symbols` paseos
+    aleatorios.
+
+    Retorna:
+    - dict con requests, seconds, requests_per_s, p50_ms y p99_ms (latencia vista por el cliente)
+    """
+    rng = np.random.default_rng(seed)
+    prices = 100 + np.cumsum(rng.normal(0, 1, (n_requests // symbols + 1, symbols)), axis=0)
+    latencies = []
+    counter = iter(range(n_requests))
+
+    async def client():
+        if isinstance(address, str):
+            reader, writer = await asyncio.open_unix_connection(address)
+        else:
+            reader, writer = await asyncio.open_connection(*address)
+        try:
+            for k in counter:
+                t, s = divmod(k, symbols)
+                c = float(prices[t, s])
+                bar = {"symbol": f"S{s}", "high": c + 0.5, "low": c - 0.5, "close": c}
+                t0 = time.perf_counter()
+                await request(address, "POST", "/update", bar, reader, writer)
+                latencies.append(time.perf_counter() - t0)
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    seconds = time.perf_counter() - t0
+    arr = np.array(latencies) * 1e3
+    p50, p99 = np.percentile(arr, [50, 99]) if len(arr) else (float("nan"), float("nan"))
+    return {"requests": len(arr), "seconds": seconds, "requests_per_s": len(arr) / seconds,
+            "p50_ms": float(p50), "p99_ms": float(p99)}
@@ -0,0 +1,265 @@
+"""
+Almacén de estado TD Sequential para universos grandes (struct-of-arrays).
+
+`StateStore` guarda el estado incremental de muchos símbolos en arrays NumPy indexados
+por id de símbolo (0..capacity-1) en lugar de un objeto Python por símbolo. Las
+actualizaciones son vectorizadas: una llamada procesa una barra nueva para un conjunto
+de símbolos a la vez, con exactamente la misma lógica que `TDSequentialState`.
+
+Si se indica `path`, los arrays viven en un único fichero mapeado en memoria:
+- varios procesos pueden abrirlo (p.ej. ingesta en "r+" y consultas en "r") y leer los
+  conteos actuales sin copias;
+- el estado sobrevive a reinicios sin reconstrucción (`StateStore.open(path)`).
+
+Formato del fichero: cabecera de 64 bytes (magic, versión, capacidad, longitudes) seguida
+de cada array en un bloque alineado a 64 bytes, en el orden de `FIELDS`.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from .stream import TDST_LENGTH
+
+
+MAGIC = b"TDSTATE1"
+HEADER = struct.Struct("<8sqqqq")  # magic, version, capacity, length_setup, length_countdown
+HEADER_SIZE = 64
+VERSION = 1
+
+# (nombre, dtype, columnas por símbolo)
+FIELDS = [
+    ("n_bars", np.int64, 1),
+    ("closes", np.float64, 6),
+    ("highs", np.float64, TDST_LENGTH),
+    ("lows", np.float64, TDST_LENGTH),
+    ("buy_count", np.int16, 1),
+    ("sell_count", np.int16, 1),
+    ("buy_countdown", np.int16, 1),
+    ("sell_countdown", np.int16, 1),
+    ("buy_countdown_active", np.bool_, 1),
+    ("sell_countdown_active", np.bool_, 1),
+    ("tdst_buy", np.float64, 1),
+    ("tdst_sell", np.float64, 1),
+    # Valores de la última barra procesada (lo que ve un consumidor/screener)
+    ("buy_setup_count", np.int16, 1),
+    ("sell_setup_count", np.int16, 1),
+    ("buy_countdown_count", np.int16, 1),
+    ("sell_countdown_count", np.int16, 1),
+    ("last_close", np.float64, 1),
+]
+
+
+def _layout(capacity: int):
+    """Offsets (en bytes) de cada array dentro del fichero."""
+    offsets = {}
+    pos = HEADER_SIZE
+    for name, dtype, width in FIELDS:
+        offsets[name] = pos
+        size = capacity * width * np.dtype(dtype).itemsize
+        pos += -(-size // 64) * 64
+    return offsets, pos
+
+
+class StateStore:
+    """
+    Estado TD Sequential + TDST de `capacity` símbolos en arrays columnares.
+
+    Parámetros:
+    - capacity: número máximo de símbolos (ids 0..capacity-1)
+    - path: fichero para mapear en memoria (None = arrays en RAM)
+    - length_setup, length_countdown: igual que en `calculate_td_sequential`
+
+    Cada campo de `FIELDS` es accesible como atributo (p.ej. `store.buy_setup_count[ids]`).
+    """
+
+    def __init__(self, capacity: int, path=None, length_setup: int = 9, length_countdown: int = 13,
+                 _mode: str = "w+"):
+        if capacity <= 0:
+            raise ValueError("La capacidad debe ser positiva")
+        self.capacity = capacity
+        self.path = path
+        self.length_setup = length_setup
+        self.length_countdown = length_countdown
+        self._mmap = None
+
+        if path is None:
+            arrays = {}
+            for name, dtype, width in FIELDS:
+                shape = (capacity,) if width == 1 else (capacity, width)
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            self._init_values(arrays)
+        else:
+            offsets, total = _layout(capacity)
+            if _mode == "w+":
+                with open(path, "wb") as fh:
+                    fh.truncate(total)
+                    fh.write(HEADER.pack(MAGIC, VERSION, capacity, length_setup, length_countdown))
+            # El fichero ya existe (recién creado con cabecera): nunca usar "w+" en memmap
+            self._mmap = np.memmap(path, dtype=np.uint8, mode="r" if _mode == "r" else "r+", shape=(total,))
+            arrays = {}
+            for name, dtype, width in FIELDS:
+                count = capacity * width
+                arr = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offsets[name])
+                arrays[name] = arr if width == 1 else arr.reshape(capacity, width)
+            if _mode == "w+":
+                self._init_values(arrays)
+
+        for name, arr in arrays.items():
+            setattr(self, name, arr)
+        self._fields = list(arrays)
+
+    @staticmethod
+    def _init_values(arrays: dict) -> None:
+        for name in ("closes", "highs", "lows", "tdst_buy", "tdst_sell", "last_close"):
+            arrays[name][...] = np.nan
+
+    @classmethod
+    def open(cls, path, mode: str = "r+") -> "StateStore":
+        """
+        Abre un fichero de estado existente.
+
+        mode: "r+" (lectura/escritura, p.ej. proceso de ingesta) o "r" (solo lectura, sin copias).
+        """
+        if mode not in ("r", "r+"):
+            raise ValueError("mode debe ser 'r' o 'r+'")
+        with open(path, "rb") as fh:
+            magic, version, capacity, length_setup, length_countdown = HEADER.unpack(fh.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' no es un fichero de estado TD Sequential válido")
+        _, total = _layout(capacity)
+        if os.path.getsize(path) < total:
+            raise ValueError(f"'{path}' está truncado")
+        return cls(capacity, path, length_setup, length_countdown, _mode=mode)
+
+    def flush(self) -> None:
+        """Escribe a disco los cambios pendientes (solo con fichero mapeado)."""
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        """Libera el mapeo del fichero (se cierra al liberar las últimas vistas)."""
+        if self._mmap is not None:
+            self.flush()
+            for name in self._fields:
+                setattr(self, name, None)
+            self._mmap = None
+
+    def update(self, ids, high, low, close) -> dict:
+        """
+        Procesa una barra nueva para cada símbolo de `ids` (sin repetidos) de forma vectorizada.
+
+        Retorna:
+        - dict con arrays (alineados con `ids`) de buy_setup_count, sell_setup_count,
+          buy_countdown_count, sell_countdown_count, tdst_buy, tdst_sell,
+          tdst_buy_break y tdst_sell_break
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        close = np.asarray(close, dtype=float)
+        L = self.length_setup
+        LC = self.length_countdown
+
+        # Ventanas de precios (desplazar y añadir la barra actual)
+        cl = self.closes[ids]
+        cl[:, :-1] = cl[:, 1:]
+        cl[:, -1] = close
+        hi = self.highs[ids]
+        hi[:, :-1] = hi[:, 1:]
+        hi[:, -1] = high
+        lo = self.lows[ids]
+        lo[:, :-1] = lo[:, 1:]
+        lo[:, -1] = low
+        i = self.n_bars[ids]
+
+        # ----------------------------
+        # 1) SETUP
+        # ----------------------------
+        valid = i >= 5
+        c4 = cl[:, -5]
+        bear = valid & (close < c4) & (cl[:, -2] > cl[:, 0])
+        bull = valid & ~bear & (close > c4) & (cl[:, -2] < cl[:, 0])
+        other = valid & ~bear & ~bull
+
+        buy = self.buy_count[ids].astype(np.int64)
+        sell = self.sell_count[ids].astype(np.int64)
+        cont_b = other & (buy > 0)
+        inc_b = cont_b & (close < c4)
+        cont_s = other & (sell > 0)
+        inc_s = cont_s & (close > c4)
+
+        buy_setup = np.where(bear, 1, np.where(inc_b, buy + 1, 0))
+        sell_setup = np.where(bull, 1, np.where(inc_s, sell + 1, 0))
+        buy_completed = inc_b & (buy + 1 == L)
+        sell_completed = inc_s & (sell + 1 == L)
+
+        new_buy = np.where(bear, 1, np.where(bull, 0, np.where(cont_b, np.where(inc_b, buy + 1, 0), buy)))
+        new_sell = np.where(bull, 1, np.where(bear, 0, np.where(cont_s, np.where(inc_s, sell + 1, 0), sell)))
+        new_buy[buy_completed] = 0
+        new_sell[sell_completed] = 0
+
+        # ----------------------------
+        # 2) COUNTDOWN
+        # ----------------------------
+        bact = np.where(buy_completed, True, np.where(sell_completed, False, self.buy_countdown_active[ids]))
+        sact = np.where(sell_completed, True, np.where(buy_completed, False, self.sell_countdown_active[ids]))
+        bcd = np.where(buy_completed, 0, self.buy_countdown[ids].astype(np.int64))
+        scd = np.where(sell_completed, 0, self.sell_countdown[ids].astype(np.int64))
+
+        cond_b = bact & (close <= lo[:, -3])
+        cond_s = sact & (close >= hi[:, -3])
+        bcd = bcd + cond_b
+        scd = scd + cond_s
+        buy_cd = np.where(cond_b, bcd, 0)
+        sell_cd = np.where(cond_s, scd, 0)
+        bact &= ~(cond_b & (bcd == LC))
+        sact &= ~(cond_s & (scd == LC))
+
+        # ----------------------------
+        # 3) TDST
+        # ----------------------------
+        tb = self.tdst_buy[ids]
+        ts = self.tdst_sell[ids]
+        buy_break = low < tb  # NaN (sin nivel) -> False
+        sell_break = high > ts
+        tb[buy_break] = np.nan
+        ts[sell_break] = np.nan
+        ready = i >= TDST_LENGTH - 1
+        set_b = ready & (buy_setup == TDST_LENGTH)
+        set_s = ready & (sell_setup == TDST_LENGTH)
+        if set_b.any():
+            tb[set_b] = lo[set_b].min(axis=1)
+        if set_s.any():
+            ts[set_s] = hi[set_s].max(axis=1)
+
+        # Escribir estado
+        self.closes[ids] = cl
+        self.highs[ids] = hi
+        self.lows[ids] = lo
+        self.n_bars[ids] = i + 1
+        self.buy_count[ids] = new_buy
+        self.sell_count[ids] = new_sell
+        self.buy_countdown[ids] = bcd
+        self.sell_countdown[ids] = scd
+        self.buy_countdown_active[ids] = bact
+        self.sell_countdown_active[ids] = sact
+        self.tdst_buy[ids] = tb
+        self.tdst_sell[ids] = ts
+        self.buy_setup_count[ids] = buy_setup
+        self.sell_setup_count[ids] = sell_setup
+        self.buy_countdown_count[ids] = buy_cd
+        self.sell_countdown_count[ids] = sell_cd
+        self.last_close[ids] = close
+
+        return {
+            "buy_setup_count": buy_setup,
+            "sell_setup_count": sell_setup,
+            "buy_countdown_count": buy_cd,
+            "sell_countdown_count": sell_cd,
+            "tdst_buy": tb,
+            "tdst_sell": ts,
+            "tdst_buy_break": buy_break,
+            "tdst_sell_break": sell_break,
+        }
@@ -0,0 +1,281 @@
+"""
+Cálculo incremental (barra a barra) del TD Sequential y de los niveles TDST.
+
+`TDSequentialState` reproduce exactamente el resultado de `calculate_td_sequential`
+seguido de `calculate_tdst_levels`, pero procesando una barra cada vez y guardando
+solo el estado mínimo necesario:
+
+- Setup: contadores de compra/venta y los últimos 6 cierres (flip usa Close[i-5]).
+- Countdown: un único countdown activo por lado. En la implementación batch cada
+  setup completado abre su propio countdown, pero todos avanzan en las mismas barras
+  y el más reciente es el que se escribe en la columna, así que el valor visible
+  equivale a reiniciar el countdown en cada setup del mismo lado.
+- TDST: nivel activo por lado y las últimas 9 barras de High/Low.
+"""
+
+from collections import deque, namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# Longitud fija de la ventana TDST (igual que levels.py, que busca el 9 del setup)
+TDST_LENGTH = 9
+
+# Tipos de evento emitidos por el modo streaming
+BUY_SETUP = "buy_setup"
+SELL_SETUP = "sell_setup"
+BUY_COUNTDOWN = "buy_countdown"
+SELL_COUNTDOWN = "sell_countdown"
+TDST_BUY_BREAK = "tdst_buy_break"
+TDST_SELL_BREAK = "tdst_sell_break"
+
+Bar = namedtuple("Bar", ["symbol", "timestamp", "open", "high", "low", "close", "volume"], defaults=(0.0,))
+Bar.__doc__ = "Barra OHLC de un símbolo, tal como llega de un feed en vivo."
+
+BarResult = namedtuple("BarResult", [
+    "buy_setup_count",
+    "sell_setup_count",
+    "buy_countdown_count",
+    "sell_countdown_count",
+    "tdst_buy",
+    "tdst_sell",
+    "tdst_buy_break",
+    "tdst_sell_break",
+])
+BarResult.__doc__ = "Valores TD Sequential/TDST de una barra (mismas columnas que el cálculo batch)."
+
+SignalEvent = namedtuple("SignalEvent", ["symbol", "timestamp", "bar", "kind", "value"])
+SignalEvent.__doc__ = """
+Señal nueva detectada en una barra.
+
+- kind: uno de BUY_SETUP, SELL_SETUP, BUY_COUNTDOWN, SELL_COUNTDOWN, TDST_BUY_BREAK, TDST_SELL_BREAK
+- value: conteo completado (9/13) o nivel TDST roto
+"""
+
+
+class TDSequentialState:
+    """
+    Estado incremental de TD Sequential + TDST para un único símbolo.
+
+    Uso:
+        state = TDSequentialState()
+        for high, low, close in barras:
+            res = state.update(high, low, close)
+
+    Cada llamada a `update` devuelve un `BarResult` idéntico a la fila correspondiente
+    de `calculate_tdst_levels(calculate_td_sequential(df))`.
+    """
+
+    __slots__ = (
+        "length_setup", "length_countdown", "n_bars",
+        "_closes", "_highs", "_lows",
+        "buy_count", "sell_count",
+        "buy_countdown", "sell_countdown",
+        "buy_countdown_active", "sell_countdown_active",
+        "tdst_buy", "tdst_sell",
+    )
+
+    def __init__(self, length_setup: int = 9, length_countdown: int = 13):
+        self.length_setup = length_setup
+        self.length_countdown = length_countdown
+        self.n_bars = 0
+        self._closes = deque(maxlen=6)
+        self._highs = deque(maxlen=TDST_LENGTH)
+        self._lows = deque(maxlen=TDST_LENGTH)
+        self.buy_count = 0
+        self.sell_count = 0
+        self.buy_countdown = 0
+        self.sell_countdown = 0
+        self.buy_countdown_active = False
+        self.sell_countdown_active = False
+        self.tdst_buy = None
+        self.tdst_sell = None
+
+    def update(self, high: float, low: float, close: float) -> BarResult:
+        """Procesa una barra nueva y devuelve sus valores TD Sequential/TDST."""
+        closes = self._closes
+        highs = self._highs
+        lows = self._lows
+        closes.append(close)
+        highs.append(high)
+        lows.append(low)
+        i = self.n_bars
+        self.n_bars += 1
+
+        buy_setup = 0
+        sell_setup = 0
+        buy_completed = False
+        sell_completed = False
+
+        # ----------------------------
+        # 1) SETUP (misma lógica que calculate_td_sequential)
+        # ----------------------------
+        if i >= 5:
+            c4 = closes[-5]
+            if (close < c4) and (closes[-2] > closes[0]):
+                # Bearish Flip -> inicia Buy Setup
+                self.sell_count = 0
+                self.buy_count = 1
+                buy_setup = 1
+            elif (close > c4) and (closes[-2] < closes[0]):
+                # Bullish Flip -> inicia Sell Setup
+                self.buy_count = 0
+                self.sell_count = 1
+                sell_setup = 1
+            else:
+                if self.buy_count > 0:
+                    if close < c4:
+                        self.buy_count += 1
+                        buy_setup = self.buy_count
+                        if self.buy_count == self.length_setup:
+                            buy_completed = True
+                            self.buy_count = 0
+                    else:
+                        self.buy_count = 0
+
+                if self.sell_count > 0:
+                    if close > c4:
+                        self.sell_count += 1
+                        sell_setup = self.sell_count
+                        if self.sell_count == self.length_setup:
+                            sell_completed = True
+                            self.sell_count = 0
+                    else:
+                        self.sell_count = 0
+
+        # ----------------------------
+        # 2) COUNTDOWN
+        #    - Un setup completado reinicia el countdown de su lado
+        #    - Un setup contrario completado lo cancela
+        # ----------------------------
+        if buy_completed:
+            self.buy_countdown_active = True
+            self.buy_countdown = 0
+            self.sell_countdown_active = False
+        if sell_completed:
+            self.sell_countdown_active = True
+            self.sell_countdown = 0
+            self.buy_countdown_active = False
+
+        buy_cd = 0
+        sell_cd = 0
+        if self.buy_countdown_active and close <= lows[-3]:
+            self.buy_countdown += 1
+            buy_cd = self.buy_countdown
+            if buy_cd == self.length_countdown:
+                self.buy_countdown_active = False
+        if self.sell_countdown_active and close >= highs[-3]:
+            self.sell_countdown += 1
+            sell_cd = self.sell_countdown
+            if sell_cd == self.length_countdown:
+                self.sell_countdown_active = False
+
+        # ----------------------------
+        # 3) TDST (misma lógica que calculate_tdst_levels)
+        # ----------------------------
+        buy_break = False
+        sell_break = False
+        if self.tdst_buy is not None and low < self.tdst_buy:
+            self.tdst_buy = None
+            buy_break = True
+        if self.tdst_sell is not None and high > self.tdst_sell:
+            self.tdst_sell = None
+            sell_break = True
+
+        if i >= TDST_LENGTH - 1:
+            if buy_setup == TDST_LENGTH:
+                self.tdst_buy = min(lows)
+            if sell_setup == TDST_LENGTH:
+                self.tdst_sell = max(highs)
+
+        return BarResult(
+            buy_setup,
+            sell_setup,
+            buy_cd,
+            sell_cd,
+            np.nan if self.tdst_buy is None else self.tdst_buy,
+            np.nan if self.tdst_sell is None else self.tdst_sell,
+            buy_break,
+            sell_break,
+        )
+
+    def snapshot(self) -> tuple:
+        """
+        Copia ligera e inmutable del estado (comparable con ==).
+
+        Incluye las ventanas de precios, así que dos snapshots iguales garantizan que
+        las barras siguientes producirán exactamente los mismos resultados.
+        """
+        return (
+            self.n_bars,
+            tuple(self._closes), tuple(self._highs), tuple(self._lows),
+            self.buy_count, self.sell_count,
+            self.buy_countdown, self.sell_countdown,
+            self.buy_countdown_active, self.sell_countdown_active,
+            self.tdst_buy, self.tdst_sell,
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """Restaura un estado guardado con `snapshot()`."""
+        (self.n_bars, closes, highs, lows,
+         self.buy_count, self.sell_count,
+         self.buy_countdown, self.sell_countdown,
+         self.buy_countdown_active, self.sell_countdown_active,
+         self.tdst_buy, self.tdst_sell) = snapshot
+        self._closes = deque(closes, maxlen=6)
+        self._highs = deque(highs, maxlen=TDST_LENGTH)
+        self._lows = deque(lows, maxlen=TDST_LENGTH)
+
+    def signals(self, result: BarResult, symbol=None, timestamp=None) -> list:
+        """Convierte el resultado de una barra en la lista de eventos nuevos (puede ser vacía)."""
+        bar = self.n_bars - 1
+        events = []
+        if result.buy_setup_count == self.length_setup:
+            events.append(SignalEvent(symbol, timestamp, bar, BUY_SETUP, self.length_setup))
+        if result.sell_setup_count == self.length_setup:
+            events.append(SignalEvent(symbol, timestamp, bar, SELL_SETUP, self.length_setup))
+        if result.buy_countdown_count == self.length_countdown:
+            events.append(SignalEvent(symbol, timestamp, bar, BUY_COUNTDOWN, self.length_countdown))
+        if result.sell_countdown_count == self.length_countdown:
+            events.append(SignalEvent(symbol, timestamp, bar, SELL_COUNTDOWN, self.length_countdown))
+        if result.tdst_buy_break:
+            events.append(SignalEvent(symbol, timestamp, bar, TDST_BUY_BREAK, None))
+        if result.tdst_sell_break:
+            events.append(SignalEvent(symbol, timestamp, bar, TDST_SELL_BREAK, None))
+        return events
+
+    def update_many(self, high, low, close) -> pd.DataFrame:
+        """
+        Procesa un bloque de barras y devuelve un DataFrame con las columnas TD Sequential/TDST
+        (sin las columnas OHLC de entrada).
+        """
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        close = np.asarray(close, dtype=float)
+        rows = [self.update(h, l, c) for h, l, c in zip(high.tolist(), low.tolist(), close.tolist())]
+        out = pd.DataFrame.from_records(rows, columns=BarResult._fields)
+        return out.drop(columns=["tdst_buy_break", "tdst_sell_break"])
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        high_col: str = "High",
+        low_col: str = "Low",
+        close_col: str = "Close",
+        length_setup: int = 9,
+        length_countdown: int = 13,
+    ) -> "TDSequentialState":
+        """Construye el estado reproduciendo un histórico completo (operación costosa, O(n))."""
+        for col in [close_col, high_col, low_col]:
+            if col not in df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+        state = cls(length_setup=length_setup, length_countdown=length_countdown)
+        high = df[high_col].to_numpy(dtype=float).tolist()
+        low = df[low_col].to_numpy(dtype=float).tolist()
+        close = df[close_col].to_numpy(dtype=float).tolist()
+        update = state.update
+        for h, l, c in zip(high, low, close):
+            update(h, l, c)
+        return state
@@ -0,0 +1,187 @@
+"""
+Cálculo de TD Sequential en varios timeframes a partir de una única serie base.
+
+`MultiTimeframeEngine` recorre una sola vez las barras base (p.ej. de 1 minuto), construye
+incrementalmente las barras OHLC de cada timeframe superior y mantiene un
+`TDSequentialState` por timeframe. No se hace ningún resample de pandas.
+
+Alineación:
+- Una barra de timeframe superior se completa cuando la barra base cubre el final de su
+  intervalo (timestamp + base_freq >= fin del intervalo) o cuando llega una barra base de
+  otro intervalo (huecos, fines de sesión).
+- En el resultado alineado cada barra base muestra los valores de la última barra
+  COMPLETADA de cada timeframe (sin mirar al futuro).
+- Con timestamps con zona horaria los intervalos se cuentan en hora local (como
+  `resample`): la barra diaria va de medianoche a medianoche locales, no UTC. Las barras
+  de `frames` conservan la zona horaria.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .stream import BarResult, TDSequentialState
+
+
+RESULT_COLUMNS = [
+    "buy_setup_count",
+    "sell_setup_count",
+    "buy_countdown_count",
+    "sell_countdown_count",
+    "tdst_buy",
+    "tdst_sell",
+]
+
+
+class _TimeframeAggregator:
+    """Barra en curso de un timeframe y su estado TD Sequential."""
+
+    __slots__ = ("name", "size", "state", "key", "ts", "open", "high", "low", "close", "rows")
+
+    def __init__(self, name, size, state):
+        self.name = name
+        self.size = size
+        self.state = state
+        self.key = None
+        self.ts = self.open = self.high = self.low = self.close = None
+        self.rows = []  # barras completadas: (ts, o, h, l, c, BarResult)
+
+    def complete(self) -> BarResult:
+        res = self.state.update(self.high, self.low, self.close)
+        self.rows.append((self.ts, self.open, self.high, self.low, self.close, res))
+        self.key = None
+        return res
+
+
+class MultiTimeframeEngine:
+    """
+    Motor multi-timeframe de TD Sequential.
+
+    Parámetros:
+    - timeframes: frecuencias a calcular (p.ej. ("1min", "5min", "1h", "1D"))
+    - base_freq: frecuencia de la serie base; si es None se infiere en `run` (diferencia mínima)
+    - length_setup, length_countdown: igual que en `calculate_td_sequential`
+    """
+
+    def __init__(self, timeframes=("1min", "5min", "15min", "1h", "1D"), base_freq=None,
+                 length_setup: int = 9, length_countdown: int = 13):
+        if not timeframes:
+            raise ValueError("Debe indicarse al menos un timeframe")
+        self.timeframes = list(timeframes)
+        self.base_freq = None if base_freq is None else int(pd.Timedelta(base_freq).value)
+        self.tz = None
+        self._aggs = [
+            _TimeframeAggregator(tf, int(pd.Timedelta(tf).value), TDSequentialState(length_setup, length_countdown))
+            for tf in self.timeframes
+        ]
+
+    def update(self, timestamp, open_: float, high: float, low: float, close: float) -> list:
+        """
+        Procesa una barra base. Devuelve la lista de (timeframe, BarResult) de las barras
+        completadas con esta barra base (vacía si ninguna).
+        """
+        ts = pd.Timestamp(timestamp)
+        local = ts.value
+        if ts.tzinfo is not None:
+            if self.tz is None:
+                self.tz = ts.tzinfo
+            local = ts.tz_localize(None).value
+        return self._update(ts.value, local, open_, high, low, close)
+
+    def _update(self, ts: int, local: int, open_, high, low, close) -> list:
+        # ts: ns UTC; local: ns de la hora local (igual a ts sin zona horaria)
+        base = self.base_freq
+        completed = []
+        for agg in self._aggs:
+            key = local // agg.size
+            if agg.key is not None and key != agg.key:
+                completed.append((agg.name, agg.complete()))
+            if agg.key is None:
+                agg.key = key
+                agg.ts = key * agg.size - (local - ts)
+                agg.open, agg.high, agg.low = open_, high, low
+            else:
+                if high > agg.high:
+                    agg.high = high
+                if low < agg.low:
+                    agg.low = low
+            agg.close = close
+            if base is not None and local + base >= (key + 1) * agg.size:
+                completed.append((agg.name, agg.complete()))
+        return completed
+
+    def flush(self) -> list:
+        """Completa las barras en curso de todos los timeframes. Devuelve [(timeframe, BarResult)]."""
+        return [(agg.name, agg.complete()) for agg in self._aggs if agg.key is not None]
+
+    def frames(self) -> dict:
+        """Devuelve {timeframe: DataFrame} con OHLC y columnas TD Sequential/TDST de cada barra completada."""
+        out = {}
+        for agg in self._aggs:
+            index = pd.DatetimeIndex(np.array([r[0] for r in agg.rows], dtype="datetime64[ns]"))
+            if self.tz is not None:
+                index = index.tz_localize("UTC").tz_convert(self.tz)
+            df = pd.DataFrame([r[1:5] for r in agg.rows], index=index, columns=["Open", "High", "Low", "Close"])
+            res = pd.DataFrame([r[5][:6] for r in agg.rows], index=index, columns=RESULT_COLUMNS)
+            out[agg.name] = pd.concat([df, res], axis=1)
+        return out
+
+    def run(self, df: pd.DataFrame, open_col: str = "Open", high_col: str = "High",
+            low_col: str = "Low", close_col: str = "Close", flush: bool = True):
+        """
+        Procesa una serie base completa en una sola pasada.
+
+        Retorna:
+        - aligned: DataFrame con el índice base y columnas MultiIndex (timeframe, columna),
+          con los valores de la última barra completada de cada timeframe
+        - frames: {timeframe: DataFrame} con las barras de cada timeframe (ver `frames`)
+        """
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("El DataFrame base debe tener un índice DatetimeIndex")
+        for col in [open_col, close_col, high_col, low_col]:
+            if col not in df.columns:
+                raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+
+        ts = df.index.as_unit("ns").asi8 if hasattr(df.index, "as_unit") else df.index.asi8
+        local = ts
+        if df.index.tz is not None:
+            if self.tz is None:
+                self.tz = df.index.tz
+            wall = df.index.tz_localize(None)
+            local = wall.as_unit("ns").asi8 if hasattr(wall, "as_unit") else wall.asi8
+        if self.base_freq is None and len(ts) > 1:
+            self.base_freq = int(np.diff(ts).min())
+
+        n = len(df)
+        k = len(self._aggs)
+        values = np.full((n, k, len(RESULT_COLUMNS)), np.nan)
+        closed = np.zeros((n, k), dtype=bool)
+
+        o = df[open_col].to_numpy(dtype=float).tolist()
+        h = df[high_col].to_numpy(dtype=float).tolist()
+        low = df[low_col].to_numpy(dtype=float).tolist()
+        c = df[close_col].to_numpy(dtype=float).tolist()
+        positions = {agg.name: j for j, agg in enumerate(self._aggs)}
+        for i in range(n):
+            for name, res in self._update(int(ts[i]), int(local[i]), o[i], h[i], low[i], c[i]):
+                j = positions[name]
+                values[i, j] = res[:6]
+                closed[i, j] = True
+        if flush:
+            self.flush()
+
+        columns = pd.MultiIndex.from_product([self.timeframes, RESULT_COLUMNS + ["bar_closed"]])
+        blocks = []
+        rows = np.arange(n)
+        for j in range(k):
+            # Propagar hacia adelante el valor de la última barra completada
+            src = np.maximum.accumulate(np.where(closed[:, j], rows, -1))
+            block = values[np.maximum(src, 0), j, :]
+            block[src < 0] = np.nan
+            blocks.append(block)
+            blocks.append(closed[:, j:j + 1])
+        aligned = pd.DataFrame(np.hstack(blocks), index=df.index, columns=columns)
+        for tf in self.timeframes:
+            for col in RESULT_COLUMNS[:4]:
+                aligned[(tf, col)] = aligned[(tf, col)].fillna(0).astype(int)
+            aligned[(tf, "bar_closed")] = aligned[(tf, "bar_closed")].astype(bool)
+        return aligned, self.frames()
@@ -0,0 +1,181 @@
+"""
+Kernel de countdown configurable: TD Sequential, TD Combo y variantes propias en una pasada.
+
+Cada variante se describe con un `CountdownRule`; `calculate_countdown_variants` reutiliza los
+setups ya calculados (columnas de `calculate_td_sequential`) y recorre las barras UNA vez,
+avanzando el estado de todas las variantes en cada barra. Las condiciones sin estado
+(Close frente a Low/High[i-offset], etc.) se precalculan vectorizadas por variante; en el
+bucle solo queda la lógica de estado (inicio, reinicio, cancelación y fin del conteo).
+
+Semántica común a todas las variantes (igual que `calculate_td_sequential`):
+- Un setup completado (re)inicia el countdown de su lado y cancela el del lado contrario.
+- El conteo se detiene al llegar a `length`; las barras que no cuentan valen 0.
+
+Tipos de regla:
+- "sequential": empieza en la barra 9 del setup; cuenta Buy si Close <= ref[i-offset].
+- "combo" (TD Combo): empieza en la barra 1 del setup (se cuenta retroactivamente al completarse)
+  y exige además, para Buy: Low <= Low[i-1], Close < Close[i-1] y Close < Close de la barra
+  de countdown anterior (Sell simétrico).
+
+Referencia (`reference`): "low" (Low/High[i-offset]), "true_low" (true low/high:
+min(Low[i-offset], Close[i-offset-1]) / max(...)) o "close" (Close[i-offset]).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .core import calculate_td_sequential
+
+
+class CountdownRule(namedtuple("CountdownRule", ["name", "kind", "offset", "reference", "length"])):
+    """
+    Definición de una variante de countdown.
+
+    Campos:
+    - name: prefijo de las columnas de salida (`{name}_buy_countdown`, `{name}_sell_countdown`)
+    - kind: "sequential" o "combo"
+    - offset: desplazamiento de la barra de comparación (2 en TD Sequential)
+    - reference: "low", "true_low" o "close"
+    - length: longitud del countdown (13)
+    """
+    __slots__ = ()
+
+    def __new__(cls, name, kind="sequential", offset=2, reference="low", length=13):
+        if kind not in ("sequential", "combo"):
+            raise ValueError(f"Tipo de countdown desconocido: '{kind}'")
+        if reference not in ("low", "true_low", "close"):
+            raise ValueError(f"Referencia desconocida: '{reference}'")
+        if offset < 1 or length < 1:
+            raise ValueError("offset y length deben ser positivos")
+        return super().__new__(cls, name, kind, offset, reference, length)
+
+
+SEQUENTIAL = CountdownRule("sequential")
+COMBO = CountdownRule("combo", kind="combo")
+
+
+def _shift(x: np.ndarray, k: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if k < len(x):
+        out[k:] = x[:len(x) - k]
+    return out
+
+
+def _conditions(rule: CountdownRule, close, high, low):
+    """Condiciones sin estado (arrays bool) de Buy y Sell para una regla."""
+    o = rule.offset
+    if rule.reference == "low":
+        ref_b, ref_s = _shift(low, o), _shift(high, o)
+    elif rule.reference == "true_low":
+        prev = _shift(close, o + 1)
+        ref_b = np.fmin(_shift(low, o), prev)
+        ref_s = np.fmax(_shift(high, o), prev)
+        # Sin cierre previo el true low/high no está definido
+        ref_b[np.isnan(prev)] = np.nan
+        ref_s[np.isnan(prev)] = np.nan
+    else:
+        ref_b = ref_s = _shift(close, o)
+    with np.errstate(invalid="ignore"):
+        cond_b = close <= ref_b
+        cond_s = close >= ref_s
+        if rule.kind == "combo":
+            cond_b &= (low <= _shift(low, 1)) & (close < _shift(close, 1))
+            cond_s &= (high >= _shift(high, 1)) & (close > _shift(close, 1))
+    return cond_b, cond_s
+
+
+def _countdown_kernel(close, buy_setup, sell_setup, rules, conds, length_setup):
+    """Recorrido único que avanza el countdown de todas las reglas a la vez."""
+    n = len(close)
+    m = len(rules)
+    out_b = np.zeros((m, n), dtype=int)
+    out_s = np.zeros((m, n), dtype=int)
+    count = np.zeros((m, 2), dtype=int)          # contador por regla y lado (0 buy, 1 sell)
+    active = np.zeros((m, 2), dtype=bool)
+    last_close = np.full((m, 2), np.nan)         # Close de la última barra contada (TD Combo)
+    finished = np.full((m, 2), -1)               # barra del último countdown completado
+    combo = [r.kind == "combo" for r in rules]
+    lengths = [r.length for r in rules]
+    outs = (out_b, out_s)
+
+    def step(r, side, j):
+        # Avanza el conteo de la regla r en la barra j (side 0 = buy, 1 = sell)
+        cond = conds[r][side][j]
+        if cond and combo[r] and count[r, side] > 0:
+            prev = last_close[r, side]
+            cond = close[j] < prev if side == 0 else close[j] > prev
+        if not cond:
+            return
+        count[r, side] += 1
+        outs[side][r, j] = count[r, side]
+        last_close[r, side] = close[j]
+        if count[r, side] == lengths[r]:
+            active[r, side] = False
+            finished[r, side] = j
+
+    for i in range(n):
+        done = (buy_setup[i] == length_setup, sell_setup[i] == length_setup)
+        for side in (0, 1):
+            if not done[side]:
+                continue
+            for r in range(m):
+                active[r, 1 - side] = False
+                active[r, side] = True
+                count[r, side] = 0
+                if combo[r]:
+                    # TD Combo cuenta desde la barra 1 del setup (retroactivo, como mucho L barras).
+                    # Reemplaza los valores de un countdown anterior aún activo, pero nunca
+                    # antes de un countdown ya completado.
+                    start = max(i - length_setup + 1, finished[r, side] + 1, 0)
+                    outs[side][r, start:i] = 0
+                    for j in range(start, i):
+                        if active[r, side]:
+                            step(r, side, j)
+        for r in range(m):
+            for side in (0, 1):
+                if active[r, side]:
+                    step(r, side, i)
+    return out_b, out_s
+
+
+def calculate_countdown_variants(df: pd.DataFrame, rules=(SEQUENTIAL, COMBO), high_col: str = "High",
+                                 low_col: str = "Low", close_col: str = "Close",
+                                 length_setup: int = 9) -> pd.DataFrame:
+    """
+    Calcula varias variantes de countdown sobre los mismos setups en una sola pasada.
+
+    Parámetros:
+    - df: DataFrame OHLC; si ya contiene buy_setup_count/sell_setup_count se reutilizan,
+      si no se calculan con `calculate_td_sequential`
+    - rules: secuencia de `CountdownRule` (nombres únicos)
+    - length_setup: longitud del setup que dispara los countdowns
+
+    Retorna:
+    - copia de `df` con `{name}_buy_countdown` y `{name}_sell_countdown` por regla
+    """
+    rules = list(rules)
+    names = [r.name for r in rules]
+    if len(set(names)) != len(names):
+        raise ValueError("Los nombres de las reglas deben ser únicos")
+    for col in [close_col, high_col, low_col]:
+        if col not in df.columns:
+            raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+
+    if "buy_setup_count" in df.columns and "sell_setup_count" in df.columns:
+        df_res = df.copy()
+    else:
+        df_res = calculate_td_sequential(df, high_col=high_col, low_col=low_col, close_col=close_col,
+                                         length_setup=length_setup)
+
+    close = df_res[close_col].to_numpy(dtype=float)
+    high = df_res[high_col].to_numpy(dtype=float)
+    low = df_res[low_col].to_numpy(dtype=float)
+    conds = [_conditions(r, close, high, low) for r in rules]
+    out_b, out_s = _countdown_kernel(close, df_res["buy_setup_count"].to_numpy(),
+                                     df_res["sell_setup_count"].to_numpy(), rules, conds, length_setup)
+    for k, r in enumerate(rules):
+        df_res[f"{r.name}_buy_countdown"] = out_b[k]
+        df_res[f"{r.name}_sell_countdown"] = out_s[k]
+    return df_res
@@ -0,0 +1,150 @@
+"""
+Consultas por rango con calentamiento mínimo exacto (warm-start).
+
+Para obtener los conteos de un rango [start, end] no hace falta recorrer la serie desde la
+barra 0: basta empezar en una barra `s` anterior a partir de la cual el estado recalculado
+coincide con certeza con el de la serie completa. Partiendo de un estado vacío en `s`:
+
+- Setup: tras el primer Price Flip (conteo de setup = 1) los conteos de setup son exactos,
+  porque un flip fija el estado de ambos lados independientemente del anterior.
+- Countdown: tras el primer setup completado (con setups ya exactos) ambos countdowns son
+  exactos: el del mismo lado se reinicia y el contrario se cancela.
+- TDST: el nivel de compra es exacto tras el primer Buy Setup 9 (idem venta con Sell 9),
+  porque el nivel se fija solo con precios; antes de eso no se puede saber si había uno activo.
+
+`warmup_start` prueba ventanas de calentamiento crecientes (dobla el tamaño) hasta que esos
+eventos ocurren antes de `start`, o hasta llegar a la barra 0. El coste es proporcional al
+rango más la ventana necesaria, no a la longitud de la serie.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .core import _get_kernel as _get_td_kernel
+from .levels import _get_kernel as _get_tdst_kernel
+
+
+def _resolve_range(df: pd.DataFrame, start, end):
+    """Posiciones [a, b) del rango de etiquetas [start, end] (ambos inclusive)."""
+    sl = df.index.slice_indexer(start, end)
+    a, b, _ = sl.indices(len(df))
+    if b <= a:
+        raise ValueError("El rango solicitado no contiene barras")
+    return a, b
+
+
+def _compute(high, low, close, s, b, length_setup, length_countdown, levels, engine="auto"):
+    _, td_kernel = _get_td_kernel(engine, b - s)
+    out = td_kernel(close[s:b], high[s:b], low[s:b], length_setup, length_countdown)
+    if levels:
+        _, tdst_kernel = _get_tdst_kernel(engine, b - s)
+        out["tdst_buy"], out["tdst_sell"] = tdst_kernel(high[s:b], low[s:b], out["buy_setup_count"],
+                                                        out["sell_setup_count"])
+    return out
+
+
+def _compute_many(series, length_setup, length_countdown, levels, engine="auto") -> list:
+    """
+    `_compute` de varias series (tuplas high, low, close) en una sola pasada de cada kernel.
+
+    Las series se concatenan y el motor NumPy reinicia el estado al inicio de cada una (mismo
+    resultado que calcularlas por separado). Si el motor elegido para la longitud total no es
+    el NumPy, se calculan una a una. Retorna un dict por serie.
+    """
+    sizes = np.array([len(c) for _, _, c in series], dtype=np.int64)
+    total = int(sizes.sum())
+    td_engine, td_kernel = _get_td_kernel(engine, total)
+    if len(series) < 2 or td_engine != "numpy":
+        return [_compute(h, lo, c, 0, len(c), length_setup, length_countdown, levels, engine)
+                for h, lo, c in series]
+    high, low, close = (np.concatenate([s[k] for s in series]) for k in range(3))
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    out = td_kernel(close, high, low, length_setup, length_countdown, starts=starts)
+    if levels:
+        _, tdst_kernel = _get_tdst_kernel("numpy", total)
+        out["tdst_buy"], out["tdst_sell"] = tdst_kernel(high, low, out["buy_setup_count"],
+                                                        out["sell_setup_count"], starts=starts)
+    # Copias: cada resultado no retiene los arrays del lote completo
+    return [{name: arr[a:b].copy() for name, arr in out.items()} for a, b in zip(starts, ends)]
+
+
+def _exact_from(out, length_setup, levels) -> int:
+    """Primera posición (relativa) desde la que el cálculo es exacto, o None si no se alcanza."""
+    buy, sell = out["buy_setup_count"], out["sell_setup_count"]
+    flips = np.flatnonzero((buy == 1) | (sell == 1))
+    if not len(flips):
+        return None
+    f = flips[0]
+    done = np.flatnonzero(((buy == length_setup) | (sell == length_setup))[f:])
+    if not len(done):
+        return None
+    exact = f + done[0]
+    if levels:
+        for side in (buy, sell):
+            # TDST usa siempre setups de 9 barras
+            nines = np.flatnonzero(side[f:] == 9)
+            if not len(nines):
+                return None
+            exact = max(exact, f + nines[0])
+    return exact
+
+
+def warmup_start(df: pd.DataFrame, start, end=None, high_col: str = "High", low_col: str = "Low",
+                 close_col: str = "Close", length_setup: int = 9, length_countdown: int = 13,
+                 levels: bool = True, min_warmup: int = 64, engine: str = "auto") -> int:
+    """
+    Posición de la primera barra desde la que hay que calcular para que [start, end] sea exacto.
+
+    Parámetros:
+    - start, end: etiquetas del índice (inclusive), como en `df.loc[start:end]`
+    - levels: exigir también niveles TDST exactos (si False, solo conteos)
+    - min_warmup: ventana inicial de calentamiento (se dobla hasta que basta)
+    - engine: motor de cálculo, como en `calculate_td_sequential`
+    """
+    return _warm_compute(df, start, end, high_col, low_col, close_col, length_setup, length_countdown,
+                         levels, min_warmup, engine)[0]
+
+
+def _warm_compute(df, start, end, high_col, low_col, close_col, length_setup, length_countdown, levels,
+                  min_warmup, engine="auto"):
+    for col in [close_col, high_col, low_col]:
+        if col not in df.columns:
+            raise ValueError(f"Columna '{col}' no encontrada en DataFrame")
+    a, b = _resolve_range(df, start, end)
+    high = df[high_col].to_numpy(dtype=float)
+    low = df[low_col].to_numpy(dtype=float)
+    close = df[close_col].to_numpy(dtype=float)
+
+    warmup = max(int(min_warmup), 1)
+    while True:
+        s = max(a - warmup, 0)
+        out = _compute(high, low, close, s, b, length_setup, length_countdown, levels, engine)
+        if s == 0:
+            return s, a, b, out
+        exact = _exact_from(out, length_setup, levels)
+        if exact is not None and s + exact <= a:
+            return s, a, b, out
+        warmup *= 2
+
+
+def calculate_range(df: pd.DataFrame, start, end=None, high_col: str = "High", low_col: str = "Low",
+                    close_col: str = "Close", length_setup: int = 9, length_countdown: int = 13,
+                    levels: bool = True, min_warmup: int = 64, engine: str = "auto") -> pd.DataFrame:
+    """
+    Conteos TD Sequential (y niveles TDST si `levels`) exactos para `df.loc[start:end]`.
+
+    Equivale a `calculate_tdst_levels(calculate_td_sequential(df)).loc[start:end]` pero solo
+    recorre el rango más el calentamiento mínimo (ver `warmup_start`).
+
+    Retorna:
+    - copia de las filas del rango con las columnas de conteo (y tdst_buy / tdst_sell);
+      `attrs["warmup_start"]` guarda la posición desde la que se calculó
+    """
+    s, a, b, out = _warm_compute(df, start, end, high_col, low_col, close_col, length_setup,
+                                 length_countdown, levels, min_warmup, engine)
+    res = df.iloc[a:b].copy()
+    for name, values in out.items():
+        res[name] = values[a - s:]
+    res.attrs["warmup_start"] = s
+    return res
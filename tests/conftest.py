@@ -7,6 +7,18 @@ import pandas as pd
 import numpy as np
 
 
+@pytest.fixture(autouse=True, scope='session')
+def engine_profile(tmp_path_factory):
+    """
+    Aísla los tests del perfil de calibración de la máquina (engine='auto' usa la regla fija)
+    """
+    mp = pytest.MonkeyPatch()
+    path = tmp_path_factory.mktemp('calibration') / 'engine_profile.json'
+    mp.setenv('TDSEQUENTIAL_PROFILE', str(path))
+    yield path
+    mp.undo()
+
+
 @pytest.fixture
 def sample_ohlc_data():
     """
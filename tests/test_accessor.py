@@ -0,0 +1,112 @@
+"""
+Tests para el módulo accessor.py
+Testea el accessor df.td, su caché y el cálculo por grupos
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+import tdsequential  # noqa: F401  (registra df.td)
+from tdsequential.core import calculate_td_sequential, get_last_signal
+from tdsequential.levels import calculate_tdst_levels
+
+
+def _ohlc(seed, n=400):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'Open': closes,
+        'High': closes + rng.random(n),
+        'Low': closes - rng.random(n),
+        'Close': closes
+    })
+
+
+class TestTDAccessor:
+    """Tests para el accessor df.td"""
+
+    def test_matches_batch_functions(self):
+        """Conteos, TDST y frame coinciden con las funciones batch encadenadas"""
+        df = _ohlc(1)
+        expected = calculate_tdst_levels(calculate_td_sequential(df))
+        pd.testing.assert_frame_equal(df.td.frame(), expected)
+        cols = ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count', 'sell_countdown_count']
+        pd.testing.assert_frame_equal(df.td.sequential(), expected[cols])
+        pd.testing.assert_frame_equal(df.td.tdst(), expected[['tdst_buy', 'tdst_sell']])
+        assert df.td.last_signal() == get_last_signal(expected)
+
+    def test_results_are_memoized(self):
+        """Llamadas repetidas devuelven el mismo objeto sin recalcular"""
+        df = _ohlc(2)
+        first = df.td.sequential()
+        assert df.td.sequential() is first
+        assert df.td.tdst() is df.td.tdst()
+        assert df.td.sequential(length_setup=7) is not first
+
+    def test_cache_invalidated_on_in_place_change(self):
+        """Modificar los datos in situ invalida la caché"""
+        df = _ohlc(3)
+        first = df.td.sequential()
+        df.loc[df.index[200:], 'Close'] = df['Close'].iloc[200:] * 1.5
+        second = df.td.sequential()
+        assert second is not first
+        pd.testing.assert_frame_equal(second, calculate_td_sequential(df)[list(second.columns)])
+
+    def test_cache_detects_single_value_and_index_change(self):
+        """Un solo valor cambiado in situ o un índice nuevo también invalidan la caché"""
+        df = _ohlc(6)
+        first = df.td.sequential()
+        df.iloc[137, df.columns.get_loc('Low')] -= 0.25
+        second = df.td.sequential()
+        assert second is not first
+        df.index = df.index + 1000
+        third = df.td.sequential()
+        assert third is not second and third.index.equals(df.index)
+
+    def test_engines_match(self):
+        """El motor no cambia el resultado (y no forma parte de la clave de caché)"""
+        df = _ohlc(7)
+        numpy_result = df.td.frame(engine='numpy')
+        df.td.clear_cache()
+        pd.testing.assert_frame_equal(df.td.frame(engine='python'), numpy_result)
+
+    def test_cache_is_per_frame(self):
+        """Cada DataFrame tiene su propia caché; clear_cache la descarta"""
+        a, b = _ohlc(4), _ohlc(5)
+        assert not a.td.sequential().equals(b.td.sequential())
+        first = a.td.sequential()
+        a.td.clear_cache()
+        assert a.td.sequential() is not first
+
+    def test_grouped_matches_per_symbol(self):
+        """by='symbol' equivale a calcular cada símbolo por separado, aunque estén intercalados"""
+        frames = [_ohlc(10 + k).assign(symbol=s) for k, s in enumerate(['AAA', 'BBB', 'CCC'])]
+        panel = pd.concat(frames, ignore_index=True)
+        # Intercalar filas de los símbolos conservando el orden temporal de cada uno
+        panel = panel.iloc[np.argsort(np.tile(np.arange(400), 3), kind='stable')]
+        out = panel.td.frame(by='symbol')
+        for symbol, single in zip(['AAA', 'BBB', 'CCC'], frames):
+            expected = calculate_tdst_levels(calculate_td_sequential(single.reset_index(drop=True)))
+            got = out[out['symbol'] == symbol].reset_index(drop=True)
+            pd.testing.assert_frame_equal(got, expected)
+
+    def test_flags_and_plot(self):
+        """Calificadores opcionales y gráfico desde la caché"""
+        df = _ohlc(6)
+        flags = df.td.sequential(return_flags=True)
+        assert 'buy_setup_perfected' in flags.columns
+        ax = df.td.plot()
+        assert ax is not None
+        plt.close('all')
+
+    def test_missing_columns(self):
+        """Columnas inexistentes lanzan ValueError"""
+        df = _ohlc(7, n=20)
+        with pytest.raises(ValueError):
+            df.td.sequential(close_col='close')
+        with pytest.raises(ValueError):
+            df.td.sequential(by='symbol')
@@ -0,0 +1,121 @@
+"""
+Tests para el módulo backtest.py
+Testea entradas, stops, salidas y curva de capital frente a un bucle de referencia
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.backtest import backtest_signals
+
+
+def _series(seed, n=600):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    opens = closes + rng.normal(0, 0.3, n)
+    df = pd.DataFrame({
+        'Open': opens,
+        'High': np.maximum(opens, closes) + rng.random(n),
+        'Low': np.minimum(opens, closes) - rng.random(n),
+        'Close': closes
+    })
+    # calculate_tdst_levels indexa por posición (RangeIndex); las fechas se asignan después
+    res = calculate_tdst_levels(calculate_td_sequential(df))
+    res.index = pd.date_range('2020-01-01', periods=n, freq='D')
+    return res
+
+
+def _reference(df, entry_col, exit_col, stop_col, side, max_bars=None, entry_len=13, exit_len=9):
+    """Bucle barra a barra de la misma regla"""
+    close = df['Close'].to_numpy()
+    trades = []
+    pos = None
+    for i in range(len(df)):
+        if pos is not None:
+            e, level = pos
+            hit = (level == level) and (df['Low'].iat[i] < level if side > 0 else df['High'].iat[i] > level)
+            if hit:
+                op = df['Open'].iat[i]
+                px = min(level, op) if side > 0 else max(level, op)
+                trades.append((e, i, px, 'stop'))
+                pos = None
+            elif exit_col is not None and df[exit_col].iat[i] == exit_len:
+                trades.append((e, i, close[i], 'signal'))
+                pos = None
+            elif max_bars is not None and i - e >= max_bars:
+                trades.append((e, i, close[i], 'time'))
+                pos = None
+            elif i == len(df) - 1:
+                trades.append((e, i, close[i], 'end'))
+                pos = None
+        elif df[entry_col].iat[i] == entry_len and i < len(df) - 1:
+            level = df[stop_col].iat[i] if stop_col is not None else np.nan
+            pos = (i, level)
+    return trades
+
+
+class TestBacktestSignals:
+    """Tests para backtest_signals"""
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_matches_reference_long(self, seed):
+        """Countdown 13 de compra, stop en tdst_buy y salida en sell setup 9"""
+        df = _series(seed)
+        trades, _ = backtest_signals(df)
+        ref = _reference(df, 'buy_countdown_count', 'sell_setup_count', 'tdst_buy', 1)
+        assert list(trades['entry_bar']) == [t[0] for t in ref]
+        assert list(trades['exit_bar']) == [t[1] for t in ref]
+        assert list(trades['reason']) == [t[3] for t in ref]
+        np.testing.assert_allclose(trades['exit_price'], [t[2] for t in ref])
+
+    @pytest.mark.parametrize('seed', [4, 5])
+    def test_matches_reference_short_with_time_exit(self, seed):
+        """Setup 9 de venta en corto con stop tdst_sell y salida por tiempo"""
+        df = _series(seed)
+        trades, _ = backtest_signals(df, entry='sell_setup', exit='buy_setup', stop='tdst_sell', max_bars=5)
+        ref = _reference(df, 'sell_setup_count', 'buy_setup_count', 'tdst_sell', -1, max_bars=5,
+                         entry_len=9, exit_len=9)
+        assert list(zip(trades['entry_bar'], trades['exit_bar'], trades['reason'])) == \
+            [(t[0], t[1], t[3]) for t in ref]
+        assert (trades['side'] == -1).all()
+        expected = -(trades['exit_price'] / trades['entry_price'] - 1)
+        np.testing.assert_allclose(trades['return'], expected)
+
+    def test_equity_compounds_trade_returns(self):
+        """La curva de capital final es el producto de (1 + retorno) de las operaciones"""
+        df = _series(6)
+        trades, equity = backtest_signals(df, entry='buy_setup', exit='sell_setup', stop=None)
+        assert len(trades) > 0
+        assert equity.index.equals(df.index)
+        assert equity.iloc[0] == pytest.approx(1.0)
+        assert equity.iloc[-1] == pytest.approx(np.prod(1 + trades['return'].to_numpy()))
+
+    def test_panel_matches_per_symbol(self):
+        """Un panel da las mismas operaciones que cada símbolo por separado"""
+        frames = []
+        for k, symbol in enumerate(['AAA', 'BBB']):
+            res = _series(10 + k)
+            res['symbol'] = symbol
+            frames.append(res)
+        panel = pd.concat(frames)
+        trades, equity = backtest_signals(panel, entry='buy_setup', exit='sell_setup', symbol_col='symbol')
+        for symbol, res in zip(['AAA', 'BBB'], frames):
+            single, single_eq = backtest_signals(res, entry='buy_setup', exit='sell_setup')
+            got = trades[trades['symbol'] == symbol]
+            np.testing.assert_allclose(got['return'], single['return'])
+            np.testing.assert_allclose(equity[panel['symbol'] == symbol], single_eq)
+        offset = len(frames[0])
+        assert (trades.loc[trades['symbol'] == 'BBB', 'entry_bar'] >= offset).all()
+
+    def test_invalid_inputs(self):
+        """Señales desconocidas, columnas ausentes y paneles no contiguos"""
+        df = _series(1, n=100)
+        with pytest.raises(ValueError):
+            backtest_signals(df, entry='foo')
+        with pytest.raises(ValueError):
+            backtest_signals(df, stop='no_existe')
+        panel = pd.concat([df.assign(symbol='A'), df.assign(symbol='B'), df.assign(symbol='A')])
+        with pytest.raises(ValueError):
+            backtest_signals(panel, symbol_col='symbol')
@@ -0,0 +1,94 @@
+"""
+Tests para el módulo bars.py
+Testea la agregación de ticks a barras OHLC y su conexión con TD Sequential
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.bars import BarBuilder
+from tdsequential.stream import TDSequentialState
+
+
+@pytest.fixture
+def tick_data():
+    """Ticks sintéticos: ~20 ticks por minuto durante 3 horas"""
+    rng = np.random.default_rng(7)
+    n = 3600
+    seconds = np.sort(rng.integers(0, 3 * 3600, n))
+    timestamps = pd.Timestamp('2024-01-02 09:30') + pd.to_timedelta(seconds, unit='s')
+    prices = 100 + np.cumsum(rng.normal(0, 0.05, n)).round(2)
+    sizes = rng.integers(1, 500, n).astype(float)
+    return timestamps, prices, sizes
+
+
+class TestBarBuilder:
+    """Tests para la clase BarBuilder"""
+
+    def test_requires_exactly_one_mode(self):
+        """Verifica que exige exactamente un modo de barra"""
+        with pytest.raises(ValueError, match="exactamente uno"):
+            BarBuilder()
+        with pytest.raises(ValueError, match="exactamente uno"):
+            BarBuilder(freq='1min', ticks=10)
+
+    def test_time_bars_match_pandas_resample(self, tick_data):
+        """Verifica que las barras de tiempo coinciden con un resample de pandas"""
+        timestamps, prices, sizes = tick_data
+        builder = BarBuilder(freq='5min')
+        for t, p, s in zip(timestamps, prices, sizes):
+            builder.add_tick(t, p, s)
+        builder.flush()
+
+        ticks = pd.DataFrame({'price': prices, 'size': sizes}, index=timestamps)
+        expected = ticks['price'].resample('5min').ohlc().dropna()
+        bars = builder.bars.as_arrays()
+
+        np.testing.assert_array_equal(bars['timestamp'], expected.index.as_unit('ns').asi8)
+        np.testing.assert_array_equal(bars['open'], expected['open'])
+        np.testing.assert_array_equal(bars['high'], expected['high'])
+        np.testing.assert_array_equal(bars['low'], expected['low'])
+        np.testing.assert_array_equal(bars['close'], expected['close'])
+
+    @pytest.mark.parametrize("mode", [{'freq': '1min'}, {'ticks': 37}, {'volume': 5000}])
+    def test_vectorized_equals_tick_by_tick(self, tick_data, mode):
+        """Verifica que add_ticks por bloques equivale a add_tick uno a uno"""
+        timestamps, prices, sizes = tick_data
+        scalar = BarBuilder(**mode)
+        for t, p, s in zip(timestamps, prices, sizes):
+            scalar.add_tick(t, p, s)
+
+        vector = BarBuilder(**mode)
+        for chunk in np.array_split(np.arange(len(prices)), 7):
+            vector.add_ticks(timestamps[chunk], prices[chunk], sizes[chunk])
+
+        a, b = scalar.bars.as_arrays(), vector.bars.as_arrays()
+        for field in a:
+            np.testing.assert_allclose(a[field], b[field])
+
+    def test_tick_bars_close_on_nth_tick(self):
+        """Verifica que una barra de ticks se completa en el N-ésimo tick"""
+        builder = BarBuilder(ticks=3)
+        results = [builder.add_tick(pd.Timestamp('2024-01-01') + pd.Timedelta(seconds=i), 100 + i)
+                   for i in range(7)]
+
+        assert [r is not None for r in results] == [False, False, True, False, False, True, False]
+        assert results[2].open == 100 and results[2].close == 102 and results[2].high == 102
+
+    def test_feeds_td_sequential_state(self, tick_data):
+        """Verifica que las barras completadas alimentan el estado TD Sequential sin DataFrame intermedio"""
+        timestamps, prices, sizes = tick_data
+        events = []
+        builder = BarBuilder(freq='1min', symbol='XYZ', state=TDSequentialState(), on_signal=events.append)
+        builder.add_ticks(timestamps, prices, sizes)
+        builder.flush()
+
+        bars = builder.bars.as_arrays()
+        df = pd.DataFrame({'Open': bars['open'], 'High': bars['high'], 'Low': bars['low'], 'Close': bars['close']})
+        expected = calculate_td_sequential(df)
+
+        assert builder.state.n_bars == len(df)
+        n_setups = ((expected['buy_setup_count'] == 9) | (expected['sell_setup_count'] == 9)).sum()
+        assert sum(e.kind.endswith('setup') for e in events) == n_setups
+        assert all(e.symbol == 'XYZ' for e in events)
@@ -0,0 +1,130 @@
+"""
+Tests para el módulo breadth.py
+Testea los agregados diarios de amplitud frente al cálculo por símbolo agrupado y el modo en vivo
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.store import StateStore
+from tdsequential.replay import synthetic_universe
+from tdsequential.breadth import BREADTH_COLUMNS, BreadthAggregator, compute_breadth
+
+
+def _expected(frames):
+    """Panel completo barra a barra agrupado por día (la forma costosa que sustituye breadth)"""
+    rows = []
+    for df in frames.values():
+        r = calculate_tdst_levels(calculate_td_sequential(df))
+        prev_buy, prev_sell = r['tdst_buy'].shift(), r['tdst_sell'].shift()
+        buy = r['tdst_buy'].where(~(r['tdst_buy'].isna() & (r['Low'] < prev_buy)), prev_buy)
+        sell = r['tdst_sell'].where(~(r['tdst_sell'].isna() & (r['High'] > prev_sell)), prev_sell)
+        rows.append(pd.DataFrame({
+            'symbols': 1,
+            'buy_setup': r['buy_setup_count'] == 9,
+            'sell_setup': r['sell_setup_count'] == 9,
+            'buy_countdown': r['buy_countdown_count'] == 13,
+            'sell_countdown': r['sell_countdown_count'] == 13,
+            'tdst_buy_active': buy.notna(),
+            'above_tdst_buy': r['Close'] > buy,
+            'below_tdst_buy': r['Close'] < buy,
+            'tdst_sell_active': sell.notna(),
+            'above_tdst_sell': r['Close'] > sell,
+            'below_tdst_sell': r['Close'] < sell,
+        }, index=r.index))
+    out = pd.concat(rows).groupby(level=0).sum().astype('int64')
+    out.index.name = 'date'
+    return out
+
+
+@pytest.fixture
+def universe():
+    """Universo sintético con calendarios distintos por símbolo"""
+    return synthetic_universe(n_symbols=25, n_bars=300, seed=7)
+
+
+class TestComputeBreadth:
+    """Tests para compute_breadth"""
+
+    def test_matches_grouped_panel(self, universe):
+        """Los contadores diarios coinciden con agrupar el panel completo"""
+        got = compute_breadth(universe)
+        pd.testing.assert_frame_equal(got[BREADTH_COLUMNS], _expected(universe),
+                                      check_freq=False, check_index_type=False)
+        assert got['buy_setup'].sum() > 0 and got['below_tdst_buy'].sum() > 0
+        assert got['above_tdst_sell'].sum() > 0
+
+    def test_shares(self, universe):
+        """Proporciones sobre los símbolos con nivel en vigor (NaN si no hay ninguno)"""
+        got = compute_breadth(universe)
+        active = got['tdst_buy_active'] > 0
+        np.testing.assert_allclose(got.loc[active, 'share_above_tdst_buy'],
+                                   got.loc[active, 'above_tdst_buy'] / got.loc[active, 'tdst_buy_active'])
+        assert got.loc[~active, 'share_below_tdst_buy'].isna().all()
+        assert (got['share_above_tdst_sell'] + got['share_below_tdst_sell']).dropna().le(1).all()
+
+    def test_generator_input_and_engines(self, universe):
+        """Acepta un generador de DataFrames; el resultado no depende del motor"""
+        frames = (df for df in universe.values())
+        a = compute_breadth(frames, engine='python')
+        b = compute_breadth(universe, engine='numpy')
+        pd.testing.assert_frame_equal(a, b)
+        assert compute_breadth({}).empty
+
+    def test_intraday_counts_symbol_once_per_day(self, universe):
+        """Con varias barras por día cada símbolo cuenta una vez (señal en cualquier barra)"""
+        df = universe['S0000']
+        intraday = df.copy()
+        intraday.index = pd.date_range('2021-01-04 09:30', periods=len(df), freq='4h')
+        got = compute_breadth({'A': intraday})
+        days = intraday.index.normalize()
+        assert (got['symbols'] == 1).all() and len(got) == days.nunique()
+        r = calculate_td_sequential(intraday)
+        per_day = (r['buy_setup_count'] == 9).groupby(days).any()
+        assert got['buy_setup'].tolist() == per_day.astype(int).tolist()
+
+    def test_offset_strings_use_local_day(self, universe):
+        """Barras intradía en texto con offset que cruzan la medianoche UTC: día local, como add_day"""
+        df = universe['S0000'].iloc[:240]
+        local = df.copy()
+        # 16:00-23:00 en Nueva York: las últimas barras de cada sesión ya son el día siguiente en UTC
+        local.index = pd.DatetimeIndex(np.concatenate([
+            pd.date_range(d + pd.Timedelta('16:00:00'), periods=8, freq='1h')
+            for d in pd.bdate_range('2021-01-04', periods=30)])).tz_localize('America/New_York')
+        text = local.copy()
+        text.index = local.index.map(lambda t: t.isoformat())
+        got = compute_breadth({'A': text})
+        expected = compute_breadth({'A': local})
+        assert len(got) == 30 and (got['symbols'] == 1).all()
+        pd.testing.assert_frame_equal(got, expected)
+
+        assert got.index.equals(pd.DatetimeIndex(local.index.tz_localize(None).normalize().unique(), name='date'))
+
+    def test_real_data_index(self):
+        """Índice de texto con offsets horarios mixtos (datos BKX): un día por barra"""
+        bkx = pd.read_csv('tests/bkx_data.csv', index_col=0)
+        got = compute_breadth({'BKX': bkx})
+        assert len(got) == len(bkx) and (got['symbols'] == 1).all()
+        assert str(got.index[0].date()) == bkx.index[0][:10]
+        with pytest.raises(ValueError):
+            compute_breadth({'BKX': bkx.iloc[::-1]})
+
+
+class TestBreadthAggregatorLive:
+    """Tests para BreadthAggregator.add_day sobre un StateStore"""
+
+    def test_live_matches_batch(self, universe):
+        """Un update vectorizado por día da los mismos agregados que el cálculo histórico"""
+        symbols = list(universe)
+        store = StateStore(len(symbols))
+        breadth = BreadthAggregator()
+        days = sorted(set().union(*(df.index for df in universe.values())))
+        for day in days:
+            ids = [k for k, s in enumerate(symbols) if day in universe[s].index]
+            bars = [universe[symbols[k]].loc[day] for k in ids]
+            res = breadth.add_day(day, store, ids, [b['High'] for b in bars], [b['Low'] for b in bars],
+                                  [b['Close'] for b in bars])
+            assert len(res['buy_setup_count']) == len(ids)
+        pd.testing.assert_frame_equal(breadth.to_frame(), compute_breadth(universe), check_freq=False)
@@ -0,0 +1,130 @@
+"""
+Tests para el módulo calibration.py
+Testea la calibración por máquina y la selección automática de motor (engine='auto')
+"""
+
+import json
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential import calibration
+from tdsequential.calibration import calibrate, load_profile, select_engine, PROFILE_ENV
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+
+
+@pytest.fixture
+def fresh_profile(tmp_path, monkeypatch):
+    """Perfil vacío en un fichero temporal propio"""
+    path = tmp_path / 'profile.json'
+    monkeypatch.setenv(PROFILE_ENV, str(path))
+    monkeypatch.setattr(calibration, '_profile', None)
+    monkeypatch.setattr(calibration, '_missing', set())
+    return path
+
+
+def _fake_profile(faster_numpy_from):
+    """Perfil sintético: python gana hasta `faster_numpy_from` barras y numpy a partir de ahí"""
+    lengths = [32, 128, 512, 2048]
+    seconds = {
+        'python': [n * 1e-6 for n in lengths],
+        'numpy': [faster_numpy_from * 1e-6] * len(lengths),
+    }
+    profile = dict(calibration._environment(), version=calibration.PROFILE_VERSION, created='x',
+                   kernels={kind: {'lengths': lengths, 'seconds': seconds} for kind in ('td', 'tdst')})
+    return profile
+
+
+class TestCalibration:
+    """Tests para calibrate, load_profile y select_engine"""
+
+    def test_auto_without_profile_uses_static_rule(self, fresh_profile):
+        """Sin perfil engine='auto' usa la regla fija y no calibra ni escribe nada"""
+        n = calibration.STATIC_NUMPY_FROM
+        assert select_engine('td', n - 1) == 'python'
+        assert select_engine('tdst', n) == 'numpy'
+        closes = np.arange(2.0 * n)
+        df = pd.DataFrame({'High': closes + 1, 'Low': closes - 1, 'Close': closes})
+        assert calculate_td_sequential(df.iloc[:10]).attrs['engine'] == 'python'
+        res = calculate_td_sequential(df)
+        assert res.attrs['engine'] == 'numpy'
+        assert calculate_tdst_levels(res).attrs['tdst_engine'] == 'numpy'
+        assert not fresh_profile.exists()
+        assert calibration._profile is None
+
+    def test_missing_profile_is_checked_once(self, fresh_profile, monkeypatch):
+        """Sin perfil la ruta se consulta una sola vez; calibrate() vuelve a activar la búsqueda"""
+        calls = []
+        load = calibration.load_profile
+        monkeypatch.setattr(calibration, 'load_profile', lambda path=None: calls.append(path) or load(path))
+        df = pd.DataFrame({'High': np.arange(30.0) + 1, 'Low': np.arange(30.0) - 1, 'Close': np.arange(30.0)})
+        for _ in range(20):
+            calculate_tdst_levels(calculate_td_sequential(df))
+        assert calls == [str(fresh_profile)]
+        calibrate(lengths=(16, 64), min_time=0.0)
+        assert select_engine('td', 20) in ('python', 'numpy')
+        assert calibration.get_profile() is not None
+
+    def test_explicit_calibrate_saves_profile(self, fresh_profile):
+        """calibrate() guarda el perfil y pasa a ser el que usa engine='auto'"""
+        profile = calibrate(lengths=(16, 64), min_time=0.0)
+        saved = json.loads(fresh_profile.read_text())
+        assert set(saved['kernels']) == {'td', 'tdst'}
+        assert set(saved['kernels']['td']['seconds']) == set(saved['engines'])
+        assert calibration.get_profile() is profile
+
+    def test_select_engine_by_length(self, fresh_profile):
+        """El motor elegido es el más rápido en la longitud calibrada más cercana"""
+        fresh_profile.write_text(json.dumps(_fake_profile(faster_numpy_from=300)))
+        assert select_engine('td', 10) == 'python'
+        assert select_engine('td', 150) == 'python'
+        assert select_engine('tdst', 600) == 'numpy'
+        assert select_engine('td', 10 ** 6) == 'numpy'
+
+    def test_auto_records_choice_and_matches(self, fresh_profile):
+        """engine='auto' deja el motor en attrs y no cambia el resultado"""
+        fresh_profile.write_text(json.dumps(_fake_profile(faster_numpy_from=300)))
+        rng = np.random.default_rng(0)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 2000))
+        df = pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1, 'Close': closes})
+        for n, engine in [(100, 'python'), (2000, 'numpy')]:
+            res = calculate_tdst_levels(calculate_td_sequential(df.iloc[:n]))
+            assert res.attrs['engine'] == engine and res.attrs['tdst_engine'] == engine
+            expected = calculate_tdst_levels(calculate_td_sequential(df.iloc[:n], engine='python'),
+                                             engine='python')
+            pd.testing.assert_frame_equal(res, expected)
+
+    def test_stale_profile_is_ignored(self, fresh_profile):
+        """Un perfil de otra versión de NumPy o con otros motores se recalibra"""
+        profile = _fake_profile(300)
+        profile['numpy'] = '0.0.1'
+        fresh_profile.write_text(json.dumps(profile))
+        assert load_profile() is None
+        assert load_profile(str(fresh_profile.parent / 'missing.json')) is None
+
+    def test_unwritable_path_keeps_profile_in_memory(self, tmp_path, monkeypatch):
+        """Si el perfil no se puede guardar la calibración sigue activa en memoria"""
+        blocker = tmp_path / 'file'
+        blocker.write_text('x')
+        monkeypatch.setenv(PROFILE_ENV, str(blocker / 'profile.json'))
+        monkeypatch.setattr(calibration, '_profile', None)
+        profile = calibrate(lengths=(16, 64), min_time=0.0)
+        assert profile['kernels']['td']['lengths'] == [16, 64]
+        assert select_engine('td', 20) in profile['engines']
+
+    def test_invalid_lengths(self):
+        """Longitudes vacías o no positivas lanzan ValueError"""
+        with pytest.raises(ValueError):
+            calibrate(lengths=(), save=False)
+        with pytest.raises(ValueError):
+            calibrate(lengths=(0, 10), save=False)
+
+    def test_cli_calibrate(self, fresh_profile, capsys):
+        """`tdsequential calibrate` guarda el perfil e imprime los tiempos por motor"""
+        from tdsequential.cli import main
+
+        out = fresh_profile.parent / 'cli.json'
+        assert main(['calibrate', '-o', str(out)]) == 0
+        assert load_profile(str(out)) is not None
+        assert 'numpy=' in capsys.readouterr().out
@@ -0,0 +1,89 @@
+"""
+Tests para el módulo checkpoint.py
+Testea el recálculo parcial desde checkpoints tras correcciones del histórico
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.checkpoint import CheckpointedSeries
+
+
+COLUMNS = ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count',
+           'sell_countdown_count', 'tdst_buy', 'tdst_sell']
+
+
+@pytest.fixture
+def long_series():
+    """Serie de 3000 barras con random walk"""
+    rng = np.random.default_rng(5)
+    n = 3000
+    closes = 100 + np.cumsum(rng.normal(0, 1, n)).round(2)
+    return pd.DataFrame({
+        'Open': closes,
+        'High': closes + rng.random(n).round(2),
+        'Low': closes - rng.random(n).round(2),
+        'Close': closes
+    })
+
+
+def _assert_matches_batch(series, df):
+    expected = calculate_tdst_levels(calculate_td_sequential(df).reset_index(drop=True))
+    got = series.frame()
+    for col in COLUMNS:
+        np.testing.assert_array_equal(got[col].to_numpy(float), expected[col].to_numpy(float), err_msg=col)
+
+
+class TestCheckpointedSeries:
+    """Tests para la clase CheckpointedSeries"""
+
+    def test_initial_result_matches_batch(self, long_series):
+        """Verifica que el cálculo inicial coincide con el batch"""
+        series = CheckpointedSeries(long_series, every=250)
+        _assert_matches_batch(series, long_series)
+        assert sorted(series.checkpoints) == list(range(0, 3000, 250))
+
+    def test_revise_single_bar_recomputes_locally(self, long_series):
+        """Verifica que una corrección puntual solo recalcula un tramo corto"""
+        series = CheckpointedSeries(long_series, every=100)
+        corrected = long_series.copy()
+        corrected.loc[1234, ['High', 'Close']] *= 1.05
+
+        recomputed = series.revise(corrected, first_changed=1234, last_changed=1234)
+
+        _assert_matches_batch(series, corrected)
+        assert recomputed < len(long_series) - 1200
+
+    def test_revise_without_last_changed_recomputes_to_end(self, long_series):
+        """Verifica que sin last_changed se recalcula hasta el final"""
+        series = CheckpointedSeries(long_series, every=100)
+        corrected = long_series.copy()
+        corrected.loc[2000:, ['Open', 'High', 'Low', 'Close']] *= 0.5  # split
+
+        recomputed = series.revise(corrected, first_changed=2000)
+
+        _assert_matches_batch(series, corrected)
+        assert recomputed == len(long_series) - 2000
+
+    def test_revise_then_append_keeps_state(self, long_series):
+        """Verifica que tras una revisión se puede seguir añadiendo barras"""
+        head, tail = long_series.iloc[:2500], long_series.iloc[2500:]
+        series = CheckpointedSeries(head, every=200)
+        corrected = head.copy()
+        corrected.loc[100, 'Low'] -= 3
+        series.revise(corrected, first_changed=100, last_changed=100)
+        series.append(tail)
+
+        _assert_matches_batch(series, pd.concat([corrected, tail]))
+
+    def test_revise_shorter_history(self, long_series):
+        """Verifica una corrección que elimina barras del final"""
+        series = CheckpointedSeries(long_series, every=300)
+        shorter = long_series.iloc[:2700]
+
+        series.revise(shorter, first_changed=2650)
+
+        _assert_matches_batch(series, shorter)
+        assert all(k < 2700 for k in series.checkpoints)
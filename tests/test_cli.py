@@ -0,0 +1,133 @@
+"""
+Tests para el módulo cli.py
+Testea el comando `tdsequential scan` (lectura, resumen por fichero y salida NDJSON/Parquet)
+"""
+
+import json
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.cli import expand_paths, main, read_ohlc, scan_file
+
+
+def _write_csv(path, seed, n=300):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    df = pd.DataFrame({
+        'Open': closes,
+        'High': closes + rng.random(n),
+        'Low': closes - rng.random(n),
+        'Close': closes,
+        'Volume': rng.integers(0, 1000, n)
+    }, index=pd.Index(pd.date_range('2022-01-01', periods=n, freq='D').astype(str), name='Date'))
+    df.to_csv(path)
+    return df
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Directorio con varios CSV OHLC (uno en un subdirectorio) y un fichero ajeno"""
+    (tmp_path / 'sub').mkdir()
+    frames = {}
+    for k, name in enumerate(['AAA', 'BBB', 'sub/CCC']):
+        frames[name.split('/')[-1]] = _write_csv(tmp_path / f'{name}.csv', k)
+    (tmp_path / 'notes.txt').write_text('x')
+    return tmp_path, frames
+
+
+class TestScan:
+    """Tests para scan_file y main"""
+
+    def test_expand_paths(self, data_dir):
+        """Directorios recursivos, globs y rutas sin repetir; ignora otras extensiones"""
+        root, _ = data_dir
+        files = expand_paths([str(root), str(root / '*.csv')])
+        assert len(files) == 3
+        assert all(f.endswith('.csv') for f in files)
+
+    def test_scan_file_matches_batch(self, data_dir):
+        """El resumen coincide con la última barra del cálculo batch"""
+        root, frames = data_dir
+        record = scan_file(str(root / 'AAA.csv'))
+        expected = calculate_tdst_levels(calculate_td_sequential(frames['AAA'].reset_index(drop=True)))
+        last = expected.iloc[-1]
+        assert record['error'] is None
+        assert record['bars'] == 300
+        assert record['timestamp'] == frames['AAA'].index[-1]
+        for col in ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count', 'sell_countdown_count']:
+            assert record[col] == last[col]
+        for col in ['tdst_buy', 'tdst_sell']:
+            assert (record[col] is None and np.isnan(last[col])) or record[col] == pytest.approx(last[col])
+        assert record['last_signal'] is not None
+        assert record['last_signal_bars_ago'] >= 0
+
+    def test_read_parquet_only_needed_columns(self, data_dir, tmp_path, monkeypatch):
+        """De un Parquet solo se leen las columnas OHLC pedidas y la del índice"""
+        pytest.importorskip('pyarrow')
+        _, frames = data_dir
+        path = tmp_path / 'AAA.parquet'
+        frames['AAA'].to_parquet(path)
+        requested = []
+        read_parquet = pd.read_parquet
+
+        def spy(*args, **kwargs):
+            requested.append(kwargs.get('columns'))
+            return read_parquet(*args, **kwargs)
+
+        monkeypatch.setattr(pd, 'read_parquet', spy)
+        df = read_ohlc(str(path), ('High', 'Low', 'Close'))
+        assert sorted(requested[0]) == ['Close', 'Date', 'High', 'Low']
+        pd.testing.assert_frame_equal(df, frames['AAA'][['High', 'Low', 'Close']])
+        assert scan_file(str(path))['timestamp'] == frames['AAA'].index[-1]
+
+    def test_index_rule_is_the_same_for_csv_and_parquet(self, data_dir, tmp_path):
+        """Una columna Date normal, un encabezado entrecomillado o --index-col dan el mismo timestamp"""
+        pytest.importorskip('pyarrow')
+        _, frames = data_dir
+        df = frames['AAA'].reset_index()[['Open', 'High', 'Low', 'Close', 'Date']]
+        df.to_parquet(tmp_path / 'col.parquet')
+        df.to_csv(tmp_path / 'quoted.csv', index=False, quoting=1)
+        df.rename(columns={'Date': 'when'}).to_csv(tmp_path / 'when.csv', index=False)
+        last = frames['AAA'].index[-1]
+        for name in ['col.parquet', 'quoted.csv']:
+            record = scan_file(str(tmp_path / name))
+            assert record['error'] is None and record['timestamp'] == last, name
+        assert scan_file(str(tmp_path / 'when.csv'))['timestamp'] == '299'
+        assert scan_file(str(tmp_path / 'when.csv'), index_col='when')['timestamp'] == last
+        assert 'when' in scan_file(str(tmp_path / 'col.parquet'), index_col='when')['error']
+
+        out = tmp_path / 'scan.ndjson'
+        assert main(['scan', str(tmp_path / 'when.csv'), '--index-col', 'when', '-o', str(out), '-w', '0', '-q']) == 0
+        assert json.loads(out.read_text())['last_signal_timestamp'] in frames['AAA'].index
+
+    def test_bad_file_reports_error(self, tmp_path):
+        """Un fichero sin columnas OHLC se reporta en `error` sin abortar"""
+        pd.DataFrame({'Date': ['2020-01-01'], 'Price': [1.0]}).to_csv(tmp_path / 'bad.csv', index=False)
+        record = scan_file(str(tmp_path / 'bad.csv'))
+        assert 'ValueError' in record['error']
+
+    def test_main_ndjson(self, data_dir, tmp_path, capsys):
+        """`scan` escribe una línea JSON por fichero e informa el progreso por stderr"""
+        root, _ = data_dir
+        out = tmp_path / 'scan.ndjson'
+        assert main(['scan', str(root), '-o', str(out), '-w', '0']) == 0
+        lines = [json.loads(line) for line in out.read_text().splitlines()]
+        assert sorted(r['symbol'] for r in lines) == ['AAA', 'BBB', 'CCC']
+        assert 'barras/s' in capsys.readouterr().err
+
+    def test_main_parallel_parquet(self, data_dir, tmp_path):
+        """Pool de procesos con salida Parquet"""
+        pytest.importorskip('pyarrow')
+        root, _ = data_dir
+        out = tmp_path / 'scan.parquet'
+        assert main(['scan', str(root), '-o', str(out), '-w', '2', '-q']) == 0
+        table = pd.read_parquet(out)
+        assert sorted(table['symbol']) == ['AAA', 'BBB', 'CCC']
+        assert table['error'].isna().all()
+
+    def test_main_without_files(self, tmp_path):
+        """Sin ficheros que escanear el código de salida es 1"""
+        assert main(['scan', str(tmp_path / 'nada'), '-q']) == 1
@@ -6,7 +6,7 @@ Testea las funciones calculate_td_sequential y get_last_signal
 import pytest
 import pandas as pd
 import numpy as np
-from tdsequential.core import calculate_td_sequential, get_last_signal
+from tdsequential.core import calculate_td_sequential, get_last_signal, FLAG_COLUMNS
 
 
 class TestCalculateTDSequential:
@@ -227,6 +227,175 @@ class TestCalculateTDSequential:
         assert df.columns.tolist() == original_columns
 
 
+class TestQualifierFlags:
+    """Tests para los calificadores (perfección, 13 diferido, recycle) de calculate_td_sequential"""
+
+    @staticmethod
+    def _random_walk(seed, n=1500):
+        rng = np.random.default_rng(seed)
+        # Tendencias alternadas para que haya countdowns completos de ambos lados
+        drift = np.repeat(rng.choice([-0.4, 0.4], n // 100 + 1), 100)[:n]
+        closes = 100 + np.cumsum(drift + rng.normal(0, 1, n))
+        return pd.DataFrame({
+            'Open': closes,
+            'High': closes + rng.random(n),
+            'Low': closes - rng.random(n),
+            'Close': closes
+        })
+
+    @staticmethod
+    def _reference_flags(res):
+        """Calificadores recalculados a posteriori sobre los conteos (segunda pasada)"""
+        low, high, close = res['Low'].to_numpy(), res['High'].to_numpy(), res['Close'].to_numpy()
+        out = {name: np.zeros(len(res), dtype=np.int8) for name in FLAG_COLUMNS}
+        for side, setup_col, cd_col, other_col in [
+            ('buy', 'buy_setup_count', 'buy_countdown_count', 'sell_setup_count'),
+            ('sell', 'sell_setup_count', 'sell_countdown_count', 'buy_setup_count'),
+        ]:
+            setup = res[setup_col].to_numpy()
+            cd = res[cd_col].to_numpy()
+            other = res[other_col].to_numpy()
+            nines = np.flatnonzero(setup == 9)
+            for k, i in enumerate(nines):
+                if side == 'buy':
+                    out['buy_setup_perfected'][i] = min(low[i], low[i - 1]) <= min(low[i - 3], low[i - 2])
+                else:
+                    out['sell_setup_perfected'][i] = max(high[i], high[i - 1]) >= max(high[i - 3], high[i - 2])
+                if k > 0:
+                    j = nines[k - 1]
+                    active = not (cd[j:i] == 13).any() and not (other[j + 1:i] == 9).any()
+                    out[f'{side}_setup_recycle'][i] = active
+            for i in np.flatnonzero(cd == 13):
+                bar8 = np.flatnonzero(cd[:i] == 8)[-1]
+                perfected = low[i] <= close[bar8] if side == 'buy' else high[i] >= close[bar8]
+                out[f'{side}_countdown_perfected'][i] = perfected
+                out[f'{side}_countdown_deferred'][i] = not perfected
+        return out
+
+    def test_flags_match_second_pass(self):
+        """Los calificadores de la pasada única coinciden con un cálculo posterior independiente"""
+        totals = dict.fromkeys(FLAG_COLUMNS, 0)
+        for seed in range(5):
+            res = calculate_td_sequential(self._random_walk(seed), return_flags=True)
+            expected = self._reference_flags(res)
+            for name in FLAG_COLUMNS:
+                assert res[name].dtype == np.int8
+                np.testing.assert_array_equal(res[name].to_numpy(), expected[name], err_msg=name)
+                totals[name] += int(res[name].sum())
+        # Los datos ejercitan todos los calificadores
+        assert all(v > 0 for v in totals.values()), totals
+
+    def test_flags_do_not_change_counts(self):
+        """Pedir los calificadores no altera los conteos y por defecto no se añaden columnas"""
+        df = self._random_walk(7)
+        plain = calculate_td_sequential(df)
+        flagged = calculate_td_sequential(df, return_flags=True)
+        assert not set(FLAG_COLUMNS) & set(plain.columns)
+        pd.testing.assert_frame_equal(plain, flagged[plain.columns])
+
+    def test_without_perfection_no_deferred_13(self):
+        """Con apply_perfection=False todos los 13 se consideran perfeccionados"""
+        res = calculate_td_sequential(self._random_walk(1), apply_perfection=False, return_flags=True)
+        assert res['buy_countdown_deferred'].sum() == 0
+        assert res['sell_countdown_deferred'].sum() == 0
+        assert (res['buy_countdown_perfected'] == (res['buy_countdown_count'] == 13)).all()
+
+
+class TestNumpyEngine:
+    """Tests para el motor vectorizado (engine='numpy')"""
+
+    @pytest.mark.parametrize('seed,length_setup,length_countdown', [
+        (0, 9, 13), (1, 9, 13), (2, 4, 8), (3, 2, 3), (4, 1, 20), (5, 13, 21),
+    ])
+    def test_matches_python_engine(self, seed, length_setup, length_countdown):
+        """Conteos y calificadores idénticos al recorrido barra a barra, con empates y NaN"""
+        df = TestQualifierFlags._random_walk(seed)
+        if seed % 2:
+            df = df.round(0)  # empates frecuentes en las comparaciones
+        df.iloc[[50, 51, 400], [1, 2, 3]] = np.nan
+        for apply_perfection in (True, False):
+            kwargs = dict(length_setup=length_setup, length_countdown=length_countdown,
+                          apply_perfection=apply_perfection, return_flags=True)
+            pd.testing.assert_frame_equal(calculate_td_sequential(df, engine='numpy', **kwargs),
+                                          calculate_td_sequential(df, **kwargs))
+
+    def test_short_series(self):
+        """Series más cortas que las ventanas del setup"""
+        for n in range(8):
+            df = TestQualifierFlags._random_walk(n, n=n)
+            pd.testing.assert_frame_equal(calculate_td_sequential(df, engine='numpy', return_flags=True),
+                                          calculate_td_sequential(df, return_flags=True))
+
+    def test_concatenated_series_reset_at_starts(self):
+        """Con `starts` varias series concatenadas dan lo mismo que calculadas por separado"""
+        from tdsequential.core import _td_kernel, _td_kernel_numpy
+
+        frames = [TestQualifierFlags._random_walk(seed, n=n).round(0)
+                  for seed, n in enumerate([0, 3, 40, 300, 7, 500])]
+        arrays = [[df[c].to_numpy(dtype=float) for c in ('Close', 'High', 'Low')] for df in frames]
+        sizes = np.array([len(a[0]) for a in arrays])
+        ends = np.cumsum(sizes)
+        joined = [np.concatenate([a[k] for a in arrays]) for k in range(3)]
+        out = _td_kernel_numpy(*joined, 9, 13, flags=True, starts=ends - sizes)
+        for (close, high, low), a, b in zip(arrays, ends - sizes, ends):
+            expected = _td_kernel(close, high, low, 9, 13, flags=True)
+            for name, values in expected.items():
+                np.testing.assert_array_equal(out[name][a:b], values, err_msg=name)
+
+    def test_thread_pool_over_symbols(self):
+        """Sin estado compartido: un pool de hilos da lo mismo que el cálculo secuencial"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        frames = [TestQualifierFlags._random_walk(seed, n=20000) for seed in range(8)]
+        expected = [calculate_td_sequential(df, engine='numpy') for df in frames]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for _ in range(3):
+                got = list(pool.map(lambda df: calculate_td_sequential(df, engine='numpy'), frames))
+                for a, b in zip(got, expected):
+                    pd.testing.assert_frame_equal(a, b)
+
+    def test_unknown_engine(self):
+        """Un motor desconocido lanza ValueError"""
+        with pytest.raises(ValueError):
+            calculate_td_sequential(TestQualifierFlags._random_walk(0, n=20), engine='gpu')
+
+
+class TestPreserveDtype:
+    """Tests para preserve_dtype (float32 y precios enteros sin conversión a float64)"""
+
+    def test_float32_equals_float64_of_same_values(self):
+        """Con los mismos valores float32 el resultado es idéntico al modo por defecto"""
+        df = TestQualifierFlags._random_walk(3).astype('float32')
+        preserved = calculate_td_sequential(df, preserve_dtype=True, return_flags=True)
+        default = calculate_td_sequential(df, return_flags=True)
+        assert preserved['Close'].dtype == np.float32
+        pd.testing.assert_frame_equal(preserved, default)
+
+    def test_integer_ticks(self):
+        """Precios enteros: mismos conteos que sus equivalentes decimales"""
+        df = TestQualifierFlags._random_walk(4).round(2)
+        ticks = (df[['High', 'Low', 'Close']] * 100).round().astype('int64')
+        res = calculate_td_sequential(ticks, preserve_dtype=True)
+        assert res['Close'].dtype == np.int64
+        counts = ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count', 'sell_countdown_count']
+        pd.testing.assert_frame_equal(res[counts], calculate_td_sequential(df)[counts])
+        nullable = ticks.astype('Int64')
+        pd.testing.assert_frame_equal(calculate_td_sequential(nullable, preserve_dtype=True)[counts], res[counts])
+
+    def test_invalid_dtypes(self):
+        """Tipos no numéricos, mezclas no exactas o enteros con ausentes lanzan ValueError"""
+        base = pd.DataFrame({'High': [2, 3], 'Low': [0, 1], 'Close': [1, 2]})
+        with pytest.raises(ValueError):
+            calculate_td_sequential(base.assign(Close=[1.5, 2.5]), preserve_dtype=True)
+        with pytest.raises(ValueError):
+            calculate_td_sequential(base.assign(Close=['a', 'b']), preserve_dtype=True)
+        with pytest.raises(ValueError):
+            calculate_td_sequential(base.astype('Int64').assign(Low=pd.array([0, None], dtype='Int64')),
+                                    preserve_dtype=True)
+        with pytest.raises(ValueError):
+            calculate_td_sequential(base.assign(High=np.array([2, 3], dtype=np.uint64)), preserve_dtype=True)
+
+
 class TestGetLastSignal:
     """Tests para la función get_last_signal"""
 
@@ -0,0 +1,127 @@
+"""
+Tests para el módulo evaluation.py
+Testea retornos futuros, MAE/MFE y estadísticas por señal frente a bucles de referencia
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.evaluation import forward_returns, excursions, event_study, summarize_events
+
+
+@pytest.fixture
+def panel():
+    """Panel de 3 símbolos concatenados con sus conteos TD Sequential"""
+    rng = np.random.default_rng(8)
+    frames = []
+    for symbol in ['AAA', 'BBB', 'CCC']:
+        n = 400
+        closes = 100 + np.cumsum(rng.normal(0, 1, n))
+        df = pd.DataFrame({
+            'Open': closes,
+            'High': closes + rng.random(n),
+            'Low': closes - rng.random(n),
+            'Close': closes
+        }, index=pd.date_range('2020-01-01', periods=n, freq='D'))
+        res = calculate_td_sequential(df)
+        res['symbol'] = symbol
+        frames.append(res)
+    return pd.concat(frames)
+
+
+class TestForwardReturns:
+    """Tests para forward_returns y excursions"""
+
+    def test_matches_python_loop(self):
+        """Verifica los retornos futuros frente a un bucle simple"""
+        close = np.arange(1.0, 31.0)
+        bars = np.array([0, 10, 25, 29])
+        got = forward_returns(close, bars, horizons=(1, 5))
+
+        for k, b in enumerate(bars):
+            for j, h in enumerate((1, 5)):
+                expected = close[b + h] / close[b] - 1 if b + h < len(close) else np.nan
+                np.testing.assert_allclose(got[k, j], expected)
+
+    def test_horizon_does_not_cross_groups(self):
+        """Verifica que un horizonte no cruza al siguiente símbolo"""
+        close = np.arange(1.0, 11.0)
+        groups = np.array([0] * 5 + [1] * 5)
+        got = forward_returns(close, np.array([3, 4, 5]), horizons=(1,), groups=groups)
+
+        assert not np.isnan(got[0, 0])
+        assert np.isnan(got[1, 0])
+        assert not np.isnan(got[2, 0])
+
+    def test_excursions_buy_and_sell(self):
+        """Verifica MAE/MFE a favor de la señal"""
+        close = np.array([100.0, 100, 100, 100])
+        high = np.array([100.0, 110, 105, 100])
+        low = np.array([100.0, 95, 90, 100])
+
+        mae, mfe = excursions(high, low, close, np.array([0, 0]), 3, np.array([1, -1]))
+
+        np.testing.assert_allclose(mfe, [0.10, 0.10])
+        np.testing.assert_allclose(mae, [-0.10, -0.10])
+
+
+class TestEventStudy:
+    """Tests para event_study y summarize_events"""
+
+    def test_event_study_on_panel_matches_loop(self, panel):
+        """Verifica la tabla de eventos del panel frente a un cálculo por evento"""
+        events = event_study(panel, horizons=(1, 5, 10), symbol_col='symbol')
+
+        expected = 0
+        for symbol, g in panel.groupby('symbol'):
+            g = g.reset_index(drop=True)
+            mask = ((g['buy_setup_count'] == 9) | (g['sell_setup_count'] == 9) |
+                    (g['buy_countdown_count'] == 13) | (g['sell_countdown_count'] == 13))
+            expected += mask.sum()
+            sub = events[events['symbol'] == symbol]
+            first = sub.iloc[0]
+            local = int(first['bar']) - int(np.flatnonzero(panel['symbol'].to_numpy() == symbol)[0])
+            ret = g.loc[local + 5, 'Close'] / g.loc[local, 'Close'] - 1 if local + 5 < len(g) else np.nan
+            np.testing.assert_allclose(first['ret_5'], ret)
+        assert len(events) == expected
+        np.testing.assert_allclose(events['signed_ret_5'], events['ret_5'] * events['side'])
+
+    def test_unsorted_panel_is_grouped(self, panel):
+        """Verifica que un panel intercalado se agrupa por símbolo antes de calcular"""
+        shuffled = panel.sort_index(kind='stable')
+        a = event_study(panel, symbol_col='symbol')
+        b = event_study(shuffled, symbol_col='symbol')
+
+        cols = ['symbol', 'kind', 'ret_10', 'mae', 'mfe']
+        key = ['symbol', 'kind', 'timestamp']
+        pd.testing.assert_frame_equal(a.sort_values(key)[cols].reset_index(drop=True),
+                                      b.sort_values(key)[cols].reset_index(drop=True))
+
+    def test_unsorted_panel_reports_caller_positions(self, panel):
+        """En un panel intercalado `bar` es la posición de la fila en el DataFrame recibido"""
+        shuffled = panel.sort_index(kind='stable')
+        events = event_study(shuffled, symbol_col='symbol')
+
+        rows = shuffled.iloc[events['bar'].to_numpy()]
+        np.testing.assert_array_equal(rows['symbol'].to_numpy(), events['symbol'].to_numpy())
+        np.testing.assert_array_equal(rows.index.to_numpy(), events['timestamp'].to_numpy())
+        completed = ((rows['buy_setup_count'] == 9) | (rows['sell_setup_count'] == 9) |
+                     (rows['buy_countdown_count'] == 13) | (rows['sell_countdown_count'] == 13))
+        assert completed.all()
+
+    def test_summary_hit_rates(self, panel):
+        """Verifica las estadísticas por tipo de señal"""
+        events = event_study(panel, horizons=(5,), symbol_col='symbol')
+        summary = summarize_events(events, horizons=(5,))
+
+        for kind, row in summary.iterrows():
+            r = events.loc[events['kind'] == kind, 'signed_ret_5'].dropna()
+            assert row['events'] == (events['kind'] == kind).sum()
+            np.testing.assert_allclose(row['hit_rate_5'], (r > 0).mean())
+            np.testing.assert_allclose(row['mean_5'], r.mean())
+
+    def test_requires_td_columns(self):
+        """Verifica que exige las columnas de conteo"""
+        with pytest.raises(ValueError, match="no contiene columnas TD Sequential"):
+            event_study(pd.DataFrame({'Close': [1.0]}))
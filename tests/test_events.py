@@ -0,0 +1,119 @@
+"""
+Tests para el módulo events.py
+Testea la extracción de eventos y el almacén Parquet particionado
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.events import extract_signal_events, SignalEventStore
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def bkx_signals():
+    """Resultado de calculate_td_sequential sobre los datos BKX"""
+    df = pd.read_csv('tests/bkx_data.csv', index_col=0)
+    df.index = pd.to_datetime(df.index.str[:10])  # solo la fecha (el CSV mezcla offsets -05:00/-04:00)
+    return calculate_td_sequential(df)
+
+
+class TestExtractSignalEvents:
+    """Tests para la función extract_signal_events"""
+
+    def test_one_row_per_completed_signal(self, bkx_signals):
+        """Verifica que hay un evento por cada 9/13 completado"""
+        events = extract_signal_events(bkx_signals, symbol='BKX')
+        expected = sum((bkx_signals[c] == v).sum() for c, v in [
+            ('buy_setup_count', 9), ('sell_setup_count', 9),
+            ('buy_countdown_count', 13), ('sell_countdown_count', 13)])
+
+        assert len(events) == expected
+        assert events['bar'].is_monotonic_increasing
+        assert (events['timestamp'] == bkx_signals.index[events['bar']]).all()
+        assert (events['symbol'] == 'BKX').all()
+
+    def test_requires_td_columns(self):
+        """Verifica que exige las columnas de conteo"""
+        with pytest.raises(ValueError, match="no contiene columnas TD Sequential"):
+            extract_signal_events(pd.DataFrame({'Close': [1.0]}))
+
+
+class TestSignalEventStore:
+    """Tests para la clase SignalEventStore"""
+
+    @pytest.fixture
+    def store(self, tmp_path, bkx_signals):
+        store = SignalEventStore(tmp_path / "events", row_group_size=8)
+        # Tres "símbolos" con el mismo histórico desplazado para tener varios por día
+        for k, symbol in enumerate(['AAA', 'BBB', 'CCC']):
+            df = bkx_signals.copy()
+            df.index = df.index + pd.Timedelta(hours=k)
+            store.append_frame(df, symbol)
+        return store
+
+    def test_query_symbol_time_range(self, store, bkx_signals):
+        """Verifica la consulta de un símbolo entre dos fechas"""
+        events = extract_signal_events(bkx_signals, symbol='BBB')
+        events['timestamp'] += pd.Timedelta(hours=1)
+        t1, t2 = events['timestamp'].iloc[3], events['timestamp'].iloc[-3]
+
+        got = store.query(symbol='BBB', start=t1, end=t2)
+        expected = events[(events['timestamp'] >= t1) & (events['timestamp'] <= t2)]
+
+        assert len(got) == len(expected)
+        np.testing.assert_array_equal(got['bar'].to_numpy(), expected['bar'].to_numpy())
+        assert (got['symbol'] == 'BBB').all()
+
+    def test_query_tz_aware_range(self, store, bkx_signals):
+        """Un rango con zona horaria se compara en UTC, como se guardan los timestamps"""
+        events = extract_signal_events(bkx_signals, symbol='AAA')
+        t1, t2 = events['timestamp'].iloc[2], events['timestamp'].iloc[-2]
+        naive = store.query(symbol='AAA', start=t1, end=t2)
+        aware = store.query(symbol='AAA', start=t1.tz_localize('UTC').tz_convert('America/New_York'),
+                            end=t2.tz_localize('UTC').tz_convert('America/New_York'))
+
+        assert len(aware) > 0
+        pd.testing.assert_frame_equal(aware, naive)
+
+    def test_all_countdowns_on_date(self, store, bkx_signals):
+        """Verifica la consulta de todos los countdown 13 de un día"""
+        day = bkx_signals.index[bkx_signals['buy_countdown_count'] == 13][0].normalize()
+        got = store.on_date(day, kind='buy_countdown')
+
+        assert set(got['symbol']) == {'AAA', 'BBB', 'CCC'}
+        assert (got['timestamp'].dt.normalize() == day).all()
+        assert (got['kind'] == 'buy_countdown').all()
+
+    def test_partitions_by_month(self, store, bkx_signals):
+        """Verifica que los eventos se particionan por mes, con un fichero por append"""
+        events = extract_signal_events(bkx_signals)
+        months = sorted(set(events['timestamp'].dt.to_period('M').dt.start_time))
+        assert store.partitions() == months
+        assert len(store._files()) <= 3 * len(months)
+
+    def test_compact_and_batch_append(self, tmp_path, store, bkx_signals):
+        """compact deja un fichero por mes sin cambiar las consultas; append_frames escribe uno"""
+        before = store.query()
+        assert store.compact() > 0
+        assert len(store._files()) == len(store.partitions())
+        pd.testing.assert_frame_equal(store.query(), before)
+        assert store.compact() == 0
+
+        batch = SignalEventStore(tmp_path / "batch")
+        frames = {}
+        for k, symbol in enumerate(['AAA', 'BBB', 'CCC']):
+            df = bkx_signals.copy()
+            df.index = df.index + pd.Timedelta(hours=k)
+            frames[symbol] = df
+        batch.append_frames(frames)
+        assert len(batch._files()) == len(batch.partitions())
+        pd.testing.assert_frame_equal(batch.query(), before)
+
+    def test_empty_range_returns_empty_frame(self, store):
+        """Verifica que un rango sin datos devuelve un DataFrame vacío"""
+        got = store.query(start='1990-01-01', end='1990-12-31')
+        assert len(got) == 0
+        assert list(got.columns) == ['timestamp', 'symbol', 'kind', 'bar', 'close']
@@ -0,0 +1,76 @@
+"""
+Tests para el módulo ingest.py
+Testea la ingesta por bloques frente al cálculo sobre el fichero completo
+"""
+
+import os
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.ingest import iter_csv_results, ingest_csv, RESULT_COLUMNS
+from tdsequential.stream import TDSequentialState
+
+
+BKX_CSV = os.path.join(os.path.dirname(__file__), 'bkx_data.csv')
+
+
+def _expected(**read_kwargs):
+    df = pd.read_csv(BKX_CSV, index_col=0, **read_kwargs)
+    res = calculate_tdst_levels(calculate_td_sequential(df.reset_index(drop=True)))
+    res.index = df.index
+    return res[RESULT_COLUMNS]
+
+
+class TestChunkedIngestion:
+    """Tests para iter_csv_results e ingest_csv"""
+
+    @pytest.mark.parametrize('chunksize', [1, 37, 100, 10_000])
+    def test_chunks_match_full_file(self, chunksize):
+        """El resultado por bloques es idéntico al del fichero completo, sea cual sea el bloque"""
+        out = pd.concat(iter_csv_results(BKX_CSV, chunksize=chunksize))
+        pd.testing.assert_frame_equal(out, _expected(), check_dtype=False)
+
+    def test_pyarrow_parser(self):
+        """El lector pyarrow coincide con pandas en precisión round-trip"""
+        pytest.importorskip('pyarrow')
+        out = pd.concat(iter_csv_results(BKX_CSV, chunksize=50, parser='pyarrow'))
+        pd.testing.assert_frame_equal(out, _expected(float_precision='round_trip'), check_dtype=False)
+
+    def test_resume_from_state(self, tmp_path):
+        """Una segunda ingesta continúa desde el estado devuelto por la primera"""
+        df = pd.read_csv(BKX_CSV, index_col=0)
+        first, second = tmp_path / 'a.csv', tmp_path / 'b.csv'
+        df.iloc[:300].to_csv(first)
+        df.iloc[300:].to_csv(second)
+        state = ingest_csv(str(first), chunksize=64)
+        assert isinstance(state, TDSequentialState)
+        out = pd.concat(iter_csv_results(str(second), state=state, chunksize=64))
+        pd.testing.assert_frame_equal(out, _expected().iloc[300:], check_dtype=False)
+
+    def test_writes_output_as_it_goes(self, tmp_path):
+        """La salida CSV (y Parquet si hay pyarrow) contiene todas las barras"""
+        out_csv = tmp_path / 'out.csv'
+        state = ingest_csv(BKX_CSV, str(out_csv), chunksize=100, keep_ohlc=True)
+        written = pd.read_csv(out_csv, index_col=0)
+        assert state.n_bars == len(written) == 502
+        assert list(written.columns) == ['High', 'Low', 'Close'] + RESULT_COLUMNS
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return
+        out_pq = tmp_path / 'out.parquet'
+        ingest_csv(BKX_CSV, str(out_pq), chunksize=100)
+        pd.testing.assert_frame_equal(pd.read_parquet(out_pq), _expected(), check_dtype=False,
+                                      check_index_type=False)
+
+    def test_invalid_inputs(self):
+        """Columnas, lector o tamaño de bloque inválidos"""
+        with pytest.raises(ValueError):
+            next(iter_csv_results(BKX_CSV, close_col='close'))
+        with pytest.raises(ValueError):
+            next(iter_csv_results(BKX_CSV, parser='polars'))
+        with pytest.raises(ValueError):
+            next(iter_csv_results(BKX_CSV, chunksize=0))
@@ -4,6 +4,7 @@ Tests de integración usando datos reales del BKX Index
 
 import pytest
 import pandas as pd
+import numpy as np
 from tdsequential.core import calculate_td_sequential, get_last_signal
 from tdsequential.levels import calculate_tdst_levels
 from tdsequential.plot import plot_td_sequential
@@ -183,3 +184,24 @@ class TestBKXIntegration:
         if len(first_sell_setup) > 0:
             first_idx = df_result.index.get_loc(first_sell_setup[0])
             assert first_idx >= 5, "El setup no puede aparecer antes de la barra 5"
+
+    @pytest.mark.parametrize('engine', ['python', 'numpy'])
+    def test_float32_and_tick_prices_match_float64(self, bkx_data, engine):
+        """float32 y precios enteros en ticks (preserve_dtype) dan los mismos conteos y niveles"""
+        counts = ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count', 'sell_countdown_count']
+        reference = calculate_tdst_levels(calculate_td_sequential(bkx_data).reset_index(drop=True))
+
+        f32 = bkx_data.astype('float32').reset_index(drop=True)
+        res = calculate_tdst_levels(calculate_td_sequential(f32, preserve_dtype=True, engine=engine),
+                                    preserve_dtype=True, engine=engine)
+        assert res['Close'].dtype == np.float32 and res['tdst_buy'].dtype == np.float32
+        pd.testing.assert_frame_equal(res[counts], reference[counts])
+        for col in ['tdst_buy', 'tdst_sell']:
+            np.testing.assert_array_equal(res[col].to_numpy(), reference[col].to_numpy(dtype=np.float32))
+
+        ticks = (bkx_data[['High', 'Low', 'Close']] * 100).round().astype('int64').reset_index(drop=True)
+        res = calculate_tdst_levels(calculate_td_sequential(ticks, preserve_dtype=True, engine=engine),
+                                    preserve_dtype=True, engine=engine)
+        assert res['Close'].dtype == np.int64
+        pd.testing.assert_frame_equal(res[counts], reference[counts])
+        np.testing.assert_allclose(res['tdst_sell'] / 100, reference['tdst_sell'])
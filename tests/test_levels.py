@@ -6,6 +6,7 @@ Testea la función calculate_tdst_levels
 import pytest
 import pandas as pd
 import numpy as np
+from tdsequential.core import calculate_td_sequential
 from tdsequential.levels import calculate_tdst_levels
 
 
@@ -322,3 +323,72 @@ class TestCalculateTDSTLevels:
         # Los valores antiguos deberían ser sobrescritos con NaN (sin setups completados)
         assert df_result['tdst_buy'].isna().all()
         assert df_result['tdst_sell'].isna().all()
+
+    def test_datetime_index(self):
+        """Los niveles se calculan por posición: un DatetimeIndex da el mismo resultado"""
+        rng = np.random.default_rng(0)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 300))
+        df = calculate_td_sequential(pd.DataFrame({
+            'Open': closes,
+            'High': closes + rng.random(300),
+            'Low': closes - rng.random(300),
+            'Close': closes
+        }))
+        expected = calculate_tdst_levels(df)
+        dated = df.set_axis(pd.date_range('2020-01-01', periods=300, freq='D'))
+        got = calculate_tdst_levels(dated)
+        np.testing.assert_array_equal(got['tdst_buy'].to_numpy(), expected['tdst_buy'].to_numpy())
+        np.testing.assert_array_equal(got['tdst_sell'].to_numpy(), expected['tdst_sell'].to_numpy())
+
+
+class TestNumpyEngine:
+    """Tests para el motor vectorizado de niveles TDST (engine='numpy')"""
+
+    @pytest.mark.parametrize('seed', [0, 1, 2, 3])
+    def test_matches_python_engine(self, seed):
+        """Mismos niveles que el recorrido barra a barra, también con NaN en los precios"""
+        rng = np.random.default_rng(seed)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 3000))
+        if seed % 2:
+            closes = np.round(closes)
+        df = calculate_td_sequential(pd.DataFrame({
+            'Open': closes,
+            'High': closes + rng.random(3000),
+            'Low': closes - rng.random(3000),
+            'Close': closes
+        }))
+        df.loc[rng.integers(0, 3000, 10), ['High', 'Low']] = np.nan
+        pd.testing.assert_frame_equal(calculate_tdst_levels(df, engine='numpy'), calculate_tdst_levels(df))
+
+    def test_concatenated_series_reset_at_starts(self):
+        """Con `starts` un nivel no pasa de una serie concatenada a la siguiente"""
+        from tdsequential.levels import _tdst_kernel, _tdst_kernel_numpy
+
+        rng = np.random.default_rng(4)
+        frames = []
+        for k, n in enumerate([5, 400, 0, 250, 12, 600]):
+            # Cada serie más arriba que la anterior: su nivel TDST Buy nunca se rompería en la siguiente
+            closes = np.round(100 + 1000 * k + np.cumsum(rng.normal(0, 1, n)))
+            if n > 20:
+                # Termina con un Buy Setup 9: su nivel sigue activo en la última barra
+                closes[-14:] = closes[-15] + np.r_[1:6, 5 - 5 * np.arange(1, 10)]
+            frames.append(calculate_td_sequential(pd.DataFrame({
+                'High': closes + rng.random(n), 'Low': closes - rng.random(n), 'Close': closes})))
+        joined = pd.concat(frames, ignore_index=True)
+        sizes = np.array([len(df) for df in frames])
+        ends = np.cumsum(sizes)
+        buy, sell = _tdst_kernel_numpy(joined['High'].to_numpy(), joined['Low'].to_numpy(),
+                                       joined['buy_setup_count'].to_numpy(), joined['sell_setup_count'].to_numpy(),
+                                       starts=ends - sizes)
+        for df, a, b in zip(frames, ends - sizes, ends):
+            expected = _tdst_kernel(df['High'].to_numpy(), df['Low'].to_numpy(), df['buy_setup_count'].to_numpy(),
+                                    df['sell_setup_count'].to_numpy())
+            np.testing.assert_array_equal(buy[a:b], expected[0])
+            np.testing.assert_array_equal(sell[a:b], expected[1])
+
+    def test_empty_and_unknown_engine(self):
+        """DataFrame vacío y motor desconocido"""
+        df = pd.DataFrame({'High': [], 'Low': [], 'buy_setup_count': [], 'sell_setup_count': []})
+        assert len(calculate_tdst_levels(df, engine='numpy')) == 0
+        with pytest.raises(ValueError):
+            calculate_tdst_levels(df, engine='gpu')
@@ -0,0 +1,71 @@
+"""
+Tests para el módulo live.py
+Testea el modo en vivo con buffer circular y memoria constante
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.live import LiveTDSequential, RingBuffer
+
+
+class TestRingBuffer:
+    """Tests para la clase RingBuffer"""
+
+    def test_keeps_last_rows_in_order(self):
+        """Verifica que conserva las últimas filas en orden cronológico"""
+        buf = RingBuffer(capacity=4, width=1)
+        for i in range(10):
+            buf.append(i, [float(i)])
+
+        assert len(buf) == 4
+        np.testing.assert_array_equal(buf.timestamps(), [6, 7, 8, 9])
+        np.testing.assert_array_equal(buf.values()[:, 0], [6, 7, 8, 9])
+
+    def test_partial_fill(self):
+        """Verifica el orden antes de llenar el buffer"""
+        buf = RingBuffer(capacity=5, width=2)
+        buf.append(1, [1.0, 2.0])
+        buf.append(2, [3.0, 4.0])
+
+        np.testing.assert_array_equal(buf.timestamps(), [1, 2])
+
+    def test_invalid_capacity_raises(self):
+        """Verifica que la capacidad debe ser positiva"""
+        with pytest.raises(ValueError):
+            RingBuffer(capacity=0, width=1)
+
+
+class TestLiveTDSequential:
+    """Tests para la clase LiveTDSequential"""
+
+    def test_tail_matches_batch(self, real_world_like_data):
+        """Verifica que las últimas barras del buffer coinciden con el cálculo batch"""
+        df = real_world_like_data.copy()
+        df.index = pd.date_range('2024-01-01', periods=len(df), freq='D')
+        live = LiveTDSequential(tail=30)
+        for ts, row in df.iterrows():
+            live.update(ts, row['Open'], row['High'], row['Low'], row['Close'])
+
+        expected = calculate_tdst_levels(calculate_td_sequential(df).reset_index(drop=True)).iloc[-30:]
+        got = live.frame()
+
+        assert live.n_bars == len(df)
+        assert got.index.equals(df.index[-30:])
+        for col in ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count',
+                    'sell_countdown_count', 'tdst_buy', 'tdst_sell']:
+            np.testing.assert_array_equal(got[col].to_numpy(float), expected[col].to_numpy(float))
+
+    def test_memory_is_constant(self):
+        """Verifica que la memoria no crece con el número de barras procesadas"""
+        live = LiveTDSequential(tail=50)
+        nbytes = live.buffer.nbytes
+        for i in range(5000):
+            price = 100 + np.sin(i / 7.0) * 5
+            live.update(i, price, price + 1, price - 1, price)
+
+        assert live.buffer.nbytes == nbytes
+        assert len(live.buffer) == 50
+        assert len(live.state.snapshot()[1]) <= 6
@@ -0,0 +1,174 @@
+"""
+Tests para el módulo metrics.py
+Testea histogramas HDR, contadores, gauges, exportación Prometheus y la integración con SignalStream
+"""
+
+import asyncio
+import sys
+import threading
+import urllib.request
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.metrics import Histogram, MetricsRegistry, start_http_server
+from tdsequential.aio import SignalStream
+from tdsequential.stream import Bar
+
+
+class TestHistogram:
+    """Tests para Histogram"""
+
+    def test_quantiles_within_relative_error(self):
+        """Los cuantiles tienen error relativo <= 2**-significant_bits en todo el rango"""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(9, 2, 50_000).astype(np.int64)
+        h = Histogram(significant_bits=5)
+        for v in values[:10_000].tolist():
+            h.record_ns(v)
+        record = h.recorder()
+        for v in values[10_000:20_000].tolist():
+            record(v)
+        h.record_many(values[20_000:])
+        h.fold()
+        assert h.count == len(values)
+        assert h.sum_ns == int(values.sum()) and h.max_ns == int(values.max())
+        for q in (0.01, 0.5, 0.9, 0.99, 0.999):
+            exact = np.quantile(values, q, method='inverted_cdf')
+            assert abs(h.quantile(q) * 1e9 - exact) <= exact * 2 ** -5 + 1
+
+    def test_small_values_are_exact(self):
+        """Valores por debajo de 2**(bits+1) ns tienen cubeta propia"""
+        h = Histogram(significant_bits=3)
+        h.record_many([0, 1, 2, 3, 15])
+        assert h.quantile(0.2) == 0.0
+        assert h.quantile(1.0) == pytest.approx(15e-9)
+        assert np.isnan(Histogram().quantile(0.5))
+
+    def test_buffer_is_folded(self):
+        """record_ns vuelca el buffer al llenarse"""
+        h = Histogram(buffer_size=8)
+        for v in range(20):
+            h.record_ns(v)
+        assert len(h._buf) < 8 and h.count >= 16
+
+    def test_concurrent_record_and_fold_is_exact(self):
+        """Varios hilos registran y vuelcan a la vez sin duplicar ni perder valores"""
+        hist = Histogram(buffer_size=64)
+        n_threads, per_thread = 8, 20000
+        barrier = threading.Barrier(n_threads + 1)
+        stop = threading.Event()
+
+        def writer(k):
+            record = hist.recorder() if k % 2 else hist.record_ns
+            barrier.wait()
+            for i in range(per_thread):
+                record(1000 + i)
+                if i % 997 == 0:
+                    hist.fold()
+
+        def reader():
+            barrier.wait()
+            while not stop.is_set():
+                hist.summary()
+                hist.cumulative()
+
+        threads = [threading.Thread(target=writer, args=(k,)) for k in range(n_threads)]
+        scraper = threading.Thread(target=reader)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # cambios de hilo frecuentes para provocar volcados simultáneos
+        try:
+            for t in threads + [scraper]:
+                t.start()
+            for t in threads:
+                t.join()
+            stop.set()
+            scraper.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert hist.summary()['count'] == n_threads * per_thread
+        assert int(hist.counts.sum()) == n_threads * per_thread
+        assert hist.sum_ns == n_threads * sum(range(1000, 1000 + per_thread))
+
+    def test_invalid_precision(self):
+        """significant_bits fuera de rango lanza ValueError"""
+        with pytest.raises(ValueError):
+            Histogram(significant_bits=0)
+
+
+class TestMetricsRegistry:
+    """Tests para MetricsRegistry y el exportador Prometheus"""
+
+    def test_prometheus_text_format(self):
+        """Contadores con etiquetas, gauges calculados e histogramas acumulados"""
+        m = MetricsRegistry()
+        m.counter('bars_total', 'Barras').inc(3)
+        signals = m.counter('signals_total', 'Señales', labelnames=('kind',))
+        signals.labels(kind='buy_setup').inc()
+        signals.labels('sell "x"').inc(2)
+        m.gauge('queue_depth', fn=lambda: 7)
+        m.gauge('backlog', labelnames=('symbol',), fn=lambda: {'AAA': 2})
+        h = m.histogram('latency_seconds', 'Latencia')
+        h.record_many([500, 5_000, 50_000_000])
+        text = m.to_prometheus()
+        assert '# TYPE bars_total counter\nbars_total 3\n' in text
+        assert 'signals_total{kind="buy_setup"} 1' in text
+        assert 'signals_total{kind="sell \\"x\\""} 2' in text
+        assert 'queue_depth 7' in text and 'backlog{symbol="AAA"} 2' in text
+        assert 'latency_seconds_bucket{le="1e-06"} 1' in text
+        assert 'latency_seconds_bucket{le="0.1"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert 'latency_seconds_count 3' in text
+        snap = m.snapshot()
+        assert snap['bars_total'] == 3 and snap['signals_total']['sell "x"'] == 2
+        assert snap['latency_seconds']['count'] == 3
+
+    def test_same_name_is_shared(self):
+        """Pedir dos veces una métrica devuelve la misma; con otro tipo lanza ValueError"""
+        m = MetricsRegistry()
+        assert m.counter('x_total') is m.counter('x_total')
+        with pytest.raises(ValueError):
+            m.histogram('x_total')
+        with pytest.raises(ValueError):
+            m.counter('y_total', labelnames=('a',)).labels(1, 2)
+
+    def test_http_exporter(self):
+        """El exportador HTTP sirve el texto para un scrape local"""
+        m = MetricsRegistry()
+        m.counter('bars_total').inc()
+        server = start_http_server(m, port=0)
+        try:
+            host, port = server.server_address[:2]
+            with urllib.request.urlopen(f'http://{host}:{port}/metrics', timeout=5) as resp:
+                assert 'bars_total 1' in resp.read().decode()
+                assert resp.headers['Content-Type'].startswith('text/plain')
+        finally:
+            server.shutdown()
+
+
+class TestSignalStreamMetrics:
+    """Tests para las métricas de SignalStream"""
+
+    def test_stream_publishes_metrics(self, real_world_like_data):
+        """Latencia por barra, barras, señales, warm-ups y backlog por símbolo"""
+        df = real_world_like_data
+        metrics = MetricsRegistry()
+
+        async def main():
+            stream = SignalStream(metrics=metrics, yield_every=16)
+            await stream.warm_up('AAA', df.iloc[:30])
+            for i, row in enumerate(df.iloc[30:].itertuples()):
+                await stream.put(Bar('AAA', i, row.Open, row.High, row.Low, row.Close))
+            await stream.close()
+            assert metrics.snapshot()['tdsequential_queue_depth'] == len(df) - 30 + 2
+            return [e async for e in stream.events()]
+
+        events = asyncio.run(main())
+        snap = metrics.snapshot()
+        assert snap['tdsequential_bars_total'] == len(df) - 30
+        assert snap['tdsequential_update_latency_seconds']['count'] == len(df) - 30
+        assert snap['tdsequential_catchup_recomputes_total'] == 1
+        assert sum(snap['tdsequential_signals_total'].values()) == len(events)
+        assert snap['tdsequential_queue_depth'] == 0
+        assert snap['tdsequential_symbol_backlog'] == {}
@@ -0,0 +1,108 @@
+"""
+Tests para el módulo reconcile.py
+Testea la alineación por timestamp, los tipos de discrepancia y la ejecución en paralelo
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.reconcile import (
+    compute_signals, compare_signals, reconcile_symbol, reconcile_universe, DIVERGENCE_KINDS
+)
+
+
+def _ohlc(seed, n=300):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'Open': closes,
+        'High': closes + rng.random(n),
+        'Low': closes - rng.random(n),
+        'Close': closes
+    }, index=pd.date_range('2021-01-01', periods=n, freq='D'))
+
+
+@pytest.fixture
+def reference():
+    """Referencia de proveedor idéntica a nuestro cálculo"""
+    return compute_signals(_ohlc(3))
+
+
+class TestCompareSignals:
+    """Tests para compare_signals"""
+
+    def test_identical_has_no_mismatches(self, reference):
+        """Sin diferencias, la tabla de discrepancias está vacía"""
+        ours = compute_signals(reference[['Open', 'High', 'Low', 'Close']])
+        assert len(compare_signals(ours, reference)) == 0
+
+    def test_detects_each_kind(self, reference):
+        """Conteos, presencia/nivel TDST y timestamps ausentes se clasifican por tipo"""
+        ours = compute_signals(reference[['Open', 'High', 'Low', 'Close']])
+        ref = reference.copy()
+        t = ref.index
+        ref.loc[t[50], 'buy_setup_count'] += 1
+        ref.loc[t[60], 'sell_countdown_count'] = 7
+        level_bar = np.flatnonzero(ref['tdst_buy'].notna().to_numpy())[0]
+        ref.loc[t[level_bar], 'tdst_buy'] *= 1.01
+        empty_bar = np.flatnonzero(ref['tdst_sell'].isna().to_numpy())[-1]
+        ref.loc[t[empty_bar], 'tdst_sell'] = 123.0
+        ref = ref.drop(t[100])
+        ours = ours.drop(t[200])
+
+        mm = compare_signals(ours, ref)
+        got = dict(zip(zip(mm['timestamp'], mm['column']), mm['kind']))
+        assert got[(t[50], 'buy_setup_count')] == 'setup_count'
+        assert got[(t[60], 'sell_countdown_count')] == 'countdown_count'
+        assert got[(t[level_bar], 'tdst_buy')] == 'tdst_level'
+        assert got[(t[empty_bar], 'tdst_sell')] == 'tdst_presence'
+        assert (mm.loc[mm['timestamp'] == t[100], 'kind'] == 'missing_reference').all()
+        assert (mm.loc[mm['timestamp'] == t[200], 'kind'] == 'missing_ours').all()
+        assert (mm['timestamp'] == t[100]).sum() == 1
+        assert mm['timestamp'].is_monotonic_increasing
+
+    def test_column_map_and_tolerance(self, reference):
+        """Columnas del proveedor con otro nombre y diferencias dentro de la tolerancia"""
+        ours = reference.copy()
+        ref = reference.rename(columns={'tdst_buy': 'TDST_SUPPORT'})
+        ref['TDST_SUPPORT'] *= 1 + 1e-9
+        assert len(compare_signals(ours, ref, column_map={'tdst_buy': 'TDST_SUPPORT'})) == 0
+        with pytest.raises(ValueError):
+            compare_signals(ours, ref)
+
+
+class TestReconcile:
+    """Tests para reconcile_symbol y reconcile_universe"""
+
+    def test_symbol_summary_first_divergence(self, reference):
+        """El resumen informa la primera barra divergente y su tipo"""
+        ref = reference.copy()
+        ref.loc[ref.index[80], 'buy_countdown_count'] = 99
+        ref.loc[ref.index[150], 'sell_setup_count'] = 99
+        summary = reconcile_symbol(ref, symbol='AAA')
+        assert summary['mismatches'] == 2
+        assert summary['first_bar'] == 80
+        assert summary['first_timestamp'] == ref.index[80]
+        assert summary['first_kind'] == 'countdown_count'
+        assert summary['setup_count'] == 1
+
+    def test_universe_in_parallel(self):
+        """Un resumen por símbolo; los errores de carga quedan registrados sin abortar"""
+        data = {f'S{k}': compute_signals(_ohlc(k)) for k in range(6)}
+        data['S2'].loc[data['S2'].index[30], 'tdst_sell'] = 1.0
+
+        def load(symbol):
+            if symbol == 'BAD':
+                raise KeyError(symbol)
+            return data[symbol]
+
+        with ThreadPoolExecutor(4) as pool:
+            out = reconcile_universe(list(data) + ['BAD'], load, executor=pool)
+        assert list(out.index) == list(data) + ['BAD']
+        assert out.loc['S2', 'mismatches'] == 1
+        assert out.loc['S2', 'first_bar'] == 30
+        assert (out.drop(['S2', 'BAD'])['mismatches'] == 0).all()
+        assert 'KeyError' in out.loc['BAD', 'error']
+        assert set(DIVERGENCE_KINDS) <= set(out.columns)
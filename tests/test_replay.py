@@ -0,0 +1,108 @@
+"""
+Tests para el módulo replay.py
+Testea el generador sintético, el intercalado por timestamp y el replay con verificación contra el batch
+"""
+
+import asyncio
+import json
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.cli import main
+from tdsequential.metrics import MetricsRegistry
+from tdsequential.replay import interleave, replay, run_replay, synthetic_universe, verify_results
+
+
+@pytest.fixture
+def bkx_data():
+    """Datos reales del BKX Index (offsets horarios mixtos en el índice)"""
+    return pd.read_csv('tests/bkx_data.csv', index_col=0)
+
+
+class TestSyntheticAndInterleave:
+    """Tests para synthetic_universe e interleave"""
+
+    def test_synthetic_universe_is_deterministic(self):
+        """La misma semilla da los mismos datos; cada símbolo tiene su propio calendario"""
+        a = synthetic_universe(n_symbols=5, n_bars=200, seed=3)
+        b = synthetic_universe(n_symbols=5, n_bars=200, seed=3)
+        assert list(a) == list(b)
+        for symbol in a:
+            pd.testing.assert_frame_equal(a[symbol], b[symbol])
+            df = a[symbol]
+            assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+            assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+        assert len({len(df) for df in a.values()}) > 1
+        with pytest.raises(ValueError):
+            synthetic_universe(missing=1.0)
+
+    def test_interleave_orders_by_timestamp(self, bkx_data):
+        """Orden global por fecha, orden propio de cada símbolo y empates en el orden de frames"""
+        frames = synthetic_universe(n_symbols=4, n_bars=100, seed=1)
+        frames['BKX'] = bkx_data
+        items = list(interleave(frames))
+        assert len(items) == sum(len(df) for df in frames.values())
+        times = [t for _, t in items]
+        assert times == sorted(times)
+        for symbol, df in frames.items():
+            closes = [bar.close for bar, _ in items if bar.symbol == symbol]
+            assert closes == df['Close'].tolist()
+        first = [bar.symbol for bar, t in items if t == times[-1]]
+        assert first == [s for s in frames if s in first]
+
+    def test_unsorted_index_raises(self):
+        """Un índice desordenado lanza ValueError (también dentro de replay, sin bloquearse)"""
+        df = synthetic_universe(n_symbols=1, n_bars=50)['S0000'].iloc[::-1]
+        with pytest.raises(ValueError, match='ordenado'):
+            list(interleave({'X': df}))
+        with pytest.raises(ValueError, match='ordenado'):
+            run_replay({'X': df})
+
+
+class TestReplay:
+    """Tests para replay"""
+
+    def test_replay_matches_batch(self, bkx_data):
+        """Replay sin esperas: todas las barras, latencias y verificación contra el batch"""
+        frames = synthetic_universe(n_symbols=20, n_bars=300, seed=2)
+        frames['BKX'] = bkx_data
+        metrics = MetricsRegistry()
+        report = run_replay(frames, maxsize=64, metrics=metrics)
+        n = sum(len(df) for df in frames.values())
+        assert report['bars'] == n and report['symbols'] == 21
+        assert report['verified'] is True and report['mismatches'] == []
+        assert report['latency']['count'] == n and report['update_latency']['count'] == n
+        assert report['latency']['p50'] >= report['update_latency']['p50']
+        assert sum(report['signals'].values()) > 0
+        assert metrics.snapshot()['tdsequential_signals_total'] == report['signals']
+        assert 'tdsequential_replay_latency_seconds_count' in metrics.to_prometheus()
+
+    def test_speedup_paces_delivery(self):
+        """Con speedup la duración sigue al rango de fechas dividido por el factor"""
+        frames = synthetic_universe(n_symbols=3, n_bars=60, freq='1min', missing=0.0)
+        start = min(df.index[0] for df in frames.values())
+        span = (max(df.index[-1] for df in frames.values()) - start).total_seconds()
+        report = asyncio.run(replay(frames, speedup=span / 0.2, verify=False))
+        assert report['seconds'] >= 0.2
+        assert report['verified'] is None
+        assert report['bars'] == sum(len(df) for df in frames.values())
+        with pytest.raises(ValueError):
+            run_replay(frames, speedup=0)
+
+    def test_verify_detects_mismatch(self):
+        """verify_results señala los símbolos cuyo resultado difiere del batch"""
+        frames = synthetic_universe(n_symbols=2, n_bars=100, seed=4)
+        results = {s: [] for s in frames}
+        for bar, _ in interleave(frames):
+            results[bar.symbol].append((0, 0, 0, 0, np.nan, np.nan, False, False))
+        assert verify_results(frames, results) == list(frames)
+
+    def test_cli_replay(self, tmp_path, capsys):
+        """`tdsequential replay` imprime el informe y termina con 0 si la verificación pasa"""
+        path = tmp_path / 'AAA.csv'
+        synthetic_universe(n_symbols=1, n_bars=120)['S0000'].to_csv(path)
+        assert main(['replay', str(path), '--synthetic', '2', '--bars', '80']) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report['symbols'] == 3 and report['verified'] is True
+        assert main(['replay']) == 1
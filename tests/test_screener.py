@@ -0,0 +1,90 @@
+"""
+Tests para el módulo screener.py
+Testea las consultas de umbral sobre el estado actual del universo
+"""
+
+import pytest
+import numpy as np
+from tdsequential.stream import TDSequentialState
+from tdsequential.screener import Screener
+
+
+@pytest.fixture
+def screener():
+    """Screener con 300 símbolos tras 250 barras de random walk"""
+    rng = np.random.default_rng(21)
+    n_symbols, n_bars = 300, 250
+    closes = 100 + np.cumsum(rng.normal(0, 1, (n_bars, n_symbols)), axis=0)
+    highs = closes + rng.random((n_bars, n_symbols))
+    lows = closes - rng.random((n_bars, n_symbols))
+    scr = Screener(symbols=[f"S{i:03d}" for i in range(n_symbols)])
+    ids = np.arange(n_symbols)
+    for t in range(n_bars):
+        scr.update(ids, highs[t], lows[t], closes[t])
+    scr.prices = (highs, lows, closes)
+    return scr
+
+
+class TestScreener:
+    """Tests para la clase Screener"""
+
+    def test_requires_store_or_capacity(self):
+        """Verifica que exige un store o una capacidad"""
+        with pytest.raises(ValueError):
+            Screener()
+
+    def test_threshold_query_matches_brute_force(self, screener):
+        """Verifica que la consulta por cubetas coincide con un filtrado directo"""
+        df = screener.frame()
+        for col in ['buy_setup', 'sell_setup', 'buy_countdown', 'sell_countdown']:
+            for k in [0, 1, 5, 7, 9, 13]:
+                expected = np.flatnonzero(df[col].to_numpy() >= k)
+                np.testing.assert_array_equal(screener.query(**{col: k}), expected)
+
+    def test_combined_query_with_tdst_distance(self, screener):
+        """Verifica una consulta combinada de countdown y distancia al TDST"""
+        df = screener.frame()
+        got = screener.query(sell_countdown=1, tdst_sell_within=0.05)
+        mask = (df['sell_countdown'] >= 1) & (df['tdst_sell_distance'] <= 0.05)
+        np.testing.assert_array_equal(got, np.flatnonzero(mask.to_numpy()))
+
+    def test_countdown_column_matches_scalar_state(self, screener):
+        """Verifica que el countdown en curso coincide con TDSequentialState"""
+        highs, lows, closes = screener.prices
+        countdowns = screener.column('buy_countdown')
+        for sid in range(0, 300, 37):
+            state = TDSequentialState()
+            for t in range(len(closes)):
+                res = state.update(highs[t, sid], lows[t, sid], closes[t, sid])
+            expected = state.buy_countdown if (state.buy_countdown_active or res.buy_countdown_count == 13) else 0
+            assert countdowns[sid] == expected
+
+    def test_index_refreshes_after_update(self, screener):
+        """Verifica que el índice se invalida al llegar barras nuevas"""
+        before = screener.query(buy_setup=1)
+        highs, lows, closes = screener.prices
+        ids = np.arange(300)
+        screener.update(ids, highs[-1] * 0.5, lows[-1] * 0.5, closes[-1] * 0.5)  # caída brusca
+        after = screener.query(buy_setup=1)
+
+        df = screener.frame()
+        np.testing.assert_array_equal(after, np.flatnonzero(df['buy_setup'].to_numpy() >= 1))
+        assert len(after) > len(before)
+        assert df.index[0] == 'S000'
+
+    def test_partial_updates_move_ids_incrementally(self, screener):
+        """Las barras de unos pocos símbolos actualizan el índice sin reconstruirlo"""
+        highs, lows, closes = screener.prices
+        for name in ['buy_setup', 'sell_countdown']:
+            screener.ids_at_least(name, 0)
+        rng = np.random.default_rng(5)
+        for _ in range(20):
+            ids = rng.choice(300, 20, replace=False)
+            factor = 1 + rng.normal(0, 0.05, 20)
+            screener.update(ids, highs[-1, ids] * factor, lows[-1, ids] * factor, closes[-1, ids] * factor)
+            assert 'buy_setup' in screener._index
+            df = screener.frame()
+            for name in ['buy_setup', 'sell_countdown']:
+                for threshold in range(0, 14):
+                    expected = np.flatnonzero(df[name].to_numpy() >= threshold)
+                    np.testing.assert_array_equal(np.sort(screener.ids_at_least(name, threshold)), expected)
@@ -0,0 +1,150 @@
+"""
+Tests para el módulo server.py
+Testea el servicio local: micro-batching, coalescencia, caché de series y API HTTP
+"""
+
+import asyncio
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.server import TDServer, TDService, RESULT_COLUMNS, load_test, request
+
+
+def _walk(seed, n=400):
+    rng = np.random.default_rng(seed)
+    closes = np.round(100 + np.cumsum(rng.normal(0, 1, n)), 1)
+    return pd.DataFrame({'High': closes + 0.5, 'Low': closes - 0.5, 'Close': closes})
+
+
+def _batch(df):
+    return calculate_tdst_levels(calculate_td_sequential(df))
+
+
+class TestTDService:
+    """Tests para TDService"""
+
+    def test_update_batches_match_batch(self):
+        """Barras de muchos símbolos (incluidas repetidas en la misma ventana) coinciden con el batch"""
+        frames = {f'S{k}': _walk(k, 120) for k in range(5)}
+        service = TDService(capacity=2, batch_window=0.01)
+
+        async def main():
+            results = {s: [] for s in frames}
+            for t in range(0, 120, 3):
+                # Tres barras por símbolo en la misma ventana: se aplican en orden
+                calls, keys = [], []
+                for s, df in frames.items():
+                    for row in df.iloc[t:t + 3].itertuples():
+                        calls.append(service.update(s, row.High, row.Low, row.Close))
+                        keys.append(s)
+                for s, res in zip(keys, await asyncio.gather(*calls)):
+                    results[s].append(res)
+            return results
+
+        results = asyncio.run(main())
+        assert service.store.capacity >= 5
+        assert service.stats['update_batches'] < service.stats['updates']
+        for s, df in frames.items():
+            expected = _batch(df)
+            got = pd.DataFrame(results[s])
+            for col in RESULT_COLUMNS:
+                np.testing.assert_array_equal(got[col].to_numpy(float), expected[col].to_numpy(float))
+            assert service.state(s)['bars'] == 120
+
+    def test_compute_coalesces_caches_and_extends(self):
+        """Peticiones idénticas comparten cálculo; una serie extendida solo recalcula la cola"""
+        df = _walk(7, 3000)
+        service = TDService()
+        args = [df['High'], df['Low'], df['Close']]
+
+        async def main():
+            first = await asyncio.gather(*[service.compute('AAA', *[a.iloc[:2500] for a in args])
+                                           for _ in range(8)])
+            again = await service.compute('AAA', *[a.iloc[:2500] for a in args])
+            longer = await service.compute('AAA', *args)
+            return first, again, longer
+
+        first, again, longer = asyncio.run(main())
+        assert all(out is first[0] for out in first) and again is first[0]
+        assert service.stats['coalesced'] == 7
+        assert service.stats['cache_hits'] == 1
+        assert service.stats['extended'] == 1
+        expected = _batch(df)
+        for col in RESULT_COLUMNS:
+            np.testing.assert_array_equal(longer[col].astype(float), expected[col].to_numpy(float))
+
+    def test_compute_window_is_one_kernel_pass(self):
+        """Las series de una ventana (nuevas y extendidas) se calculan en una sola pasada del kernel"""
+        frames = {f'S{k}': _walk(k, 150 + 37 * k) for k in range(12)}
+        service = TDService(batch_window=0.05)
+
+        def cols(df, n=None):
+            return [df[c].iloc[:n].to_numpy() for c in ('High', 'Low', 'Close')]
+
+        async def main():
+            await service.compute('S0', *cols(frames['S0'], 120))
+            return await asyncio.gather(*[service.compute(s, *cols(df)) for s, df in frames.items()])
+
+        results = asyncio.run(main())
+        assert service.stats['compute_batches'] == 2
+        assert service.kernels.labels('compute').summary()['count'] == 2
+        assert service.stats['extended'] == 1
+        for (s, df), out in zip(frames.items(), results):
+            expected = _batch(df)
+            for col in RESULT_COLUMNS:
+                np.testing.assert_array_equal(out[col].astype(float), expected[col].to_numpy(float),
+                                              err_msg=f"{s} {col}")
+
+    def test_invalid_inputs(self):
+        """Series de distinta longitud o símbolos desconocidos lanzan ValueError"""
+        service = TDService()
+        with pytest.raises(ValueError):
+            asyncio.run(service.compute('AAA', [1.0, 2.0], [1.0], [1.0, 2.0]))
+        with pytest.raises(ValueError):
+            service.state('ZZZ')
+
+
+class TestTDServer:
+    """Tests para la API HTTP de TDServer"""
+
+    def test_http_api(self):
+        """update, compute, state y stats por HTTP con latencias p50/p99"""
+        df = _walk(3, 300)
+        expected = _batch(df)
+
+        async def main():
+            server = TDServer(port=0)
+            await server.start()
+            addr = server.address
+            try:
+                status, body = await request(addr, 'POST', '/update', {'bars': [
+                    {'symbol': 'AAA', 'high': h, 'low': l, 'close': c}
+                    for h, l, c in zip(df['High'], df['Low'], df['Close'])]})
+                assert status == 200 and len(body['results']) == 300
+                status, state = await request(addr, 'GET', '/state/AAA')
+                assert status == 200 and state['bars'] == 300
+                status, out = await request(addr, 'POST', '/compute', {
+                    'symbol': 'AAA', 'high': df['High'].tolist(), 'low': df['Low'].tolist(),
+                    'close': df['Close'].tolist(), 'tail': 10})
+                assert status == 200 and len(out['buy_setup_count']) == 10
+                assert (await request(addr, 'GET', '/state/ZZZ'))[0] == 404
+                assert (await request(addr, 'POST', '/compute', {'symbol': 'AAA'}))[0] == 400
+                report = await load_test(addr, n_requests=500, concurrency=8, symbols=20)
+                assert report['requests'] == 500 and report['p99_ms'] >= report['p50_ms']
+                status, stats = await request(addr, 'GET', '/stats')
+                status, text = await request(addr, 'GET', '/metrics')
+                assert status == 200
+                assert 'tdsequential_server_request_seconds_count{route="POST /update"}' in text
+                return state, out, stats
+            finally:
+                await server.close()
+
+        state, out, stats = asyncio.run(main())
+        last = expected.iloc[-1]
+        assert state['buy_setup_count'] == last['buy_setup_count']
+        assert out['sell_setup_count'] == expected['sell_setup_count'].iloc[-10:].tolist()
+        assert stats['latency']['POST /update']['count'] >= 501
+        assert 'p99_ms' in stats['latency']['POST /update']
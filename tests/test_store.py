@@ -0,0 +1,88 @@
+"""
+Tests para el módulo store.py
+Testea el almacén de estado vectorizado y mapeado en memoria
+"""
+
+import pytest
+import numpy as np
+from tdsequential.stream import TDSequentialState
+from tdsequential.store import StateStore
+
+
+def _random_panel(n_symbols, n_bars, seed=0):
+    """Panel de precios (barras x símbolos) con random walk"""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, (n_bars, n_symbols)), axis=0).round(1)
+    highs = closes + rng.random((n_bars, n_symbols)).round(1)
+    lows = closes - rng.random((n_bars, n_symbols)).round(1)
+    return highs, lows, closes
+
+
+class TestStateStore:
+    """Tests para la clase StateStore"""
+
+    def test_vectorized_update_matches_scalar_state(self):
+        """Verifica que la actualización vectorizada coincide con TDSequentialState por símbolo"""
+        n_symbols, n_bars = 40, 400
+        highs, lows, closes = _random_panel(n_symbols, n_bars)
+        rng = np.random.default_rng(1)
+        store = StateStore(n_symbols)
+        states = [TDSequentialState() for _ in range(n_symbols)]
+        positions = np.zeros(n_symbols, dtype=int)
+
+        for _ in range(n_bars):
+            # Cada paso llega una barra para un subconjunto aleatorio de símbolos
+            ids = np.flatnonzero(rng.random(n_symbols) < 0.7)
+            ids = ids[positions[ids] < n_bars]
+            p = positions[ids]
+            out = store.update(ids, highs[p, ids], lows[p, ids], closes[p, ids])
+            for k, sid in enumerate(ids):
+                res = states[sid].update(highs[p[k], sid], lows[p[k], sid], closes[p[k], sid])
+                assert (out['buy_setup_count'][k], out['sell_setup_count'][k],
+                        out['buy_countdown_count'][k], out['sell_countdown_count'][k]) == tuple(res[:4])
+                np.testing.assert_array_equal([out['tdst_buy'][k], out['tdst_sell'][k]], res[4:6])
+                assert (out['tdst_buy_break'][k], out['tdst_sell_break'][k]) == tuple(res[6:8])
+            positions[ids] += 1
+
+    def test_memory_mapped_store_survives_reopen(self, tmp_path):
+        """Verifica que el estado persiste en disco y se reanuda tras reabrir"""
+        path = tmp_path / "state.bin"
+        highs, lows, closes = _random_panel(10, 120, seed=3)
+        ids = np.arange(10)
+
+        store = StateStore(10, path=str(path))
+        for t in range(60):
+            store.update(ids, highs[t], lows[t], closes[t])
+        store.close()
+
+        reopened = StateStore.open(str(path))
+        for t in range(60, 120):
+            reopened.update(ids, highs[t], lows[t], closes[t])
+
+        reference = StateStore(10)
+        for t in range(120):
+            reference.update(ids, highs[t], lows[t], closes[t])
+
+        for name in ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count',
+                     'sell_countdown_count', 'tdst_buy', 'tdst_sell', 'n_bars']:
+            np.testing.assert_array_equal(getattr(reopened, name), getattr(reference, name))
+
+    def test_reader_process_sees_updates_zero_copy(self, tmp_path):
+        """Verifica que un lector en modo 'r' ve las escrituras del proceso de ingesta"""
+        path = str(tmp_path / "state.bin")
+        writer = StateStore(5, path=path)
+        reader = StateStore.open(path, mode="r")
+        highs, lows, closes = _random_panel(5, 30, seed=4)
+        for t in range(30):
+            writer.update(np.arange(5), highs[t], lows[t], closes[t])
+
+        np.testing.assert_array_equal(reader.n_bars, [30] * 5)
+        np.testing.assert_array_equal(reader.buy_setup_count, writer.buy_setup_count)
+        assert not reader.buy_setup_count.flags.writeable
+
+    def test_open_rejects_invalid_file(self, tmp_path):
+        """Verifica que rechaza ficheros que no son de estado"""
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"x" * 128)
+        with pytest.raises(ValueError, match="no es un fichero de estado"):
+            StateStore.open(str(path))
@@ -0,0 +1,300 @@
+"""
+Tests para los módulos stream.py y aio.py
+Testea el cálculo incremental y el consumidor asyncio multi-símbolo
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.stream import (
+    TDSequentialState, Bar, BUY_SETUP, SELL_SETUP, BUY_COUNTDOWN, SELL_COUNTDOWN,
+)
+from tdsequential.aio import (
+    SignalStream, ComputeExecutor, calculate_td_sequential_async, calculate_tdst_levels_async,
+)
+
+
+def _batch(df, **kwargs):
+    """Resultado batch de referencia (TD Sequential + TDST)"""
+    return calculate_tdst_levels(calculate_td_sequential(df, **kwargs).reset_index(drop=True))
+
+
+class TestTDSequentialState:
+    """Tests para la clase TDSequentialState"""
+
+    COLUMNS = ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count',
+               'sell_countdown_count', 'tdst_buy', 'tdst_sell']
+
+    def test_matches_batch_on_real_like_data(self, real_world_like_data):
+        """Verifica que el modo incremental coincide barra a barra con el cálculo batch"""
+        df = real_world_like_data
+        expected = _batch(df)
+        result = TDSequentialState().update_many(df['High'], df['Low'], df['Close'])
+
+        for col in self.COLUMNS:
+            np.testing.assert_array_equal(result[col].to_numpy(float), expected[col].to_numpy(float))
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_batch_with_custom_lengths(self, seed):
+        """Verifica la equivalencia con longitudes personalizadas y series largas"""
+        rng = np.random.default_rng(seed)
+        n = 800
+        closes = 100 + np.cumsum(rng.normal(0, 1, n)).round(1)
+        df = pd.DataFrame({
+            'Open': closes,
+            'High': closes + rng.random(n).round(1),
+            'Low': closes - rng.random(n).round(1),
+            'Close': closes
+        })
+        expected = _batch(df, length_setup=7, length_countdown=10)
+        result = TDSequentialState(7, 10).update_many(df['High'], df['Low'], df['Close'])
+
+        for col in self.COLUMNS:
+            np.testing.assert_array_equal(result[col].to_numpy(float), expected[col].to_numpy(float))
+
+    def test_from_frame_equals_incremental(self, real_world_like_data):
+        """Verifica que from_frame deja el mismo estado que procesar barra a barra"""
+        df = real_world_like_data
+        a = TDSequentialState.from_frame(df)
+        b = TDSequentialState()
+        b.update_many(df['High'], df['Low'], df['Close'])
+
+        assert a.n_bars == b.n_bars == len(df)
+        assert (a.buy_count, a.sell_count, a.buy_countdown, a.sell_countdown) == \
+            (b.buy_count, b.sell_count, b.buy_countdown, b.sell_countdown)
+
+    def test_from_frame_missing_column_raises(self):
+        """Verifica que from_frame valida las columnas"""
+        df = pd.DataFrame({'High': [1.0], 'Low': [0.5]})
+        with pytest.raises(ValueError, match="Columna.*no encontrada"):
+            TDSequentialState.from_frame(df)
+
+    def test_signals_on_setup_completion(self, complete_sell_setup_data):
+        """Verifica que se emite un evento al completar un Sell Setup"""
+        df = complete_sell_setup_data
+        state = TDSequentialState()
+        kinds = []
+        for h, l, c in zip(df['High'], df['Low'], df['Close']):
+            kinds += [e.kind for e in state.signals(state.update(h, l, c))]
+
+        expected = _batch(df)
+        assert kinds.count(SELL_SETUP) == (expected['sell_setup_count'] == 9).sum()
+
+
+class TestSignalStream:
+    """Tests para el consumidor asyncio SignalStream"""
+
+    @staticmethod
+    def _bars(frames):
+        """Intercala las barras de varios símbolos por posición"""
+        n = max(len(df) for df in frames.values())
+        for i in range(n):
+            for symbol, df in frames.items():
+                if i < len(df):
+                    row = df.iloc[i]
+                    yield Bar(symbol, i, row['Open'], row['High'], row['Low'], row['Close'])
+
+    def _expected_events(self, frames):
+        expected = set()
+        for symbol, df in frames.items():
+            res = _batch(df)
+            for col, kind, value in [('buy_setup_count', BUY_SETUP, 9), ('sell_setup_count', SELL_SETUP, 9),
+                                     ('buy_countdown_count', BUY_COUNTDOWN, 13),
+                                     ('sell_countdown_count', SELL_COUNTDOWN, 13)]:
+                expected |= {(symbol, int(i), kind) for i in np.flatnonzero(res[col] == value)}
+        return expected
+
+    def test_run_yields_batch_signals_per_symbol(self, real_world_like_data, complete_buy_setup_data):
+        """Verifica que run() produce las mismas señales que el cálculo batch por símbolo"""
+        frames = {'AAA': real_world_like_data, 'BBB': complete_buy_setup_data}
+
+        async def feed():
+            for bar in self._bars(frames):
+                yield bar
+
+        async def main():
+            stream = SignalStream(maxsize=4)
+            return [e async for e in stream.run(feed())]
+
+        events = asyncio.run(main())
+        got = {(e.symbol, e.bar, e.kind) for e in events if e.kind in
+               (BUY_SETUP, SELL_SETUP, BUY_COUNTDOWN, SELL_COUNTDOWN)}
+        assert got == self._expected_events(frames)
+
+    def test_warm_up_in_executor_then_live_bars(self, real_world_like_data):
+        """Verifica que el warm-up en executor más las barras en vivo equivale al histórico completo"""
+        df = real_world_like_data
+        history, live = df.iloc[:60], df.iloc[60:]
+
+        async def main():
+            stream = SignalStream(maxsize=8)
+            warm = asyncio.ensure_future(stream.warm_up('AAA', history))
+
+            async def produce():
+                for i, row in live.iterrows():
+                    await stream.put(('AAA', i, row['Open'], row['High'], row['Low'], row['Close']))
+                await warm
+                await stream.close()
+
+            producer = asyncio.ensure_future(produce())
+            events = [e async for e in stream.events()]
+            await producer
+            return stream, events
+
+        stream, events = asyncio.run(main())
+        expected = TDSequentialState.from_frame(df)
+        state = stream.states['AAA']
+        assert state.n_bars == len(df)
+        assert (state.buy_count, state.sell_count, state.buy_countdown, state.sell_countdown) == \
+            (expected.buy_count, expected.sell_count, expected.buy_countdown, expected.sell_countdown)
+        assert all(e.bar >= 60 for e in events)
+
+    def test_warm_up_backlog_is_bounded(self, real_world_like_data):
+        """Durante un warm-up lento el símbolo retiene como mucho maxsize barras; put espera"""
+        df = real_world_like_data
+        history, live = df.iloc[:60], df.iloc[60:]
+        gate = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=1)
+        pool.submit(gate.wait)  # el warm-up queda en cola detrás de este trabajo
+
+        async def main():
+            stream = SignalStream(maxsize=4, executor=pool)
+            warm = asyncio.ensure_future(stream.warm_up('AAA', history))
+            consumer = asyncio.ensure_future(stream.events().__anext__())
+
+            async def produce():
+                for i, row in live.iterrows():
+                    await stream.put(('AAA', i, row['Open'], row['High'], row['Low'], row['Close']))
+
+            producer = asyncio.ensure_future(produce())
+            for _ in range(50):
+                await asyncio.sleep(0)
+            blocked = not producer.done()
+            backlog = len(stream._warming['AAA'])
+            gate.set()
+            await warm
+            await producer
+            await stream.close()
+            consumer.cancel()
+            return stream, blocked, backlog
+
+        try:
+            stream, blocked, backlog = asyncio.run(main())
+        finally:
+            gate.set()
+            pool.shutdown()
+        assert blocked and backlog <= 4
+        assert stream._warming == {} and stream._warm_done == {}
+
+    def test_on_bar_sees_every_bar_in_order(self, real_world_like_data):
+        """on_bar recibe cada barra con su BarResult, también las retenidas durante el warm-up"""
+        df = real_world_like_data
+        history, live = df.iloc[:60], df.iloc[60:]
+        seen = []
+
+        async def main():
+            stream = SignalStream(maxsize=8, yield_every=4,
+                                  on_bar=lambda bar, res, events: seen.append((bar.timestamp, res, events)))
+            warm = asyncio.ensure_future(stream.warm_up('AAA', history))
+
+            async def produce():
+                for i, row in live.iterrows():
+                    await stream.put(('AAA', i, row['Open'], row['High'], row['Low'], row['Close']))
+                await warm
+                await stream.close()
+
+            producer = asyncio.ensure_future(produce())
+            events = [e async for e in stream.events()]
+            await producer
+            return events
+
+        events = asyncio.run(main())
+        expected = _batch(df).iloc[60:]
+        assert [ts for ts, _, _ in seen] == list(live.index)
+        assert [res.buy_setup_count for _, res, _ in seen] == expected['buy_setup_count'].tolist()
+        assert [res.sell_countdown_count for _, res, _ in seen] == expected['sell_countdown_count'].tolist()
+        assert [e for _, _, evs in seen for e in evs] == events
+
+
+def _slow(delay, state):
+    """Tarea de prueba que registra cuántas se ejecutan a la vez"""
+    with state['lock']:
+        state['running'] += 1
+        state['peak'] = max(state['peak'], state['running'])
+    time.sleep(delay)
+    with state['lock']:
+        state['running'] -= 1
+        state['done'] += 1
+    return delay
+
+
+class TestAsyncCalculations:
+    """Tests para ComputeExecutor y las variantes async del cálculo batch"""
+
+    @pytest.mark.parametrize('kind', ['thread', 'process'])
+    def test_matches_sync(self, real_world_like_data, kind):
+        """Las variantes async devuelven lo mismo que las síncronas"""
+        df = real_world_like_data
+
+        async def main():
+            async with ComputeExecutor(kind=kind, max_workers=2) as ex:
+                res = await calculate_td_sequential_async(df, executor=ex, length_setup=9)
+                return await calculate_tdst_levels_async(res.reset_index(drop=True), executor=ex)
+
+        pd.testing.assert_frame_equal(asyncio.run(main()), _batch(df))
+
+    def test_bounded_concurrency_and_responsive_loop(self):
+        """Nunca hay más cálculos en curso que max_concurrency y el loop sigue atendiendo"""
+        state = {'lock': threading.Lock(), 'running': 0, 'peak': 0, 'done': 0}
+
+        async def main():
+            ex = ComputeExecutor(max_workers=8, max_concurrency=2)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.005)
+                    ticks += 1
+
+            t = asyncio.ensure_future(ticker())
+            await asyncio.gather(*[ex.run(_slow, 0.05, state) for _ in range(6)])
+            t.cancel()
+            ex.shutdown()
+            return ticks
+
+        ticks = asyncio.run(main())
+        assert state['peak'] == 2 and state['done'] == 6
+        assert ticks >= 10
+
+    def test_cancellation(self):
+        """Cancelar libera la plaza al terminar y evita ejecutar los cálculos que esperaban"""
+        state = {'lock': threading.Lock(), 'running': 0, 'peak': 0, 'done': 0}
+
+        async def main():
+            ex = ComputeExecutor(max_workers=1)
+            tasks = [asyncio.ensure_future(ex.run(_slow, 0.05, state)) for _ in range(4)]
+            await asyncio.sleep(0.01)
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            assert all(t.cancelled() for t in tasks)
+            # La plaza del cálculo ya iniciado vuelve al semáforo cuando termina
+            result = await asyncio.wait_for(ex.run(_slow, 0.0, state), timeout=2)
+            ex.shutdown()
+            return result
+
+        assert asyncio.run(main()) == 0.0
+        assert state['done'] == 2
+
+    def test_invalid_kind(self):
+        """Tipos de executor desconocidos lanzan ValueError"""
+        with pytest.raises(ValueError):
+            ComputeExecutor(kind='gpu')
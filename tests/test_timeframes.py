@@ -0,0 +1,110 @@
+"""
+Tests para el módulo timeframes.py
+Testea el motor multi-timeframe frente a resample + calculate_td_sequential
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.timeframes import MultiTimeframeEngine
+
+
+@pytest.fixture
+def minute_data():
+    """Barras de 1 minuto durante 5 días de sesión (09:30-16:00)"""
+    rng = np.random.default_rng(11)
+    days = pd.bdate_range('2024-03-04', periods=5)
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(d + pd.Timedelta('09:30:00'), d + pd.Timedelta('15:59:00'), freq='1min') for d in days
+    ]))
+    n = len(index)
+    closes = 100 + np.cumsum(rng.normal(0, 0.1, n)).round(2)
+    opens = np.r_[closes[0], closes[:-1]]
+    return pd.DataFrame({
+        'Open': opens,
+        'High': np.maximum(opens, closes) + rng.random(n).round(2) * 0.1,
+        'Low': np.minimum(opens, closes) - rng.random(n).round(2) * 0.1,
+        'Close': closes
+    }, index=index)
+
+
+def _resample_reference(df, tf):
+    """Camino clásico: resample de pandas + cálculo batch"""
+    bars = df.resample(tf).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}).dropna()
+    res = calculate_tdst_levels(calculate_td_sequential(bars).reset_index(drop=True))
+    res.index = bars.index
+    return res
+
+
+class TestMultiTimeframeEngine:
+    """Tests para la clase MultiTimeframeEngine"""
+
+    TIMEFRAMES = ('1min', '5min', '15min', '1h', '1D')
+
+    def test_frames_match_resample_reference(self, minute_data):
+        """Verifica que cada timeframe coincide con resample + calculate_td_sequential"""
+        engine = MultiTimeframeEngine(self.TIMEFRAMES)
+        _, frames = engine.run(minute_data)
+
+        for tf in self.TIMEFRAMES:
+            expected = _resample_reference(minute_data, tf)
+            got = frames[tf]
+            assert len(got) == len(expected), tf
+            np.testing.assert_array_equal(got.index, expected.index)
+            for col in ['Open', 'High', 'Low', 'Close', 'buy_setup_count', 'sell_setup_count',
+                        'buy_countdown_count', 'sell_countdown_count', 'tdst_buy', 'tdst_sell']:
+                np.testing.assert_array_equal(got[col].to_numpy(float), expected[col].to_numpy(float),
+                                              err_msg=f"{tf} {col}")
+
+    def test_aligned_has_no_lookahead(self, minute_data):
+        """Verifica que el resultado alineado solo usa barras ya completadas"""
+        engine = MultiTimeframeEngine(('5min', '1h'))
+        aligned, frames = engine.run(minute_data)
+
+        assert aligned.index.equals(minute_data.index)
+        closed = aligned[('5min', 'bar_closed')]
+        # Con base de 1 minuto, la barra de 5 minutos se cierra en el minuto 4 de cada bloque
+        assert (minute_data.index[closed].minute % 5 == 4).all()
+        assert closed.sum() == len(frames['5min'])
+
+        # El valor alineado en el cierre coincide con la barra de 5 minutos correspondiente
+        at_close = aligned.loc[closed, ('5min', 'sell_setup_count')].to_numpy()
+        np.testing.assert_array_equal(at_close, frames['5min']['sell_setup_count'].to_numpy())
+
+    def test_daily_bar_closes_on_next_session(self, minute_data):
+        """Verifica que la barra diaria se publica con la primera barra de la sesión siguiente"""
+        engine = MultiTimeframeEngine(('1D',))
+        aligned, _ = engine.run(minute_data)
+
+        closed_at = minute_data.index[aligned[('1D', 'bar_closed')]]
+        assert all(t.hour == 9 and t.minute == 30 for t in closed_at)
+
+    def test_requires_datetime_index(self):
+        """Verifica que exige un índice temporal"""
+        df = pd.DataFrame({'Open': [1.0], 'High': [1.0], 'Low': [1.0], 'Close': [1.0]})
+        with pytest.raises(ValueError, match="DatetimeIndex"):
+            MultiTimeframeEngine(('5min',)).run(df)
+
+    def test_tz_aware_buckets_on_local_time(self, minute_data):
+        """Con zona horaria las barras se agrupan en hora local, como resample"""
+        local = minute_data.tz_localize('Australia/Adelaide')  # UTC+10:30: la sesión cruza la medianoche UTC
+        engine = MultiTimeframeEngine(('1h', '1D'))
+        _, frames = engine.run(local)
+
+        for tf in ('1h', '1D'):
+            expected = _resample_reference(local, tf)
+            got = frames[tf]
+            assert got.index.equals(expected.index), tf
+            for col in ['Open', 'High', 'Low', 'Close', 'buy_setup_count', 'sell_countdown_count', 'tdst_buy']:
+                np.testing.assert_array_equal(got[col].to_numpy(float), expected[col].to_numpy(float),
+                                              err_msg=f"{tf} {col}")
+        # Cada sesión es una sola barra diaria, no dos días UTC
+        assert len(frames['1D']) == 5
+
+        streamed = MultiTimeframeEngine(('1D',))
+        for t, row in local.iterrows():
+            streamed.update(t, row['Open'], row['High'], row['Low'], row['Close'])
+        streamed.flush()
+        assert streamed.frames()['1D'].index.equals(frames['1D'].index)
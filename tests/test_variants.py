@@ -0,0 +1,105 @@
+"""
+Tests para el módulo variants.py
+Testea el kernel de countdown configurable (TD Sequential, TD Combo y variantes)
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.variants import calculate_countdown_variants, CountdownRule, SEQUENTIAL, COMBO
+
+
+def _trending(seed, n=1500):
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.choice([-0.4, 0.4], n // 100 + 1), 100)[:n]
+    closes = 100 + np.cumsum(drift + rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'Open': closes,
+        'High': closes + rng.random(n),
+        'Low': closes - rng.random(n),
+        'Close': closes
+    })
+
+
+def _reference_buy(res, rule):
+    """Countdown de compra de una regla, un setup cada vez (bucle de referencia)"""
+    close, high, low = res['Close'].to_numpy(), res['High'].to_numpy(), res['Low'].to_numpy()
+    buy9 = np.flatnonzero(res['buy_setup_count'].to_numpy() == 9)
+    sell9 = set(np.flatnonzero(res['sell_setup_count'].to_numpy() == 9))
+    out = np.zeros(len(res), dtype=int)
+    last_done = -1
+    for k, s in enumerate(buy9):
+        nxt = buy9[k + 1] if k + 1 < len(buy9) else len(res)
+        start = max(s - 8, last_done + 1) if rule.kind == 'combo' else s
+        out[start:s] = 0
+        count, prev = 0, None
+        for i in range(start, len(res)):
+            if (i in sell9 and i >= s) or i >= nxt:
+                break
+            o = rule.offset
+            if i < o + (1 if rule.reference == 'true_low' else 0):
+                continue
+            ref = {'low': low[i - o], 'close': close[i - o],
+                   'true_low': min(low[i - o], close[i - o - 1])}[rule.reference]
+            ok = close[i] <= ref
+            if rule.kind == 'combo':
+                ok = ok and i >= 1 and low[i] <= low[i - 1] and close[i] < close[i - 1]
+                ok = ok and (prev is None or close[i] < prev)
+            if ok:
+                count += 1
+                out[i] = count
+                prev = close[i]
+                if count == rule.length:
+                    last_done = i
+                    break
+    return out
+
+
+class TestCountdownVariants:
+    """Tests para calculate_countdown_variants"""
+
+    @pytest.mark.parametrize('seed', [0, 1, 2])
+    def test_sequential_rule_matches_core(self, seed):
+        """La regla por defecto reproduce exactamente el countdown de calculate_td_sequential"""
+        res = calculate_td_sequential(_trending(seed))
+        out = calculate_countdown_variants(res, [SEQUENTIAL])
+        np.testing.assert_array_equal(out['sequential_buy_countdown'], res['buy_countdown_count'])
+        np.testing.assert_array_equal(out['sequential_sell_countdown'], res['sell_countdown_count'])
+
+    @pytest.mark.parametrize('rule', [
+        COMBO,
+        CountdownRule('tl', reference='true_low'),
+        CountdownRule('c3', offset=3, reference='close', length=8),
+    ])
+    def test_rules_match_reference_loop(self, rule):
+        """Cada variante coincide con su bucle independiente, aun ejecutándose junto a otras"""
+        res = calculate_td_sequential(_trending(3))
+        out = calculate_countdown_variants(res, [SEQUENTIAL, rule, CountdownRule('extra', offset=4)])
+        expected = _reference_buy(res, rule)
+        np.testing.assert_array_equal(out[f'{rule.name}_buy_countdown'].to_numpy(), expected)
+        assert (out[f'{rule.name}_buy_countdown'] == rule.length).any()
+
+    def test_combo_starts_at_setup_bar_one(self):
+        """TD Combo puede contar barras del propio setup antes del 9"""
+        res = calculate_td_sequential(_trending(4))
+        out = calculate_countdown_variants(res, [COMBO])
+        buy9 = np.flatnonzero(res['buy_setup_count'].to_numpy() == 9)
+        counted = out['combo_buy_countdown'].to_numpy()
+        assert any(counted[s - 8:s].any() for s in buy9)
+
+    def test_computes_setups_when_missing(self):
+        """Sin columnas de setup se calculan antes de los countdowns"""
+        df = _trending(5, n=300)
+        out = calculate_countdown_variants(df)
+        assert {'buy_setup_count', 'combo_buy_countdown', 'sequential_sell_countdown'} <= set(out.columns)
+        assert 'combo_buy_countdown' not in df.columns
+
+    def test_invalid_rules(self):
+        """Tipos, referencias o nombres repetidos inválidos"""
+        with pytest.raises(ValueError):
+            CountdownRule('x', kind='foo')
+        with pytest.raises(ValueError):
+            CountdownRule('x', reference='open')
+        with pytest.raises(ValueError):
+            calculate_countdown_variants(_trending(1, n=50), [SEQUENTIAL, SEQUENTIAL])
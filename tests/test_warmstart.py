@@ -0,0 +1,82 @@
+"""
+Tests para el módulo warmstart.py
+Testea que las consultas por rango con calentamiento mínimo son exactas
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from tdsequential.core import calculate_td_sequential
+from tdsequential.levels import calculate_tdst_levels
+from tdsequential.warmstart import calculate_range, warmup_start
+
+
+def _series(seed, n=3000, rounded=False):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    if rounded:
+        closes = np.round(closes)  # empates frecuentes
+    return pd.DataFrame({
+        'Open': closes,
+        'High': closes + rng.random(n),
+        'Low': closes - rng.random(n),
+        'Close': closes
+    }, index=pd.date_range('2000-01-01', periods=n, freq='D'))
+
+
+def _full(df):
+    res = calculate_tdst_levels(calculate_td_sequential(df.reset_index(drop=True)))
+    res.index = df.index
+    return res
+
+
+COLUMNS = ['buy_setup_count', 'sell_setup_count', 'buy_countdown_count', 'sell_countdown_count',
+           'tdst_buy', 'tdst_sell']
+
+
+class TestCalculateRange:
+    """Tests para calculate_range y warmup_start"""
+
+    @pytest.mark.parametrize('seed,rounded', [(0, False), (1, True), (2, False), (3, True)])
+    def test_matches_full_series(self, seed, rounded):
+        """Rangos aleatorios coinciden con el cálculo desde la barra 0"""
+        df = _series(seed, rounded=rounded)
+        full = _full(df)
+        rng = np.random.default_rng(seed)
+        for _ in range(20):
+            a = int(rng.integers(0, len(df)))
+            b = int(rng.integers(a, len(df)))
+            res = calculate_range(df, df.index[a], df.index[b])
+            pd.testing.assert_frame_equal(res[COLUMNS], full.iloc[a:b + 1][COLUMNS])
+
+    def test_counts_only_needs_less_warmup(self):
+        """Sin niveles TDST el calentamiento nunca es mayor y sigue siendo exacto"""
+        df = _series(5)
+        full = _full(df)
+        start = df.index[2500]
+        with_levels = warmup_start(df, start)
+        counts_only = warmup_start(df, start, levels=False)
+        assert counts_only <= with_levels < 2500
+        res = calculate_range(df, start, levels=False)
+        assert 'tdst_buy' not in res.columns
+        pd.testing.assert_frame_equal(res[COLUMNS[:4]], full.iloc[2500:][COLUMNS[:4]])
+
+    def test_cost_proportional_to_range(self):
+        """Un rango final de una serie larga no recorre toda la serie"""
+        df = _series(6, n=20000)
+        res = calculate_range(df, df.index[-21], df.index[-1])
+        assert len(res) == 21
+        assert res.attrs['warmup_start'] > 15000
+
+    def test_start_near_beginning_falls_back_to_bar_zero(self):
+        """Si no hay calentamiento suficiente se calcula desde la barra 0"""
+        df = _series(7, n=200)
+        assert warmup_start(df, df.index[3]) == 0
+
+    def test_invalid_inputs(self):
+        """Rangos vacíos o columnas ausentes lanzan ValueError"""
+        df = _series(8, n=100)
+        with pytest.raises(ValueError):
+            calculate_range(df, df.index[50], df.index[10])
+        with pytest.raises(ValueError):
+            calculate_range(df, df.index[10], close_col='close')